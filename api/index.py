@@ -4,11 +4,11 @@
 
 import os
 import sqlite3 # Now this should refer to the injected pysqlite3
-import subprocess # Added for init-db check
 import sys # Added for init-db check, and runtime debugging
 import time # Added for timing
+import threading
 from flask import Flask, render_template, request, session, jsonify, redirect, url_for, g, abort, current_app # Added current_app and logging
-import requests
+from flask.sessions import SecureCookieSessionInterface
 import click
 from flask.cli import with_appcontext
 import math # <-- ADDED IMPORT
@@ -18,6 +18,18 @@ import logging # For better error logging
 import spelling_bee # Direct import
 # Import database setup function
 import database_setup # Direct import
+# Background pool of pre-solved puzzles
+import puzzle_pool
+# Server-side game state (the cookie only holds a game id)
+import game_store
+# Persistent read-only database connections
+import db_pool
+# Definition lookups with a two-tier cache in front of the dictionary API
+import definitions
+# Prometheus-format counters and histograms served at /metrics
+import metrics
+# Opt-in per-request cProfile and Server-Timing headers
+import profiler
 # Import the normalization function
 # from spelling_bee import normalize_word # Can use spelling_bee.normalize_word
 
@@ -56,13 +68,11 @@ AVAILABLE_DICTIONARIES_METADATA = {
 }
 
 def get_db():
-    """Opens a new database connection if there is none yet for the current application context."""
+    """Returns this thread's pooled read-only database connection (reused across requests)."""
     if 'db' not in g:
         try:
             # Ensure DATABASE_PATH is the correct, accessible path at runtime
-            g.db = sqlite3.connect(DATABASE_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-            g.db.row_factory = sqlite3.Row # Return rows that behave like dicts
-            app.logger.info(f"Database connection opened successfully to {DATABASE_PATH}")
+            g.db = db_pool.get_connection(DATABASE_PATH)
         except sqlite3.Error as e:
             app.logger.error(f"!!! Database connection error to {DATABASE_PATH}: {e}", exc_info=True)
             g.db = None # Ensure g.db is None if connection fails
@@ -75,32 +85,12 @@ def get_db():
 
 @app.teardown_appcontext
 def close_db(error): # error argument is automatically passed by Flask
-    """Closes the database again at the end of the request."""
-    db = g.pop('db', None)
-    if db is not None:
-        db.close()
-        app.logger.info("Database connection closed.")
+    """Releases the request's database handle. Pooled connections stay open for reuse."""
+    g.pop('db', None)
     if error:
         # Log the error that occurred during the request handling
         app.logger.error(f"App context teardown due to error: {error}", exc_info=True)
 
-def get_word_list_type(db, word):
-    """Queries the database for the list_type of a given word."""
-    if not db:
-        app.logger.error("get_word_list_type called with no DB connection.")
-        return None # Or raise an error
-    try:
-        cursor = db.execute('SELECT list_type FROM words WHERE word = ?', (word,))
-        result = cursor.fetchone()
-        return result['list_type'] if result else None
-    except sqlite3.Error as e:
-        app.logger.error(f"DB error fetching list_type for '{word}': {e}", exc_info=True)
-        return None
-    except Exception as e:
-        # Catch unexpected errors, e.g., if row_factory isn't working
-        app.logger.error(f"Unexpected error fetching list_type for '{word}': {e}", exc_info=True)
-        return None
-
 # < -------------------------------
 
 # Read secret key from environment variable, with a fallback for local dev
@@ -141,6 +131,69 @@ def init_db_command():
 
 app.cli.add_command(init_db_command)
 
+# --- Flask CLI Command for Incremental Updates ---
+@click.command('update-db')
+@click.option('--force', is_flag=True, help='Re-diff every source even if its hash is unchanged.')
+@with_appcontext
+def update_db_command(force):
+    """Apply only the word list changes since the last build."""
+    try:
+        print(f"--- [Flask update-db command] Target DB path: {DATABASE_PATH}")
+        summaries = database_setup.update_db(DATABASE_PATH, force=force)
+        applied = [s['list_type'] for s in summaries if s['status'] == 'applied']
+        click.echo(f"Updated lists: {', '.join(applied) if applied else 'none'}.")
+    except Exception as e:
+        click.echo(f'Error updating database: {e}')
+        import traceback
+        traceback.print_exc()
+
+app.cli.add_command(update_db_command)
+
+# --- Flask CLI Command for the Puzzle Catalog ---
+@click.command('build-puzzles')
+@click.option('--min-words', default=database_setup.CATALOG_MIN_WORDS, show_default=True,
+              help='Reject puzzles with fewer solutions.')
+@click.option('--max-words', default=database_setup.CATALOG_MAX_WORDS, show_default=True,
+              help='Reject puzzles with more solutions.')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: CPU count).')
+@with_appcontext
+def build_puzzles_command(min_words, max_words, workers):
+    """Precompute every playable puzzle into the 'puzzles' table."""
+    try:
+        print(f"--- [Flask build-puzzles command] Target DB path: {DATABASE_PATH}")
+        puzzle_count = database_setup.build_puzzle_catalog(DATABASE_PATH, min_words, max_words, workers)
+        click.echo(f'Built puzzle catalog with {puzzle_count:,} puzzles.')
+    except Exception as e:
+        click.echo(f'Error building puzzle catalog: {e}')
+        import traceback
+        traceback.print_exc()
+
+app.cli.add_command(build_puzzles_command)
+
+# --- Flask CLI Command for the Deploy Artifact ---
+@click.command('optimize-db')
+@click.option('--page-size', default=database_setup.ARTIFACT_PAGE_SIZE, show_default=True,
+              help='SQLite page size to vacuum the database into.')
+@with_appcontext
+def optimize_db_command(page_size):
+    """Stamp, analyze and vacuum the built database into the read-only deploy artifact."""
+    try:
+        print(f"--- [Flask optimize-db command] Target DB path: {DATABASE_PATH}")
+        report = database_setup.optimize_database(DATABASE_PATH, page_size=page_size)
+        click.echo(f"Optimized {report['path']}: {report['bytes_before']:,} -> {report['bytes']:,} bytes, "
+                   f"{report['page_count']:,} pages of {report['page_size']:,}.")
+        for name, size in report['object_bytes'].items():
+            click.echo(f"  {name:<32} {size:>14,} bytes")
+        click.echo("Query plans:")
+        for name, steps in report['query_plans'].items():
+            click.echo(f"  {name:<20} {'; '.join(steps)}")
+    except Exception as e:
+        click.echo(f'Error optimizing database: {e}')
+        import traceback
+        traceback.print_exc()
+
+app.cli.add_command(optimize_db_command)
+
 # --- Helper Function to Get Active List Types ---
 def get_active_list_types_from_session():
     """Gets the list of active word list types based on session settings."""
@@ -154,9 +207,133 @@ def get_active_list_types_from_session():
     print(f"Active list types from session: {active_types}") # Debug log
     return list(set(active_types)) # Ensure uniqueness
 
+# --- Pre-solved Puzzle Pool ---
+# Keeps a few solved puzzles per list selection so /start_game doesn't pay for
+# choosing and solving synchronously. Tune with PUZZLE_POOL_DEPTH / PUZZLE_POOL_LOW_WATERMARK.
+PUZZLE_POOL = puzzle_pool.PuzzlePool(
+    lambda active_list_types: spelling_bee.generate_puzzle(DATABASE_PATH, active_list_types),
+    known_selections=database_setup.catalog_list_combinations()
+)
+
+# --- Game State ---
+# Puzzle and progress live in GAME_STORE (see GAME_STORE_BACKEND). The default
+# 'sqlite' backend shares games between the workers of one host and leaves only
+# 'game_id' in the cookie (plus list preferences and flash messages). Serverless
+# hosts default to 'cookie', which keeps the game in the signed session cookie and
+# rebuilds the puzzle state on whichever instance serves the request.
+GAME_STORE = game_store.create_game_store(
+    rebuild_puzzle=lambda *puzzle_key: rebuild_puzzle_state(*puzzle_key), # Defined below
+    get_session=lambda: session,
+)
+DEFINITIONS = definitions.DefinitionService(DATABASE_PATH)
+
+def load_game():
+    """Returns (puzzle, progress) for the session's game, or (None, None) if there is none."""
+    game = GAME_STORE.load(session.get('game_id'))
+    return game if game else (None, None)
+
+def save_progress(progress):
+    """Persists the current game's progress (score, found words, counts)."""
+    GAME_STORE.save_progress(session['game_id'], progress)
+
+def end_game():
+    """Forgets the session's current game, if any."""
+    game_id = session.pop('game_id', None)
+    if game_id:
+        GAME_STORE.delete(game_id)
+
 # --- Helper Function for New Game Setup (MODIFIED) ---
+def build_puzzle_state(puzzle):
+    """
+    Game store puzzle state for a solved puzzle (see spelling_bee.solve_puzzle):
+    the solutions and their per-index data plus the SVG geometry of the letter
+    hive. Depends only on the puzzle, so any worker can rebuild it.
+    """
+    letters_set, center_letter = puzzle['letters'], puzzle['center_letter']
+
+    # --- Calculate Coordinates (Keep as is) ---
+    geometry_start = time.perf_counter()
+    viewBox_center_x = 75
+    viewBox_center_y = 75
+    center_radius = 25
+    outer_ring_end_radius = 65
+    letter_radius = center_radius + (outer_ring_end_radius - center_radius) / 2
+    all_letters_sorted = sorted(list(letters_set))
+    outer_letters_alpha = [l for l in all_letters_sorted if l != center_letter]
+    num_segments = len(outer_letters_alpha)
+    outer_segments_data = []
+    ordered_outer_letters_for_js = []
+    if num_segments > 0:
+        segment_angle_deg = 360 / num_segments
+        segment_angle_rad = math.radians(segment_angle_deg)
+        start_angle_offset_rad = math.radians(-90 - (segment_angle_deg / 2))
+        letters_to_assign = list(outer_letters_alpha)
+        for i in range(num_segments):
+            current_angle_rad = start_angle_offset_rad + i * segment_angle_rad
+            next_angle_rad = current_angle_rad + segment_angle_rad
+            letter_angle_rad = current_angle_rad + (segment_angle_rad / 2)
+
+            letter_x = letter_radius * math.cos(letter_angle_rad)
+            letter_y = letter_radius * math.sin(letter_angle_rad)
+            assigned_letter = letters_to_assign[i]
+            ordered_outer_letters_for_js.append(assigned_letter.upper())
+            start_cx = center_radius * math.cos(current_angle_rad)
+            start_cy = center_radius * math.sin(current_angle_rad)
+            start_ox = outer_ring_end_radius * math.cos(current_angle_rad)
+            start_oy = outer_ring_end_radius * math.sin(current_angle_rad)
+            end_ox = outer_ring_end_radius * math.cos(next_angle_rad)
+            end_oy = outer_ring_end_radius * math.sin(next_angle_rad)
+            end_cx = center_radius * math.cos(next_angle_rad)
+            end_cy = center_radius * math.sin(next_angle_rad)
+            large_arc_flag = 0
+            sweep_flag_outer = 1
+            sweep_flag_inner = 0
+            fmt = ".2f"
+            path_d = (
+                f"M {start_cx:{fmt}} {start_cy:{fmt}} "
+                f"L {start_ox:{fmt}} {start_oy:{fmt}} "
+                f"A {outer_ring_end_radius:{fmt}} {outer_ring_end_radius:{fmt}} 0 {large_arc_flag} {sweep_flag_outer} {end_ox:{fmt}} {end_oy:{fmt}} "
+                f"L {end_cx:{fmt}} {end_cy:{fmt}} "
+                f"A {center_radius:{fmt}} {center_radius:{fmt}} 0 {large_arc_flag} {sweep_flag_inner} {start_cx:{fmt}} {start_cy:{fmt}} "
+                f"Z"
+            )
+            outer_segments_data.append({
+                'letter': assigned_letter.upper(),
+                'x': round(letter_x, 2),
+                'y': round(letter_y, 2),
+                'segment_path': path_d
+            })
+
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - geometry_start, stage='svg_geometry')
+
+    return {
+        'center_letter': center_letter,
+        'letters_set': "".join(sorted(list(letters_set))),
+        # The solved puzzle is shared with other games (see spelling_bee.solve_puzzle): tuples are
+        # kept by reference, its read-only mappings are copied so the game store can serialize them
+        'solutions': puzzle['solutions'], # Ordered; found state is a bitset over these indices
+        'solution_index': dict(puzzle['solution_index']), # {normalized_word: index}
+        'total_score': puzzle['total_score'],
+        'active_list_types': list(puzzle['active_list_types']), # Store active types (sorted)
+        'solution_counts': dict(puzzle['solution_counts']), # Store totals per list
+        'list_masks': dict(puzzle['list_masks']), # {list_type: bitset of solution indices}
+        'solution_lists': puzzle['solution_lists'], # Lists containing each solution, by index
+        'solution_scores': puzzle['solution_scores'], # Points for each solution, by index
+        'solution_pangrams': puzzle['solution_pangrams'], # Pangram flag for each solution, by index
+        # Calculated SVG data
+        'viewBox_center_x': viewBox_center_x,
+        'viewBox_center_y': viewBox_center_y,
+        'center_radius': center_radius,
+        'outer_segments_data': outer_segments_data,
+        'ordered_outer_letters': ordered_outer_letters_for_js, # For shuffle animation
+    }
+
+def rebuild_puzzle_state(letters, center_letter, active_list_types):
+    """Re-solves (memoized) and rebuilds a game's puzzle state; used by the cookie game store."""
+    return build_puzzle_state(spelling_bee.solve_puzzle(DATABASE_PATH, set(letters), center_letter, active_list_types))
+
 def setup_new_game(db_path, active_list_types):
-    """Sets up a new game, updates session, returns success status."""
+    """Sets up a new game in the game store, points the session at it, returns success status."""
     if not active_list_types or not isinstance(active_list_types, list):
          app.logger.error(f"Invalid active_list_types provided: {active_list_types}")
          return False
@@ -164,114 +341,39 @@ def setup_new_game(db_path, active_list_types):
     try:
         app.logger.info(f"Setting up new game with DB: {db_path}, Lists: {active_list_types}")
         
-        # 1. Choose letters
-        letters_set, center_letter = spelling_bee.choose_letters(db_path, active_list_types)
-        app.logger.info(f"Letters chosen: {letters_set}, Center: {center_letter}")
-
-        # 2. Find ALL valid words for chosen letters ACROSS selected lists
-        solutions, normalized_solution_map = spelling_bee.find_valid_words(db_path, letters_set, center_letter, active_list_types)
+        # 1. Take an already-solved puzzle from the pool, or choose and solve one now
+        puzzle = PUZZLE_POOL.get(active_list_types)
+        if puzzle is None:
+            puzzle = spelling_bee.generate_puzzle(db_path, active_list_types)
+        app.logger.info(f"Letters chosen: {puzzle['letters']}, Center: {puzzle['center_letter']}")
+
+        # 2. ALL valid words for chosen letters ACROSS selected lists (found by the solver),
+        #    ordered so found state can be a bitset over solution indices; per-list index
+        #    masks and counts and the total score come from the same solver pass.
+        #    A word in several active lists counts towards each of them.
+        solutions = puzzle['solutions']
         app.logger.info(f"Total solutions found: {len(solutions)}")
         if not solutions:
             app.logger.error("No solutions found for the chosen letters and lists!")
             return False # Cannot proceed without solutions
+        app.logger.info(f"Solution counts per list: {puzzle['solution_counts']}")
+        app.logger.info(f"Total score calculated: {puzzle['total_score']}")
+
+        # 3. Store the game (see GAME_STORE_BACKEND); the session keeps its id
+        puzzle_state = build_puzzle_state(puzzle)
+        store_start = time.perf_counter()
+        progress = {
+            'found_mask': 0, # Bit i set = solutions[i] found
+            'score': 0,
+        }
+        end_game() # Drop the previous game, if any
+        session['game_id'] = GAME_STORE.create(puzzle_state, progress)
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - store_start, stage='game_store')
 
-        # 3. Determine list_type for each solution and calculate counts
-        solution_counts_by_list = {list_type: 0 for list_type in active_list_types}
-        found_counts_by_list = {list_type: 0 for list_type in active_list_types} # Initialize found counts
-        solutions_with_type = [] # Store word and its type if needed elsewhere
-        db = get_db() # Get DB connection
-        if not db:
-             app.logger.error("Failed to get DB connection in setup_new_game")
-             return False # Cannot proceed without DB
-
-        for word in solutions:
-            list_type = get_word_list_type(db, word)
-            if list_type and list_type in active_list_types:
-                solution_counts_by_list[list_type] += 1
-                solutions_with_type.append((word, list_type))
-            else:
-                app.logger.warning(f"Solution '{word}' has unknown or inactive list_type: {list_type}. Ignoring for counts.")
-        
-        # Log the counts per list
-        app.logger.info(f"Solution counts per list: {solution_counts_by_list}")
-
-        # 4. Calculate total score (using original full solutions list)
-        total_score = spelling_bee.calculate_total_score(solutions, letters_set)
-        app.logger.info(f"Total score calculated: {total_score}")
-
-        # --- Calculate Coordinates (Keep as is) ---
-        viewBox_center_x = 75
-        viewBox_center_y = 75
-        center_radius = 25
-        outer_ring_end_radius = 65
-        letter_radius = center_radius + (outer_ring_end_radius - center_radius) / 2
-        all_letters_sorted = sorted(list(letters_set))
-        outer_letters_alpha = [l for l in all_letters_sorted if l != center_letter]
-        num_segments = len(outer_letters_alpha)
-        outer_segments_data = []
-        ordered_outer_letters_for_js = []
-        if num_segments > 0:
-            segment_angle_deg = 360 / num_segments
-            segment_angle_rad = math.radians(segment_angle_deg)
-            start_angle_offset_rad = math.radians(-90 - (segment_angle_deg / 2))
-            letters_to_assign = list(outer_letters_alpha)
-            for i in range(num_segments):
-                current_angle_rad = start_angle_offset_rad + i * segment_angle_rad
-                next_angle_rad = current_angle_rad + segment_angle_rad
-                letter_angle_rad = current_angle_rad + (segment_angle_rad / 2)
-
-                letter_x = letter_radius * math.cos(letter_angle_rad)
-                letter_y = letter_radius * math.sin(letter_angle_rad)
-                assigned_letter = letters_to_assign[i]
-                ordered_outer_letters_for_js.append(assigned_letter.upper())
-                start_cx = center_radius * math.cos(current_angle_rad)
-                start_cy = center_radius * math.sin(current_angle_rad)
-                start_ox = outer_ring_end_radius * math.cos(current_angle_rad)
-                start_oy = outer_ring_end_radius * math.sin(current_angle_rad)
-                end_ox = outer_ring_end_radius * math.cos(next_angle_rad)
-                end_oy = outer_ring_end_radius * math.sin(next_angle_rad)
-                end_cx = center_radius * math.cos(next_angle_rad)
-                end_cy = center_radius * math.sin(next_angle_rad)
-                large_arc_flag = 0
-                sweep_flag_outer = 1
-                sweep_flag_inner = 0
-                fmt = ".2f"
-                path_d = (
-                    f"M {start_cx:{fmt}} {start_cy:{fmt}} "
-                    f"L {start_ox:{fmt}} {start_oy:{fmt}} "
-                    f"A {outer_ring_end_radius:{fmt}} {outer_ring_end_radius:{fmt}} 0 {large_arc_flag} {sweep_flag_outer} {end_ox:{fmt}} {end_oy:{fmt}} "
-                    f"L {end_cx:{fmt}} {end_cy:{fmt}} "
-                    f"A {center_radius:{fmt}} {center_radius:{fmt}} 0 {large_arc_flag} {sweep_flag_inner} {start_cx:{fmt}} {start_cy:{fmt}} "
-                    f"Z"
-                )
-                outer_segments_data.append({
-                    'letter': assigned_letter.upper(),
-                    'x': round(letter_x, 2),
-                    'y': round(letter_y, 2),
-                    'segment_path': path_d
-                })
+        # 4. Warm the definition cache for this puzzle in the background (DEFINITION_PREFETCH=1)
+        DEFINITIONS.prefetch(solutions)
 
-        # 5. Update Session
-        session['center_letter'] = center_letter
-        session['letters_set'] = "".join(sorted(list(letters_set)))
-        session['solutions'] = list(solutions)
-        session['normalized_solution_map'] = normalized_solution_map
-        session['found_words'] = []
-        session['score'] = 0
-        session['total_score'] = total_score
-        session['rank'] = calculate_rank(0, total_score)
-        session['active_list_types'] = active_list_types # Store active types
-        session['solution_counts'] = solution_counts_by_list # Store totals per list
-        session['found_counts'] = found_counts_by_list # Store found counts per list (initially all 0)
-        
-        # Store calculated SVG data
-        session['viewBox_center_x'] = viewBox_center_x
-        session['viewBox_center_y'] = viewBox_center_y
-        session['center_radius'] = center_radius
-        session['outer_segments_data'] = outer_segments_data
-        session['ordered_outer_letters'] = ordered_outer_letters_for_js # For shuffle animation
-
-        app.logger.info("New game session initialized successfully.")
+        app.logger.info("New game initialized successfully.")
         return True
 
     except Exception as e:
@@ -321,34 +423,135 @@ def calculate_rank(score, total_score):
 
 # --- Flask Routes ---
 
+# --- Request metrics --- START
+REQUEST_PROFILER = profiler.RequestProfiler()
+
 @app.before_request
-def check_db():
-    print(f"--- [RUNTIME] before_request: Entering check_db for {request.path}")
-    # --- BEGIN DEBUG: List /var/task contents ---
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # Stage breakdown for Server-Timing, when enabled or asked for with the profile header
+    g.timing_headers = profiler.SERVER_TIMING or REQUEST_PROFILER.header_requested(request.headers)
+    if g.timing_headers:
+        metrics.collect_stage_timings()
+    if REQUEST_PROFILER.wants(request.headers):
+        g.profile = REQUEST_PROFILER.start()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        metrics.HTTP_REQUEST_SECONDS.observe(elapsed, endpoint=request.endpoint or 'unknown',
+                                             method=request.method, status=response.status_code)
+        profile = g.pop('profile', None)
+        if profile is not None:
+            path = REQUEST_PROFILER.stop(profile, request.endpoint or 'unknown', elapsed)
+            if path:
+                response.headers['X-Profile-File'] = os.path.basename(path)
+        if g.pop('timing_headers', False):
+            response.headers['Server-Timing'] = profiler.server_timing_header(metrics.stop_stage_timings(), elapsed)
+            response.headers['X-Response-Time'] = f"{elapsed * 1000:.2f}ms"
+    return response
+
+class MeasuredSessionInterface(SecureCookieSessionInterface):
+    """
+    Signed-cookie sessions that record the size of the Set-Cookie header they
+    write. The cookie is written after the after_request hooks run, and only
+    when the session was modified, so it is measured here instead of re-signed.
+    """
+
+    def save_session(self, app, session, response):
+        super().save_session(app, session, response)
+        if not session.modified or not session:
+            return # Unchanged (no cookie written) or cleared (a deletion)
+        prefix = f"{self.get_cookie_name(app)}="
+        for header in response.headers.getlist('Set-Cookie'):
+            if header.startswith(prefix):
+                metrics.SESSION_COOKIE_BYTES.observe(len(header))
+
+app.session_interface = MeasuredSessionInterface()
+
+@app.teardown_request
+def finish_request_profile(error):
+    # Requests that died with an unhandled exception never reach after_request
+    profile = g.pop('profile', None)
+    if profile is not None:
+        REQUEST_PROFILER.stop(profile, 'error', time.perf_counter() - g.pop('request_start', time.perf_counter()))
+    if g.pop('timing_headers', False):
+        metrics.stop_stage_timings()
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of this process's counters and histograms."""
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+# --- Request metrics --- END
+
+# --- Database readiness (validated once per process) --- START
+READINESS_RETRY_SECONDS = int(os.environ.get('READINESS_RETRY_SECONDS', '30')) # Re-check a not-ready DB at most this often
+# Endpoints that never need the database: static files, probes, and /guess (served from game state)
+DB_FREE_ENDPOINTS = {'static', 'healthz', 'readyz', 'metrics_endpoint', 'handle_guess'}
+
+_db_readiness = None
+_db_readiness_lock = threading.Lock()
+
+def get_db_readiness():
+    """
+    Cached database readiness report (see database_setup.check_database).
+    Checked once at startup; a failed check is retried at most every
+    READINESS_RETRY_SECONDS so a database that appears later is picked up.
+    """
+    global _db_readiness
+    report = _db_readiness
+    if report is not None and (report['ready'] or time.time() - report['checked_at'] < READINESS_RETRY_SECONDS):
+        return report
+    with _db_readiness_lock:
+        if _db_readiness is report: # Not refreshed by another thread meanwhile
+            _db_readiness = database_setup.check_database(DATABASE_PATH)
+            if _db_readiness['ready']:
+                print(f"--- [RUNTIME] Database ready at {DATABASE_PATH}: {_db_readiness['counts']}, "
+                      f"artifact: {_db_readiness['artifact']}")
+            else:
+                print(f"!!! RUNTIME CRITICAL ERROR: Database not ready: {_db_readiness['errors']} !!!")
+        return _db_readiness
+
+def _log_missing_database():
+    """Startup diagnostics for deployments where the database file is missing."""
     runtime_task_dir = '/var/task'
-    print(f"--- [RUNTIME DEBUG] Listing contents of {runtime_task_dir}...")
     try:
-        runtime_dir_listing = os.listdir(runtime_task_dir)
-        print(f"--- [RUNTIME DEBUG] Contents of {runtime_task_dir}: {sorted(runtime_dir_listing)}")
-    except Exception as e:
+        print(f"--- [RUNTIME DEBUG] Contents of {runtime_task_dir}: {sorted(os.listdir(runtime_task_dir))}")
+    except OSError as e:
         print(f"--- [RUNTIME DEBUG] ERROR listing {runtime_task_dir}: {e}")
-    # --- END DEBUG ---
-
-    # Runtime check using the constructed absolute path
-    print(f"--- [RUNTIME] Checking for DB at constructed path: {DATABASE_PATH}")
-    if not os.path.exists(DATABASE_PATH):
-         print(f"!!! RUNTIME CRITICAL ERROR: Database NOT FOUND at {DATABASE_PATH} !!!")
-         # Abort the request cleanly
-         abort(500, description=f"Internal Server Error: Database unavailable at {DATABASE_PATH}")
-    else:
-         print(f"--- [RUNTIME] Database FOUND at {DATABASE_PATH}")
+
+if not get_db_readiness()['ready'] and not os.path.exists(DATABASE_PATH):
+    _log_missing_database()
+
+@app.before_request
+def check_db():
+    if request.endpoint in DB_FREE_ENDPOINTS:
+        return
+    if not get_db_readiness()['ready']:
+        # Abort the request cleanly
+        abort(503, description=f"Service Unavailable: Database not ready at {DATABASE_PATH}")
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: the database passed its startup validation."""
+    report = get_db_readiness()
+    return jsonify(report), (200 if report['ready'] else 503)
+# --- Database readiness (validated once per process) --- END
 
 @app.route('/')
 def index():
     """Main page route."""
     app.logger.info("--- Request received for / route ---")
     
-    game_in_session = session.get('letters_set') is not None
+    puzzle, progress = load_game()
+    game_in_session = puzzle is not None
     app.logger.info(f"Rendering index page. Game in session: {game_in_session}")
     
     # Initialize context with minimal non-game data
@@ -359,26 +562,26 @@ def index():
 
     if game_in_session:
         # --- If game exists, populate all game-related context ---
-        current_score = session.get('score', 0)
-        total_score = session.get('total_score', 0)
+        current_score = progress.get('score', 0)
+        total_score = puzzle.get('total_score', 0)
         calculated_rank = calculate_rank(current_score, total_score)
 
         context.update({
-            'center_letter': session.get('center_letter'),
-            'found_words': session.get('found_words', []),
+            'center_letter': puzzle.get('center_letter'),
+            'found_words': spelling_bee.found_words_from_mask(puzzle['solutions'], progress['found_mask']),
             'score': current_score,
             'rank': calculated_rank,
-            'viewBox_center_x': session.get('viewBox_center_x'),
-            'viewBox_center_y': session.get('viewBox_center_y'),
-            'center_radius': session.get('center_radius'),
-            'outer_segments_data': session.get('outer_segments_data'),
-            'ordered_outer_letters': session.get('ordered_outer_letters', [])
+            'viewBox_center_x': puzzle.get('viewBox_center_x'),
+            'viewBox_center_y': puzzle.get('viewBox_center_y'),
+            'center_radius': puzzle.get('center_radius'),
+            'outer_segments_data': puzzle.get('outer_segments_data'),
+            'ordered_outer_letters': puzzle.get('ordered_outer_letters', [])
         })
 
         # Construct the display_stats list
-        active_list_types = session.get('active_list_types', [])
-        solution_counts = session.get('solution_counts', {})
-        found_counts = session.get('found_counts', {})
+        active_list_types = puzzle.get('active_list_types', [])
+        solution_counts = puzzle.get('solution_counts', {})
+        found_counts = spelling_bee.found_counts_from_mask(progress['found_mask'], puzzle.get('list_masks', {}))
         display_stats = []
         for list_type in active_list_types:
             meta = AVAILABLE_DICTIONARIES_METADATA.get(list_type)
@@ -417,9 +620,9 @@ def index():
     session.pop('message', None)
     
     # --- Add Logging Before Render --- >
-    app.logger.info("--- [DEBUG / route] Checking session before rendering --- ")
-    app.logger.info(f"  - Session letters_set: {session.get('letters_set')}")
-    app.logger.info(f"  - Session solution_counts: {session.get('solution_counts')}")
+    app.logger.info("--- [DEBUG / route] Checking game state before rendering --- ")
+    app.logger.info(f"  - Game letters_set: {puzzle.get('letters_set') if puzzle else None}")
+    app.logger.info(f"  - Game solution_counts: {puzzle.get('solution_counts') if puzzle else None}")
     # < -------------------------------
     
     return render_template('index.html', **context)
@@ -427,40 +630,47 @@ def index():
 @app.route('/guess', methods=['POST'])
 def handle_guess():
     """Handles a word guess submission."""
-    if 'letters_set' not in session:
+    puzzle, progress = load_game()
+    if puzzle is None:
         app.logger.warning("Guess submitted without active game session.")
+        metrics.GUESS_OUTCOMES.inc(outcome='no_game')
         return jsonify({'message': 'No active game. Start a new game?', 'valid': False, 'score': 0, 'rank': 'N/A'})
 
     guess = request.json.get('guess', '').lower()
     app.logger.info(f"[/guess] Received guess: {guess}")
 
     # --- ADD LOGGING TO CHECK SESSION STATE --- >
-    center_letter_from_session = session.get('center_letter', 'MISSING')
-    letters_set_str_from_session = session.get('letters_set', 'MISSING')
-    app.logger.info(f"--- [/guess] Validating against session letters: '{letters_set_str_from_session}', center: '{center_letter_from_session}' ---") 
+    center_letter_from_game = puzzle.get('center_letter', 'MISSING')
+    letters_set_str_from_game = puzzle.get('letters_set', 'MISSING')
+    app.logger.info(f"--- [/guess] Validating against game letters: '{letters_set_str_from_game}', center: '{center_letter_from_game}' ---") 
     # < ----------------------------------------
     
     # Use the retrieved session values for validation
-    center_letter = center_letter_from_session
-    letters_set_str = letters_set_str_from_session
+    center_letter = center_letter_from_game
+    letters_set_str = letters_set_str_from_game
     
     if center_letter == 'MISSING' or letters_set_str == 'MISSING':
-        app.logger.error("[/guess] Critical error: Letters missing from session during guess.")
+        app.logger.error("[/guess] Critical error: Letters missing from game state during guess.")
+        metrics.GUESS_OUTCOMES.inc(outcome='game_state_lost')
         return jsonify({'message': 'Error: Game state lost. Please start a new game.', 'valid': False})
         
     letters_set = set(letters_set_str) # Convert string to set for checking
-    normalized_solution_map = session.get('normalized_solution_map', {})
-    found_words = session.get('found_words', [])
+    solution_index = puzzle.get('solution_index', {})
+    found_mask = progress.get('found_mask', 0)
 
     # Basic validation
     if not guess:
+        metrics.GUESS_OUTCOMES.inc(outcome='empty')
         return jsonify({'message': 'Please enter a word.', 'valid': False})
     if any(letter not in letters_set for letter in guess):
+        metrics.GUESS_OUTCOMES.inc(outcome='invalid_letter')
         invalid_letters = sorted(list(set(l for l in guess if l not in letters_set)))
         return jsonify({'message': f"Invalid letter(s): {', '.join(invalid_letters).upper()}", 'valid': False})
     if center_letter not in guess:
+        metrics.GUESS_OUTCOMES.inc(outcome='missing_center')
         return jsonify({'message': f'Missing center letter: {center_letter.upper()}', 'valid': False})
     if len(guess) < 4:
+        metrics.GUESS_OUTCOMES.inc(outcome='too_short')
         return jsonify({'message': 'Too short (min 4 letters).', 'valid': False})
 
     # Normalize the guess
@@ -468,48 +678,53 @@ def handle_guess():
     app.logger.info(f"Normalized guess: {normalized_guess}")
 
     # Check if the normalized guess is a valid solution
-    if normalized_guess in normalized_solution_map:
-        original_word = normalized_solution_map[normalized_guess] # Get the correctly cased/accented word
+    index = solution_index.get(normalized_guess)
+    if index is not None:
+        original_word = puzzle['solutions'][index] # Get the correctly cased/accented word
+        word_bit = 1 << index
         
-        if original_word in found_words:
+        if found_mask & word_bit:
+            metrics.GUESS_OUTCOMES.inc(outcome='duplicate')
             return jsonify({'message': 'Already found!', 'valid': False, 'word': original_word}) # Return original word
         else:
             # --- Word is valid and new ---
-            points = spelling_bee.calculate_score(original_word, letters_set)
-            is_pangram = spelling_bee.is_pangram(original_word, letters_set)
+            metrics.GUESS_OUTCOMES.inc(outcome='valid')
+            # Precomputed by the solver - a guess never touches the lexicon
+            points = puzzle['solution_scores'][index]
+            is_pangram = puzzle['solution_pangrams'][index]
             message = f"+{points}"
             if is_pangram:
                 message += " Pangram!"
             
-            # Update session data
-            session['found_words'].append(original_word)
-            session['score'] += points
+            # Update game progress
+            found_mask |= word_bit
+            progress['found_mask'] = found_mask
+            progress['score'] += points
             
-            # --- Update per-dictionary found counts ---
-            db = get_db()
-            list_type = get_word_list_type(db, original_word) # Use original word for DB lookup
-            updated_list_type = None
-            new_found_count_for_list = None
-            if list_type and list_type in session.get('found_counts', {}):
-                session['found_counts'][list_type] = session['found_counts'].get(list_type, 0) + 1
-                updated_list_type = list_type
-                new_found_count_for_list = session['found_counts'][list_type]
-                app.logger.info(f"Incremented found count for list type '{list_type}' to {new_found_count_for_list}")
+            # --- Per-dictionary found counts: popcount over each containing list's mask ---
+            list_masks = puzzle['list_masks']
+            updated_counts = {
+                list_type: (found_mask & list_masks[list_type]).bit_count()
+                for list_type in puzzle['solution_lists'][index]
+            }
+            if updated_counts:
+                app.logger.info(f"Found counts updated: {updated_counts}")
             else:
-                 app.logger.warning(f"Could not find or update list type '{list_type}' for word '{original_word}' in session found_counts.")
+                 app.logger.warning(f"No list type recorded for word '{original_word}' in game list_masks.")
+            # First containing list, for clients that only read a single list
+            updated_list_type = next(iter(updated_counts), None)
 
             # --- Recalculate Rank ---
-            total_score = session.get('total_score', 0)
-            new_rank = calculate_rank(session['score'], total_score)
-            session['rank'] = new_rank
+            total_score = puzzle.get('total_score', 0)
+            new_rank = calculate_rank(progress['score'], total_score)
 
-            # --- Ensure session modifications are saved ---
-            session.modified = True 
+            # --- Ensure progress modifications are saved ---
+            save_progress(progress)
             
-            app.logger.info(f"Word '{original_word}' is valid. Score +{points}. New total: {session['score']}. Rank: {new_rank}.")
+            app.logger.info(f"Word '{original_word}' is valid. Score +{points}. New total: {progress['score']}. Rank: {new_rank}.")
 
             # Check if all words are found
-            all_found = len(session['found_words']) == len(session.get('solutions', []))
+            all_found = found_mask == (1 << len(puzzle['solutions'])) - 1
             if all_found:
                 message = "Congratulations! You found all the words!"
 
@@ -521,16 +736,19 @@ def handle_guess():
                 'message': message, 
                 'valid': True, 
                 'word': original_word, # Send back original case
-                'score': session['score'], 
+                'score': progress['score'], 
                 'rank': new_rank,
                 'is_pangram': is_pangram,
                 'all_found': all_found,
                 'updated_list_type': updated_list_type, # Send the list type that was updated
-                'new_found_count': new_found_count_for_list # Send the new count for that list
+                'new_found_count': updated_counts.get(updated_list_type), # Send the new count for that list
+                'updated_counts': updated_counts, # {list_type: new found count} for every list containing the word
+                'found_count': found_mask.bit_count(), # Total distinct words found
             })
     else:
         # Word is not in the solution list
         app.logger.info(f"Guess '{guess}' (normalized: '{normalized_guess}') not in solutions.")
+        metrics.GUESS_OUTCOMES.inc(outcome='not_a_word')
         return jsonify({'message': 'Not a valid word.', 'valid': False})
 
 @app.route('/update_settings', methods=['POST'])
@@ -543,22 +761,7 @@ def update_settings():
     print(f"New settings: NZ={session['use_nz']}, AU={session['use_au']}, TR={session['use_tr']}")
 
     # Clear existing game state to force a new puzzle generation on redirect
-    session.pop('letters_set', None)
-    session.pop('center_letter', None)
-    session.pop('solutions', None)
-    session.pop('normalized_solution_map', None)
-    session.pop('found_words', None)
-    session.pop('score', None)
-    session.pop('total_score', None)
-    session.pop('rank', None)
-    session.pop('active_list_types', None)
-    session.pop('solution_counts', None)
-    session.pop('found_counts', None)
-    session.pop('viewBox_center_x', None)
-    session.pop('viewBox_center_y', None)
-    session.pop('center_radius', None)
-    session.pop('outer_segments_data', None)
-    session.pop('ordered_outer_letters', None)
+    end_game()
     session['message'] = "Word list settings updated. New game started!" # Flash message
     session.modified = True
 
@@ -568,7 +771,8 @@ def update_settings():
 def get_dictionary_options():
     # Use the globally defined metadata
     try:
-        current_selections = session.get('active_list_types', ['csw21'])
+        puzzle, _ = load_game()
+        current_selections = puzzle.get('active_list_types', ['csw21']) if puzzle else ['csw21']
 
         options_with_state = []
         for key, info in AVAILABLE_DICTIONARIES_METADATA.items():
@@ -615,23 +819,24 @@ def start_game():
     # Use the correct database path
     db_path = DATABASE_PATH
 
-    # Attempt to set up the new game and store details in session
+    # Attempt to set up the new game and store it server-side
     success = setup_new_game(db_path, selected_lists)
 
     if success:
-        # Game setup was successful, retrieve necessary data from session
+        # Game setup was successful, retrieve necessary data from the game store
         app.logger.info("'/start_game': New game setup successful. Preparing response data.")
         
         # Retrieve data stored by setup_new_game
-        all_letters = sorted(list(session.get('letters_set', set())))
-        center_letter = session.get('center_letter', '')
-        solution_counts = session.get('solution_counts', {}) # Totals per list
-        total_score = session.get('total_score', 0) 
+        puzzle, _ = load_game()
+        all_letters = sorted(list(puzzle.get('letters_set', '')))
+        center_letter = puzzle.get('center_letter', '')
+        solution_counts = puzzle.get('solution_counts', {}) # Totals per list
+        total_score = puzzle.get('total_score', 0) 
         # <<< Retrieve Geometry Data >>>
-        outer_segments_data = session.get('outer_segments_data', []) 
-        center_radius = session.get('center_radius', 25) # Default radius if not found
-        viewBox_center_x = session.get('viewBox_center_x', 75)
-        viewBox_center_y = session.get('viewBox_center_y', 75)
+        outer_segments_data = puzzle.get('outer_segments_data', []) 
+        center_radius = puzzle.get('center_radius', 25) # Default radius if not found
+        viewBox_center_x = puzzle.get('viewBox_center_x', 75)
+        viewBox_center_y = puzzle.get('viewBox_center_y', 75)
 
         # Format word counts for frontend { key: { found: 0, total: X } }
         word_counts_for_js = {
@@ -670,85 +875,34 @@ def start_game():
         app.logger.error("'/start_game': setup_new_game returned False. Failed to start new game.")
         return jsonify({'success': False, 'message': 'Failed to generate a suitable puzzle. Please try again.'}), 500
 
-# --- Definition Route (Remains largely unchanged) ---
+@app.route('/stats')
+def stats():
+    """Runtime counters for capacity planning (puzzle pool hits/misses, solved-puzzle memo, game store size, DB connections, definition cache)."""
+    return jsonify({
+        'puzzle_pool': PUZZLE_POOL.stats(),
+        'solution_cache': spelling_bee.solution_cache_stats(),
+        'game_store': GAME_STORE.stats(),
+        'db_pool': db_pool.get_pool(DATABASE_PATH).stats(),
+        'definitions': DEFINITIONS.stats(),
+        'profiler': REQUEST_PROFILER.stats(),
+    })
+
+# --- Definition Route ---
 @app.route('/definition/<word>')
 def get_definition(word):
-    """Fetches definitions for a given word from the local database, with fallback to an external API."""
-    definition_text = "Definition not found."
-    definitions = [] # Store definition strings
-    
-    # 1. Try local database first
-    db = get_db()
-    if not db:
-        app.logger.error(f"Could not get DB connection for definition lookup of '{word}'")
-        return jsonify({'definition': 'Error: Database connection failed.'}), 500
-
-    try:
-        query = """
-            SELECT d.definition_text 
-            FROM definitions d
-            JOIN words w ON d.word_id = w.word_id 
-            WHERE w.word = ?
-        """
-        cursor = db.cursor()
-        cursor.execute(query, (word.lower(),)) # Query using lowercase word
-        results = cursor.fetchall()
-        
-        if results:
-            app.logger.info(f"Found {len(results)} definitions for '{word}' in local DB.")
-            # Format local definitions
-            definitions = [row[0] for row in results]
-
-    except sqlite3.Error as e:
-        app.logger.error(f"Database error fetching definition for '{word}': {e}")
-        # Don't return error yet, try API fallback
-    except Exception as e:
-        app.logger.error(f"Unexpected error fetching local definition for '{word}': {e}")
-        # Don't return error yet, try API fallback
-
-    # 2. If no local definitions found, try external API
-    if not definitions:
-        app.logger.info(f"No local definition for '{word}', trying external API...")
-        api_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-        try:
-            response = requests.get(api_url, timeout=5) # Add timeout
-            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            
-            data = response.json()
-            if data and isinstance(data, list):
-                # Try to extract the first definition found
-                first_entry = data[0]
-                if 'meanings' in first_entry and first_entry['meanings']:
-                    first_meaning = first_entry['meanings'][0]
-                    if 'definitions' in first_meaning and first_meaning['definitions']:
-                        first_def_obj = first_meaning['definitions'][0]
-                        if 'definition' in first_def_obj:
-                            definitions.append(first_def_obj['definition']) # Add the API definition
-                            app.logger.info(f"Successfully fetched definition for '{word}' from API.")
-                        else:
-                            app.logger.warning(f"API response structure missing 'definition' field for '{word}'")
-                    else:
-                         app.logger.warning(f"API response structure missing 'definitions' list for '{word}'")
-                else:
-                     app.logger.warning(f"API response structure missing 'meanings' list for '{word}'")
-            else:
-                app.logger.warning(f"API returned no data or unexpected format for '{word}'")
-
-        except requests.exceptions.RequestException as e:
-            app.logger.error(f"Error calling definition API for '{word}': {e}")
-        except Exception as e:
-            app.logger.error(f"Error parsing API response for '{word}': {e}")
-
-    # 3. Format the final result (could be local, API, or default message)
-    if definitions:
-        # Join multiple definitions (if from local DB) with numbers
-        if len(definitions) > 1:
-             definition_text = "\n\n".join([f"{idx+1}. {d}" for idx, d in enumerate(definitions)])
-        else:
-            definition_text = definitions[0] # Single definition (local or API)
-    # else: definition_text remains "Definition not found."
-    
-    return jsonify({'definition': definition_text})
+    """Fetches definitions for a given word from the local database, with a cached fallback to an external API."""
+    return jsonify({'definition': DEFINITIONS.lookup(word)})
+
+@app.route('/definitions', methods=['POST'])
+def get_definitions():
+    """Batch lookup: {'words': [...]} -> {'definitions': {word: text}}."""
+    data = request.get_json(silent=True) or {}
+    words = data.get('words')
+    if not isinstance(words, list) or not all(isinstance(word, str) and word for word in words):
+        return jsonify({'error': "Expected a JSON body like {'words': ['word', ...]}."}), 400
+    if len(words) > definitions.DEFINITION_BATCH_MAX:
+        return jsonify({'error': f"At most {definitions.DEFINITION_BATCH_MAX} words per request."}), 400
+    return jsonify({'definitions': DEFINITIONS.lookup_many(words)})
 
 # --- Main Execution ---
 if __name__ == "__main__":
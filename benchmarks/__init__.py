@@ -0,0 +1,8 @@
+"""
+Reproducible benchmarks for the puzzle engine and the HTTP endpoints.
+
+    python -m benchmarks.run --suite engine,http --out bench-results/HEAD.json
+    python -m benchmarks.compare bench-results/main.json bench-results/HEAD.json
+
+See benchmarks/run.py for the options (lexicon sizes, engines, iterations).
+"""
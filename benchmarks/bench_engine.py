@@ -0,0 +1,81 @@
+# benchmarks/bench_engine.py
+# Puzzle engine benchmarks: choose_letters, find_valid_words, calculate_total_score
+# and init_db, against the real CSW21 list and synthetic lexicons.
+import contextlib
+import os
+import random
+
+import lexicon_file
+import spelling_bee
+from benchmarks import harness, lexicon
+
+REAL_WORD_LIST = os.path.join(harness.PROJECT_ROOT, 'data_sources', 'csw21_filtered.txt')
+LIST_TYPES = ['csw21']
+
+@contextlib.contextmanager
+def solver_engine(name):
+    previous = spelling_bee.SOLVER_ENGINE
+    spelling_bee.SOLVER_ENGINE = name
+    try:
+        yield
+    finally:
+        spelling_bee.SOLVER_ENGINE = previous
+
+def sample_puzzles(db_path, count, seed=0):
+    """`count` (letters, center) pairs chosen the way games choose them."""
+    random.seed(seed)
+    with solver_engine('sql'):
+        return [spelling_bee.choose_letters(db_path, LIST_TYPES) for _ in range(count)]
+
+def bench_lexicon(label, words_path, db_path, engines, iterations) -> dict:
+    """All engine benchmarks for one lexicon; keys are '<operation>[<engine>]/<label>'."""
+    results = {}
+    build_path = db_path + '.build'
+    # Builds are slow on large lexicons; one timed build is enough to spot regressions
+    results[f"init_db/{label}"] = harness.measure_once(lambda: lexicon.build_database(words_path, build_path))
+    for path in (build_path, lexicon_file.lexicon_path(build_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+    puzzles = sample_puzzles(db_path, iterations)
+    for engine in engines:
+        with solver_engine(engine):
+            available = engine == 'sql' or spelling_bee._get_engine(db_path) is not None
+            if not available:
+                print(f"--- [bench_engine] Engine '{engine}' unavailable, skipping.")
+                continue
+        with solver_engine(engine):
+            results[f"choose_letters[{engine}]/{label}"] = harness.measure(
+                lambda _: spelling_bee.choose_letters(db_path, LIST_TYPES), iterations=iterations)
+            results[f"find_valid_words[{engine}]/{label}"] = harness.measure(
+                lambda puzzle: spelling_bee.find_valid_words(db_path, puzzle[0], puzzle[1], LIST_TYPES),
+                iterations=iterations, setup=lambda i: puzzles[i % len(puzzles)])
+
+    solved = [(spelling_bee.find_valid_words(db_path, letters, center, LIST_TYPES)[0], letters)
+              for letters, center in puzzles]
+    solution_counts = [len(words) for words, _ in solved]
+    results[f"calculate_total_score/{label}"] = harness.measure(
+        lambda puzzle: spelling_bee.calculate_total_score(*puzzle), iterations=iterations,
+        setup=lambda i: solved[i % len(solved)],
+        trace_memory=False)
+    results[f"calculate_total_score/{label}"]['mean_solutions'] = round(sum(solution_counts) / len(solution_counts), 1)
+    return results
+
+def run(sizes, engines=('sql', 'numpy', 'mmap'), iterations=50, work_dir=None, include_real=True, seed=0) -> dict:
+    work_dir = work_dir or os.path.join(harness.PROJECT_ROOT, '.bench-cache')
+    results = {}
+    if include_real:
+        if os.path.exists(REAL_WORD_LIST):
+            os.makedirs(work_dir, exist_ok=True)
+            db_path = os.path.join(work_dir, 'csw21.db')
+            if not os.path.exists(db_path):
+                lexicon.build_database(REAL_WORD_LIST, db_path)
+            lexicon.ensure_lexicon_file(db_path)
+            results.update(bench_lexicon('csw21', REAL_WORD_LIST, db_path, engines, iterations))
+        else:
+            print(f"--- [bench_engine] {REAL_WORD_LIST} not found, skipping the real lexicon.")
+    for size in sizes:
+        print(f"--- [bench_engine] Preparing synthetic lexicon of {size} words...")
+        words_path, db_path = lexicon.prepare_synthetic(size, work_dir, seed)
+        results.update(bench_lexicon(f"synthetic{size}", words_path, db_path, engines, iterations))
+    return results
@@ -0,0 +1,95 @@
+# benchmarks/bench_http.py
+# Endpoint benchmarks through the Flask test client: /start_game, /guess and
+# /definition (cold and cached), with the dictionary API replaced by the local
+# stub server so results don't depend on the network.
+import contextlib
+import importlib.util
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+from benchmarks import harness
+
+APP_PATH = os.path.join(harness.PROJECT_ROOT, 'api', 'index.py')
+LIST_SELECTION = ['csw21']
+
+def start_stub_api(latency=0.0, missing_ratio=0.2):
+    """Starts the stub dictionary API on a free port; returns (server, url_template)."""
+    sys.path.insert(0, os.path.join(harness.PROJECT_ROOT, 'scripts'))
+    import stub_dictionary_api
+    server = stub_dictionary_api.make_server(port=0, missing_ratio=missing_ratio, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v2/entries/en/{{word}}"
+
+def load_app(work_dir=None, stub_latency=0.0):
+    """
+    Imports api/index.py with the definition cache, game store and dictionary API
+    pointed at throwaway locations. Must run before anything else imports the app.
+    Returns the app module.
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='spelling_bee_bench_')
+    _, url = start_stub_api(latency=stub_latency)
+    os.environ.setdefault('DICTIONARY_API_URL', url)
+    os.environ.setdefault('DEFINITION_CACHE_PATH', os.path.join(work_dir, 'definition_cache.db'))
+    os.environ.setdefault('GAME_STORE_PATH', os.path.join(work_dir, 'games.db'))
+    spec = importlib.util.spec_from_file_location('app_index', APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['app_index'] = module
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    logging.disable(logging.CRITICAL) # Per-request app logging would dominate the timings
+    return module
+
+def current_solutions(app_module, client) -> list[str]:
+    """Solutions of the test client's current game, loaded as a request carrying its session would."""
+    with client.session_transaction() as sess:
+        session_state = dict(sess)
+    with app_module.app.test_request_context():
+        app_module.session.update(session_state)
+        puzzle, _ = app_module.load_game()
+    return list(puzzle['solutions']) if puzzle else []
+
+def run(iterations=50) -> dict:
+    app_module = load_app()
+    readiness = app_module.get_db_readiness()
+    if not readiness.get('ready'):
+        print(f"--- [bench_http] Database not ready ({readiness.get('errors')}), skipping HTTP benchmarks.")
+        return {}
+    client = app_module.app.test_client()
+    results = {}
+
+    def start_game(_):
+        response = client.post('/start_game', json={'selected_lists': LIST_SELECTION})
+        assert response.status_code == 200, response.status_code
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results['http/start_game'] = harness.measure(start_game, iterations=iterations)
+
+        # Guesses alternate between a solution of one game and a miss; once every
+        # solution is found the remaining guesses exercise the "already found" path.
+        start_game(None)
+        solutions = current_solutions(app_module, client) or ['qzqzqz']
+        guesses = ['qzqzqz' if i % 2 else solutions[(i // 2) % len(solutions)] for i in range(iterations * 2 + 5)]
+
+        def guess(word):
+            response = client.post('/guess', json={'guess': word})
+            assert response.status_code == 200, response.status_code
+
+        results['http/guess'] = harness.measure(guess, iterations=iterations * 2, setup=lambda i: guesses[i])
+
+        start_game(None)
+        words = current_solutions(app_module, client) or ['apple']
+        def definition(word):
+            response = client.get(f'/definition/{word}')
+            assert response.status_code in (200, 404), response.status_code
+
+        # Cold: every word is new to the cache (local table or one stub API call)
+        cold_words = [f"{words[i % len(words)]}{'s' * (i // len(words))}" for i in range(iterations + 5)]
+        results['http/definition_cold'] = harness.measure(definition, iterations=iterations,
+                                                          setup=lambda i: cold_words[i], trace_memory=False)
+        results['http/definition_cached'] = harness.measure(definition, iterations=iterations,
+                                                            setup=lambda i: cold_words[i])
+    return results
@@ -0,0 +1,64 @@
+# benchmarks/compare.py
+# Compares two result files from benchmarks.run and flags regressions:
+#   python -m benchmarks.compare bench-results/main.json bench-results/HEAD.json --threshold 10
+# Exits 1 if any benchmark's p50 (or peak memory) got worse by more than the threshold.
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks import harness # noqa: E402
+
+COMPARED_METRICS = ('p50_ms', 'p99_ms', 'peak_memory_kib')
+GATING_METRICS = ('p50_ms', 'peak_memory_kib') # p99 is too noisy on shared machines to fail a run on
+
+def change_percent(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+def compare(baseline: dict, candidate: dict, threshold: float):
+    """Returns (rows, regressions); each row is (benchmark, metric, before, after, change %)."""
+    rows, regressions = [], []
+    for name in sorted(set(baseline) | set(candidate)):
+        before, after = baseline.get(name, {}), candidate.get(name, {})
+        for metric in COMPARED_METRICS:
+            change = change_percent(before.get(metric), after.get(metric))
+            if before.get(metric) is None and after.get(metric) is None:
+                continue
+            rows.append((name, metric, before.get(metric), after.get(metric), change))
+            if metric in GATING_METRICS and change is not None and change > threshold:
+                regressions.append((name, metric, change))
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = harness.load_results(args.baseline), harness.load_results(args.candidate)
+    print(f"Baseline:  {baseline['environment'].get('git_revision')} ({baseline['environment'].get('timestamp')})")
+    print(f"Candidate: {candidate['environment'].get('git_revision')} ({candidate['environment'].get('timestamp')})")
+    rows, regressions = compare(baseline['results'], candidate['results'], args.threshold)
+
+    width = max([len(row[0]) for row in rows] + [9])
+    print(f"{'benchmark':<{width}}  {'metric':<16}{'before':>12}{'after':>12}{'change':>10}")
+    for name, metric, before, after, change in rows:
+        change_text = f"{change:+.1f}%" if change is not None else "n/a"
+        print(f"{name:<{width}}  {metric:<16}{str(before):>12}{str(after):>12}{change_text:>10}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0f}%:")
+        for name, metric, change in regressions:
+            print(f"  {name} {metric} {change:+.1f}%")
+        return 1
+    print(f"\nNo regressions above {args.threshold:.0f}%.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/harness.py
+# Timing, percentile and memory helpers shared by the benchmark suites, plus the
+# JSON result format.
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(sorted_values, fraction):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(durations, extra=None) -> dict:
+    """Throughput and latency percentiles (milliseconds) for a list of durations in seconds."""
+    ordered = sorted(durations)
+    total = sum(ordered)
+    summary = {
+        'iterations': len(ordered),
+        'total_s': round(total, 6),
+        'ops_per_s': round(len(ordered) / total, 2) if total else None,
+        'mean_ms': round(total / len(ordered) * 1000, 4) if ordered else None,
+    }
+    for name, fraction in (('p50_ms', 0.50), ('p90_ms', 0.90), ('p99_ms', 0.99)):
+        value = percentile(ordered, fraction)
+        summary[name] = round(value * 1000, 4) if value is not None else None
+    summary['max_ms'] = round(ordered[-1] * 1000, 4) if ordered else None
+    if extra:
+        summary.update(extra)
+    return summary
+
+def measure(func, iterations=100, warmup=5, setup=None, trace_memory=True) -> dict:
+    """
+    Calls func(arg) `iterations` times after `warmup` untimed calls, where arg is
+    setup(i) (or None). Peak memory is measured in a separate traced pass so
+    tracemalloc's overhead doesn't skew the timings.
+    """
+    args = [setup(i) if setup else None for i in range(warmup + iterations)]
+    for i in range(warmup):
+        func(args[i])
+    durations = []
+    for arg in args[warmup:]:
+        start = time.perf_counter()
+        func(arg)
+        durations.append(time.perf_counter() - start)
+    extra = {}
+    if trace_memory:
+        extra['peak_memory_kib'] = peak_memory_kib(lambda: func(args[-1]))
+    return summarize(durations, extra)
+
+def measure_once(func, trace_memory=True) -> dict:
+    """Single timed call (for expensive operations such as a full database build)."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    extra = {'peak_memory_kib': peak_memory_kib(func)} if trace_memory else {}
+    return summarize([elapsed], extra)
+
+def peak_memory_kib(func) -> float:
+    """Peak Python heap allocated while running func, in KiB."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return round(max(0, peak - baseline) / 1024, 1)
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment() -> dict:
+    return {
+        'git_revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+def save_results(path, results: dict, config: dict):
+    """Writes {'environment', 'config', 'results'} as JSON. results maps benchmark name -> summary."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'config': config, 'results': results}, f, indent=2, sort_keys=True)
+    print(f"Results written to {path}")
+
+def load_results(path) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def print_table(results: dict):
+    columns = ('iterations', 'ops_per_s', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'peak_memory_kib')
+    width = max([len(name) for name in results] + [9])
+    print(f"{'benchmark':<{width}}  " + "  ".join(f"{c:>15}" for c in columns))
+    for name, summary in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{str(summary.get(c, '')):>15}" for c in columns))
@@ -0,0 +1,62 @@
+# benchmarks/lexicon.py
+# Deterministic synthetic word lists (10k-5M words) and throwaway databases
+# built from them, so engine timings can be compared across lexicon sizes.
+import contextlib
+import io
+import os
+import random
+
+import database_setup
+import lexicon_file
+
+# Approximate English letter frequencies (percent), so letter sets and solution
+# counts behave roughly like a real lexicon
+LETTER_WEIGHTS = {
+    'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7, 's': 6.3, 'h': 6.1, 'r': 6.0,
+    'd': 4.3, 'l': 4.0, 'c': 2.8, 'u': 2.8, 'm': 2.4, 'w': 2.4, 'f': 2.2, 'g': 2.0, 'y': 2.0,
+    'p': 1.9, 'b': 1.5, 'v': 1.0, 'k': 0.8, 'j': 0.2, 'x': 0.2, 'q': 0.1, 'z': 0.1,
+}
+LENGTH_WEIGHTS = {4: 8, 5: 12, 6: 15, 7: 16, 8: 15, 9: 12, 10: 9, 11: 6, 12: 4, 13: 2, 14: 1}
+
+def synthetic_words(count: int, seed: int = 0) -> list[str]:
+    """`count` distinct pseudo-words drawn with English-like letter and length distributions."""
+    rng = random.Random(seed)
+    letters, letter_weights = zip(*LETTER_WEIGHTS.items())
+    lengths, length_weights = zip(*LENGTH_WEIGHTS.items())
+    words = set()
+    while len(words) < count:
+        batch = min(100_000, count - len(words))
+        for length in rng.choices(lengths, length_weights, k=batch):
+            words.add("".join(rng.choices(letters, letter_weights, k=length)))
+    return sorted(words)[:count]
+
+def write_word_list(path, words):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(words))
+        f.write("\n")
+
+def build_database(words_path, db_path, list_type='csw21', quiet=True):
+    """Builds a database holding one word list with init_db (removing any old file first)."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        database_setup.init_db(db_path, sources={list_type: [words_path]})
+    return db_path
+
+def prepare_synthetic(size: int, work_dir: str, seed: int = 0):
+    """Returns (words_path, db_path) for a synthetic lexicon, building them if missing."""
+    os.makedirs(work_dir, exist_ok=True)
+    words_path = os.path.join(work_dir, f"synthetic_{size}_{seed}.txt")
+    db_path = os.path.join(work_dir, f"synthetic_{size}_{seed}.db")
+    if not os.path.exists(words_path):
+        write_word_list(words_path, synthetic_words(size, seed))
+    if not os.path.exists(db_path):
+        build_database(words_path, db_path)
+    ensure_lexicon_file(db_path)
+    return words_path, db_path
+
+def ensure_lexicon_file(db_path):
+    """Writes the mmap lexicon for a database cached before init_db produced one."""
+    if not os.path.exists(lexicon_file.lexicon_path(db_path)):
+        database_setup.build_lexicon_file(db_path)
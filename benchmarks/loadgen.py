@@ -0,0 +1,290 @@
+# benchmarks/loadgen.py
+# Multi-user load generator for the game API. Each simulated player runs real
+# sessions over HTTP (cookies included): /get_dictionary_options, /start_game with
+# a random list selection, then a stream of /guess calls mixing valid, invalid and
+# duplicate words, with occasional /definition lookups.
+#   python -m benchmarks.loadgen --serve --players 20 --duration 60
+#   python -m benchmarks.loadgen --url http://127.0.0.1:5001 --players 50 --out load-results/HEAD.json
+# --serve runs the app in-process on a threaded server with the stub dictionary API;
+# against an external app, point its DICTIONARY_API_URL at scripts/stub_dictionary_api.py.
+import argparse
+import os
+import random
+import sqlite3
+import string
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import requests # noqa: E402
+
+import spelling_bee # noqa: E402
+from benchmarks import harness # noqa: E402
+
+ENDPOINTS = ('get_dictionary_options', 'start_game', 'guess', 'definition')
+MANDATORY_LIST = 'csw21'
+
+
+class SolutionOracle:
+    """
+    Answers "which words solve this puzzle?" from a local copy of the lexicon, so
+    players can submit valid guesses without the server revealing its solutions.
+    Words are indexed by letter mask: a puzzle is 64 dictionary lookups.
+    """
+
+    def __init__(self, db_path):
+        self.words_by_mask = {}
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+        try:
+            self.list_bits = {list_type: 1 << list_id for list_type, list_id in conn.execute("SELECT list_type, list_id FROM lists")}
+            for word, letter_mask, list_mask in conn.execute("SELECT word, letter_mask, list_mask FROM words WHERE length >= ?",
+                                                             (spelling_bee.MIN_WORD_LENGTH,)):
+                self.words_by_mask.setdefault(letter_mask, []).append((word, list_mask))
+        finally:
+            conn.close()
+
+    def solutions(self, letters, center_letter, list_types) -> list[str]:
+        active = sum(self.list_bits.get(list_type, 0) for list_type in set(list_types))
+        words = set()
+        for mask in spelling_bee.candidate_letter_masks(set(letters), center_letter):
+            words.update(word for word, list_mask in self.words_by_mask.get(mask, ()) if list_mask & active)
+        return sorted(words)
+
+
+class LoadStats:
+    """Thread-safe per-endpoint latencies, status codes and guess outcomes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self.errors = dict.fromkeys(ENDPOINTS, 0)
+        self.statuses = {endpoint: {} for endpoint in ENDPOINTS}
+        self.guess_outcomes = {}
+        self.sessions = 0
+
+    def record(self, endpoint, seconds, status):
+        """status is the HTTP status code, or None for a connection error/timeout."""
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            label = str(status) if status is not None else 'connection_error'
+            self.statuses[endpoint][label] = self.statuses[endpoint].get(label, 0) + 1
+            if status is None or status >= 400:
+                self.errors[endpoint] += 1
+
+    def outcome(self, name):
+        with self._lock:
+            self.guess_outcomes[name] = self.guess_outcomes.get(name, 0) + 1
+
+    def session_finished(self):
+        with self._lock:
+            self.sessions += 1
+
+    def report(self, wall_seconds) -> dict:
+        """benchmarks.harness summaries keyed 'load/<endpoint>' plus 'load/all'."""
+        with self._lock:
+            results = {}
+            all_latencies, all_errors = [], 0
+            for endpoint in ENDPOINTS:
+                durations = self.latencies[endpoint]
+                all_latencies.extend(durations)
+                all_errors += self.errors[endpoint]
+                if durations:
+                    results[f"load/{endpoint}"] = self._summary(durations, self.errors[endpoint], wall_seconds,
+                                                                statuses=dict(self.statuses[endpoint]))
+            if all_latencies:
+                results['load/all'] = self._summary(all_latencies, all_errors, wall_seconds,
+                                                    sessions=self.sessions, guess_outcomes=dict(self.guess_outcomes))
+            return results
+
+    @staticmethod
+    def _summary(durations, errors, wall_seconds, **extra):
+        # ops_per_s from harness.summarize is serial throughput; requests_per_s is what the server sustained
+        return harness.summarize(durations, dict(extra,
+            requests_per_s=round(len(durations) / wall_seconds, 2) if wall_seconds else None,
+            errors=errors,
+            error_rate=round(errors / len(durations), 4)))
+
+
+class Player:
+    """One simulated user with its own cookie jar, looping over game sessions until `deadline`."""
+
+    def __init__(self, player_id, base_url, oracle, stats, options, deadline):
+        self.rng = random.Random(options.seed * 100_003 + player_id)
+        self.base_url = base_url.rstrip('/')
+        self.oracle = oracle
+        self.stats = stats
+        self.options = options
+        self.deadline = deadline
+        self.http = requests.Session()
+
+    def call(self, endpoint, method, path, **kwargs):
+        """Timed request; returns the decoded JSON body, or None on any failure."""
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=self.options.timeout, **kwargs)
+        except requests.RequestException:
+            self.stats.record(endpoint, time.perf_counter() - start, None)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - start, response.status_code)
+        if response.status_code >= 400:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def think(self):
+        if self.options.think_time > 0:
+            time.sleep(self.rng.uniform(0, 2 * self.options.think_time))
+
+    def random_invalid_guess(self, letters, center_letter):
+        """Uses the puzzle's letters (so most reach the dictionary check), sometimes a foreign letter."""
+        length = self.rng.randint(4, 8)
+        word = [center_letter] + [self.rng.choice(letters) for _ in range(length - 1)]
+        if self.rng.random() < 0.2:
+            word[self.rng.randrange(1, length)] = self.rng.choice(string.ascii_lowercase)
+        self.rng.shuffle(word)
+        return "".join(word)
+
+    def play_session(self):
+        options = self.call('get_dictionary_options', 'GET', '/get_dictionary_options')
+        available = [option['id'] for option in (options or {}).get('options', []) if option.get('optional')]
+        selected = [MANDATORY_LIST] + [list_type for list_type in available if self.rng.random() < 0.5]
+        self.think()
+
+        game = self.call('start_game', 'POST', '/start_game', json={'selected_lists': selected})
+        if not game or not game.get('success'):
+            return
+        letters = [letter.lower() for letter in game['all_letters']]
+        center_letter = game['center_letter'].lower()
+        unfound = self.oracle.solutions(letters, center_letter, selected) if self.oracle else []
+        self.rng.shuffle(unfound)
+        found = []
+
+        for _ in range(self.options.guesses):
+            if time.monotonic() >= self.deadline:
+                break
+            self.think()
+            roll = self.rng.random()
+            if roll < self.options.duplicate_ratio and found:
+                kind, word = 'duplicate', self.rng.choice(found)
+            elif roll < self.options.duplicate_ratio + self.options.valid_ratio and unfound:
+                kind, word = 'valid', unfound.pop()
+            else:
+                kind, word = 'invalid', self.random_invalid_guess(letters, center_letter)
+
+            answer = self.call('guess', 'POST', '/guess', json={'guess': word})
+            if answer is None:
+                continue
+            if kind == 'valid':
+                if answer.get('valid'):
+                    found.append(word)
+                    self.stats.outcome('valid')
+                else:
+                    # The server forgot the game or disagrees with the lexicon - a session handling bug
+                    self.stats.outcome('valid_rejected')
+            elif kind == 'duplicate':
+                self.stats.outcome('duplicate' if answer.get('message') == 'Already found!' else 'duplicate_not_detected')
+            elif answer.get('valid'):
+                # A random guess that happens to be a real word
+                found.append(word)
+                if word in unfound:
+                    unfound.remove(word)
+                self.stats.outcome('random_word_valid')
+            else:
+                self.stats.outcome('invalid')
+
+            if kind == 'valid' and answer.get('valid') and self.rng.random() < self.options.definition_ratio:
+                self.call('definition', 'GET', f"/definition/{word}")
+        self.stats.session_finished()
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            self.play_session()
+
+
+def serve_app():
+    """Starts api/index.py (with the stub dictionary API) on a free local port; returns (server, base_url, db_path)."""
+    from werkzeug.serving import make_server
+    from benchmarks import bench_http
+    app_module = bench_http.load_app()
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", app_module.DATABASE_PATH
+
+def run(base_url, db_path, options) -> dict:
+    oracle = None
+    if db_path and os.path.exists(db_path):
+        oracle = SolutionOracle(db_path)
+        print(f"--- [loadgen] Lexicon loaded from {db_path} ({len(oracle.words_by_mask):,} letter masks).")
+    else:
+        print(f"--- [loadgen] No database at {db_path}; every guess will be invalid.")
+
+    stats = LoadStats()
+    start = time.monotonic()
+    deadline = start + options.ramp_up + options.duration
+    threads = []
+    for player_id in range(options.players):
+        player = Player(player_id, base_url, oracle, stats, options, deadline)
+        threads.append(threading.Thread(target=player.run, name=f"player-{player_id}", daemon=True))
+    print(f"--- [loadgen] {options.players} players against {base_url} for {options.duration:g}s "
+          f"(+{options.ramp_up:g}s ramp-up)...")
+    for i, thread in enumerate(threads):
+        # Spread player starts evenly over the ramp-up period
+        if options.ramp_up and i:
+            time.sleep(options.ramp_up / options.players)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.report(time.monotonic() - start)
+
+def print_report(results: dict):
+    columns = ('iterations', 'requests_per_s', 'error_rate', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')
+    width = max([len(name) for name in results] + [9])
+    print(f"{'endpoint':<{width}}  " + "  ".join(f"{c:>15}" for c in columns))
+    for name, summary in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{str(summary.get(c, '')):>15}" for c in columns))
+    overall = results.get('load/all', {})
+    if overall:
+        print(f"\nSessions: {overall['sessions']}, guess outcomes: {overall['guess_outcomes']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent players against the game API.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default='http://127.0.0.1:5001', help="Base URL of a running app")
+    target.add_argument('--serve', action='store_true', help="Run the app in-process instead (stub dictionary API)")
+    parser.add_argument('--db', default=os.path.join(PROJECT_ROOT, 'word_database.db'),
+                        help="Database the app serves from; used to pick valid guesses")
+    parser.add_argument('--players', type=int, default=10, help="Concurrent simulated players")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of load after ramp-up")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Seconds over which players are started")
+    parser.add_argument('--guesses', type=int, default=40, help="Guesses per game session")
+    parser.add_argument('--valid-ratio', type=float, default=0.5, help="Fraction of guesses that are solutions")
+    parser.add_argument('--duplicate-ratio', type=float, default=0.1, help="Fraction of guesses repeating a found word")
+    parser.add_argument('--definition-ratio', type=float, default=0.1, help="Chance of a /definition call after a find")
+    parser.add_argument('--think-time', type=float, default=0, help="Mean seconds between a player's requests")
+    parser.add_argument('--timeout', type=float, default=10, help="Per-request timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write JSON results (benchmarks.compare format) to this path")
+    options = parser.parse_args(argv)
+
+    base_url, db_path = options.url, options.db
+    if options.serve:
+        _, base_url, db_path = serve_app()
+    results = run(base_url, db_path, options)
+
+    print_report(results)
+    if options.out:
+        config = {name: getattr(options, name) for name in
+                  ('players', 'duration', 'ramp_up', 'guesses', 'valid_ratio', 'duplicate_ratio',
+                   'definition_ratio', 'think_time', 'seed')}
+        config['target'] = 'in-process' if options.serve else base_url
+        harness.save_results(options.out, results, config)
+    return 1 if any(summary['errors'] for summary in results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
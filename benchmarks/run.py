@@ -0,0 +1,57 @@
+# benchmarks/run.py
+# Command-line entry point:
+#   python -m benchmarks.run                                  # engine + http, 10k/100k synthetic lexicons
+#   python -m benchmarks.run --suite engine --sizes 10000,1000000,5000000 --engines sql,numpy,mmap
+#   python -m benchmarks.run --out bench-results/$(git rev-parse --short HEAD).json
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks import harness # noqa: E402
+
+def parse_sizes(value: str) -> list[int]:
+    sizes = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        multiplier = {'k': 1_000, 'm': 1_000_000}.get(part[-1], 1)
+        sizes.append(int(float(part.rstrip('km')) * multiplier))
+    return sizes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the spelling bee benchmarks.")
+    parser.add_argument('--suite', default='engine,http', help="Comma-separated suites: engine, http")
+    parser.add_argument('--sizes', default='10k,100k', help="Synthetic lexicon sizes, e.g. 10k,1m,5m ('' for none)")
+    parser.add_argument('--engines', default='sql,numpy,mmap', help="Solver engines to compare")
+    parser.add_argument('--iterations', type=int, default=50, help="Timed iterations per benchmark")
+    parser.add_argument('--no-real', action='store_true', help="Skip the real csw21_filtered.txt lexicon")
+    parser.add_argument('--seed', type=int, default=0, help="Synthetic lexicon seed")
+    parser.add_argument('--work-dir', default=os.path.join(PROJECT_ROOT, '.bench-cache'),
+                        help="Where generated lexicons and databases are kept between runs")
+    parser.add_argument('--out', help="Write JSON results to this path")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.suite.split(',') if s.strip()]
+    config = {'suites': suites, 'sizes': parse_sizes(args.sizes), 'engines': args.engines.split(','),
+              'iterations': args.iterations, 'real_lexicon': not args.no_real, 'seed': args.seed}
+    results = {}
+    if 'engine' in suites:
+        from benchmarks import bench_engine
+        results.update(bench_engine.run(config['sizes'], engines=config['engines'], iterations=args.iterations,
+                                        work_dir=args.work_dir, include_real=not args.no_real, seed=args.seed))
+    if 'http' in suites:
+        from benchmarks import bench_http
+        results.update(bench_http.run(iterations=args.iterations))
+
+    harness.print_table(results)
+    if args.out:
+        harness.save_results(args.out, results, config)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
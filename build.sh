@@ -8,5 +8,9 @@ echo "Dependencies installed."
 # Use python3.12 explicitly as we know it works
 python3.12 -m flask init-db
 echo "Database initialized."
+python3.12 -m flask build-puzzles
+echo "Puzzle catalog built."
+python3.12 -m flask optimize-db
+echo "Database optimized for read-only serving."
 # No need to output anything else, @vercel/python will handle the rest if 'builds' is removed
 echo "Build script finished." 
\ No newline at end of file
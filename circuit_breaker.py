@@ -0,0 +1,87 @@
+# circuit_breaker.py
+# Thread-safe circuit breaker for calls to an unreliable upstream service.
+import collections
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of the last `window` calls. Once at least `min_calls` are
+    recorded and the failure ratio reaches `failure_ratio`, the breaker opens and
+    allow() fails fast for `cooldown` seconds. After that a single probe call is
+    let through (half-open): success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, window=20, min_calls=10, failure_ratio=0.5, cooldown=30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self._outcomes = collections.deque(maxlen=window) # True = failure
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.opened_count = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may proceed now; counts the call as short-circuited otherwise."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record(self, success: bool):
+        """Records the outcome of an allowed call."""
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+            self._outcomes.append(not success)
+            failures = sum(self._outcomes)
+            if (state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_ratio):
+                self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened_count += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            outcomes = len(self._outcomes)
+            return {
+                'state': self._current_state(),
+                'recent_calls': outcomes,
+                'recent_failure_ratio': round(sum(self._outcomes) / outcomes, 4) if outcomes else None,
+                'opened_count': self.opened_count,
+                'short_circuited': self.short_circuited,
+            }
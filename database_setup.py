@@ -4,6 +4,15 @@ import sys
 import sqlite3
 import csv
 import re
+import json
+import time
+import hashlib
+import itertools
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import lexicon_file
+from spelling_bee import VOWEL_MASK, encode_word_ids, letter_set_key, normalize_word, word_columns
 
 MIN_WORD_LENGTH_SETUP = 4 # Use a distinct constant name during setup
 # Regex for validating letters, including common macrons
@@ -19,167 +28,278 @@ SOURCE_FILES_BY_TYPE = {
 }
 # < -----------------------------------------
 
-def init_db(db_path='word_database.db'): # Keep default for direct script running
-    """Initializes the SQLite database and populates it with words from CSV files."""
+# --- Puzzle catalog settings ---
+MANDATORY_LIST_TYPE = 'csw21' # Always part of a game (see /start_game)
+CATALOG_MIN_WORDS = 15  # Reject puzzles with fewer solutions than this
+CATALOG_MAX_WORDS = 500 # ...or more solutions than this
+CATALOG_CHUNK_SIZE = 500 # Letter sets per worker task
+
+# --- Schema version and readiness ---
+SCHEMA_VERSION = 5 # Stored in PRAGMA user_version; bump whenever the schema changes
+READY_MIN_WORDS = int(os.environ.get('READY_MIN_WORDS', '1000')) # Fewer words than this means a broken build
+
+MAX_LISTS = 62 # Bits available in words.list_mask (a signed 64-bit integer)
+
+# --- Read-only deploy artifact (see optimize_database) ---
+APPLICATION_ID = 0x53424E5A # 'SBNZ', stored in PRAGMA application_id: marks the file as this app's database
+ARTIFACT_PAGE_SIZE = int(os.environ.get('DB_ARTIFACT_PAGE_SIZE', '16384')) # Page size the artifact is vacuumed into
+
+# --- Incremental ingest settings ---
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+INGEST_CHUNK_SIZE = 5000 # Rows per executemany batch when applying a diff
+
+def read_source_rows(filepath):
+    """
+    Yields (word, definition) for every valid word in a source file.
+    TXT files hold one word per line; CSV files are tab-delimited with the word
+    in the first column and an optional definition in the second.
+    Raises FileNotFoundError if the file is missing.
+    """
+    # Simple check for file extension - adjust logic if needed
+    is_csv = filepath.lower().endswith('.csv')
+
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as infile:
+        if is_csv:
+            # Use csv reader with tab delimiter - assuming no header row
+            rows_to_process = csv.reader(infile, delimiter='\t')
+        else: # Assume TXT file (one word per line)
+            rows_to_process = ([line.strip()] for line in infile)
+
+        for row_num, row in enumerate(rows_to_process):
+            if not row or not row[0]: continue # Skip empty/malformed rows
+            try:
+                word = row[CSV_WORD_COLUMN_INDEX].strip().lower()
+                definition = row[1].strip() if is_csv and len(row) > 1 and row[1] else None
+
+                # Basic quote handling for CSV definitions
+                if definition and definition.startswith('"') and definition.endswith('"'):
+                    definition = definition[1:-1].replace('""', '"')
+
+                if len(word) >= MIN_WORD_LENGTH_SETUP and VALID_CHARS_RE_SETUP.match(word):
+                    yield word, definition
+            except Exception as e:
+                print(f"Warning: Error processing row {row_num+1} in {filepath}. Skipping row. Error: {e} Row: {row}", file=sys.stderr)
+
+def create_schema(cursor):
+    """Creates the lists, words and definitions tables (without secondary indexes)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lists (
+            list_id INTEGER PRIMARY KEY, -- Bit position in words.list_mask
+            list_type TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS words (
+            word_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            word TEXT NOT NULL, -- Display form; keeps macrons if any source spells it with them
+            normalized_word TEXT NOT NULL UNIQUE, -- Lowercase, macrons folded (what guesses are matched against)
+            list_mask INTEGER NOT NULL, -- Bit list_id set = word is in that list (see lists)
+            letter_mask INTEGER NOT NULL, -- 26-bit mask of the normalized letters (bit 0 = 'a')
+            distinct_letter_count INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS definitions (
+            definition_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            word_id INTEGER NOT NULL,
+            list_id INTEGER NOT NULL, -- List whose source supplied the definition
+            definition_text TEXT NOT NULL,
+            FOREIGN KEY(word_id) REFERENCES words(word_id) ON DELETE CASCADE,
+            FOREIGN KEY(list_id) REFERENCES lists(list_id)
+        )
+    ''')
+    create_manifest_table(cursor)
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+    cursor.execute(f"PRAGMA application_id = {APPLICATION_ID};")
+
+def load_list_bits(cursor) -> dict:
+    """{list_type: bit in words.list_mask} for every registered list, in registration order."""
+    return {list_type: 1 << list_id
+            for list_type, list_id in cursor.execute("SELECT list_type, list_id FROM lists ORDER BY list_id")}
+
+def register_lists(cursor, list_types) -> dict:
+    """
+    Adds any new list types to the lists registry (taking the next free bit) and
+    returns {list_type: bit} for every registered list. Adding a list is a data
+    change - no schema change needed.
+    """
+    registered = dict(cursor.execute("SELECT list_type, list_id FROM lists"))
+    for list_type in list_types:
+        if list_type not in registered:
+            list_id = max(registered.values(), default=-1) + 1
+            if list_id >= MAX_LISTS:
+                raise ValueError(f"Cannot register '{list_type}': at most {MAX_LISTS} word lists")
+            cursor.execute("INSERT INTO lists (list_id, list_type) VALUES (?, ?)", (list_id, list_type))
+            registered[list_type] = list_id
+    return load_list_bits(cursor)
+
+def preferred_display_form(current: str, candidate: str) -> str:
+    """Of two spellings with the same normalized form, keeps the one with macrons."""
+    return candidate if candidate != normalize_word(candidate) and current == normalize_word(current) else current
+
+def create_manifest_table(cursor):
+    """Records what each source file looked like when it was last ingested."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_manifest (
+            source_path TEXT PRIMARY KEY, -- Relative to the project root
+            list_type TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,   -- Valid words read from the file
+            ingested_at REAL NOT NULL
+        )
+    ''')
+
+def create_indexes(cursor):
+    """Creates secondary indexes. Run after bulk loading - building them once is far cheaper."""
+    # Index on word_id is created automatically for PRIMARY KEY
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_word_text ON words (word);") # Index on the word text itself
+    # Solver subset lookups; covers every column _fetch_words_by_letter_mask reads, so it never touches the table
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_letter_mask ON words "
+                   "(letter_mask, list_mask, length, distinct_letter_count, normalized_word, word);")
+    # FK lookups; includes the text so definition lookups are index-only
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_definition_word_id ON definitions (word_id, definition_text);")
+
+# The derived columns come from spelling_bee.word_columns
+WORD_INSERT_SQL = '''
+    INSERT INTO words (word_id, word, list_mask, normalized_word, letter_mask, distinct_letter_count, length)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+def init_db(db_path='word_database.db', sources=None): # Keep default for direct script running
+    """
+    Builds the SQLite database from `sources` ({list_type: [paths]}, default
+    SOURCE_FILES_BY_TYPE) in bulk:
+    words are read and deduplicated in memory (one row per normalized word, with
+    a bitmask of the lists containing it), loaded with executemany in a single
+    transaction (journaling and sync relaxed), then indexed, analyzed and vacuumed.
+    """
     # Determine the directory where this script *runs from* during build (project root)
     project_root = os.getcwd() 
 
     print(f"Initializing database at: {db_path}")
     print(f"Executing from CWD: {project_root}") # Log CWD for confirmation
 
+    stage_timings = {}
+    stage_start = time.time()
+    def end_stage(name):
+        nonlocal stage_start
+        now = time.time()
+        stage_timings[name] = now - stage_start
+        stage_start = now
+
     conn = None
     try:
+        # --- Stage 1: Read and dedupe all sources in memory ---
+        sources = sources or SOURCE_FILES_BY_TYPE
+        if len(sources) > MAX_LISTS:
+            raise ValueError(f"At most {MAX_LISTS} word lists are supported")
+        list_bits = {list_type: 1 << list_id for list_type, list_id in zip(sources, itertools.count())}
+        words_by_key = {} # normalized_word -> [word_id, display word, list_mask]
+        definition_rows = [] # (word_id, list_id, definition_text)
+        manifest_rows = [] # One per source file read
+        total_words_processed = 0
+
+        for list_type, filepaths in sources.items():
+            if not isinstance(filepaths, list):
+                filepaths = [filepaths]
+            list_bit = list_bits[list_type]
+
+            for filepath in filepaths:
+                print(f"Processing {filepath} for list type '{list_type}'...")
+                words_in_file = 0
+                words_added_from_file = 0
+                try:
+                    for word, definition in read_source_rows(filepath):
+                        words_in_file += 1
+                        entry = words_by_key.get(normalize_word(word))
+                        if entry is None:
+                            entry = words_by_key[normalize_word(word)] = [len(words_by_key) + 1, word, 0]
+                        else:
+                            entry[1] = preferred_display_form(entry[1], word)
+                        if not entry[2] & list_bit:
+                            entry[2] |= list_bit
+                            words_added_from_file += 1
+                        if definition:
+                            definition_rows.append((entry[0], list_bit.bit_length() - 1, definition))
+                    print(f"  -> Processed {words_in_file} valid words, Added {words_added_from_file} new unique words as '{list_type}'.")
+                    total_words_processed += words_in_file
+                    manifest_rows.append(_manifest_row(filepath, list_type, words_in_file))
+                except FileNotFoundError:
+                    print(f"Error: Input file not found at '{filepath}'. Skipping.", file=sys.stderr)
+                except Exception as e:
+                    print(f"Error reading or processing file {filepath}: {e}", file=sys.stderr)
+        end_stage('read_sources')
+
+        # --- Stage 2: Recreate schema ---
         # Ensure the directory for the database exists (e.g., api/)
         db_dir = os.path.dirname(db_path)
         if db_dir and not os.path.exists(db_dir): # Create DB directory if db_path includes one and it doesn't exist
              os.makedirs(db_dir, exist_ok=True)
              print(f"Ensured directory exists: {db_dir}")
-        
+
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
+        # The build is all-or-nothing, so durability during the load buys nothing
+        cursor.execute("PRAGMA journal_mode = OFF;")
+        cursor.execute("PRAGMA synchronous = OFF;")
+        cursor.execute("PRAGMA temp_store = MEMORY;")
+        cursor.execute("PRAGMA cache_size = -65536;") # 64 MiB
 
-        # --- NEW: Drop table first to ensure schema changes apply ---
-        print("Dropping existing 'words' and 'definitions' tables (if they exist)...")
+        print("Dropping existing 'words', 'lists', 'definitions', 'pangrams' and 'puzzles' tables (if they exist)...")
+        cursor.execute("DROP TABLE IF EXISTS build_info;") # Stamp of an optimized artifact; no longer describes the data
+        drop_puzzle_catalog(cursor)
+        cursor.execute("DROP TABLE IF EXISTS pangram_ranges;")
+        cursor.execute("DROP TABLE IF EXISTS pangrams;")
         cursor.execute("DROP TABLE IF EXISTS definitions;")
         cursor.execute("DROP TABLE IF EXISTS words;")
-        conn.commit() # Commit the drop before recreating
-        print("Tables dropped.")
-        # --- END NEW ---
-
-        # Create table words
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS words (
-                word_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                word TEXT NOT NULL,
-                list_type TEXT NOT NULL CHECK(list_type IN ('csw21', 'te_reo', 'nz_slang')),
-                UNIQUE(word, list_type) -- Prevent duplicate word/list combos
-            )
-        ''')
+        cursor.execute("DROP TABLE IF EXISTS lists;")
+        cursor.execute("DROP TABLE IF EXISTS ingest_manifest;")
+        create_schema(cursor)
+        register_lists(cursor, sources)
         conn.commit()
-        print("Table 'words' created or already exists with new schema.")
-        
-        # Create table definitions
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS definitions (
-                definition_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                word_id INTEGER NOT NULL,
-                definition_text TEXT NOT NULL,
-                FOREIGN KEY(word_id) REFERENCES words(word_id) ON DELETE CASCADE
-            )
-        ''')
+        print("Tables 'lists', 'words' and 'definitions' created.")
+        end_stage('schema')
+
+        # --- Stage 3: Bulk load in one transaction ---
+        cursor.execute("BEGIN;")
+        cursor.executemany(WORD_INSERT_SQL,
+            ((word_id, word, list_mask) + word_columns(word) for word_id, word, list_mask in words_by_key.values()))
+        cursor.executemany("INSERT INTO definitions (word_id, list_id, definition_text) VALUES (?, ?, ?)", definition_rows)
+        cursor.executemany(MANIFEST_UPSERT_SQL, manifest_rows)
         conn.commit()
-        print("Table 'definitions' created or already exists.")
+        print(f"Loaded {len(words_by_key):,} words and {len(definition_rows):,} definitions.")
+        end_stage('load')
 
-        # Create indexes for faster lookups
+        # --- Stage 4: Indexes after the load ---
         print("Creating indexes...")
-        # Index on word_id is created automatically for PRIMARY KEY
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_word_text ON words (word);") # Index on the word text itself
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_list_type ON words (list_type);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_definition_word_id ON definitions (word_id);") # Index for FK lookups
+        create_indexes(cursor)
         conn.commit()
-        print("Indexes created or already exist.")
+        end_stage('indexes')
+
+        # --- Stage 5: Build the pangram index used by choose_letters ---
+        pangram_count = build_pangram_table(conn)
+        print(f"Pangram index built with {pangram_count:,} entries.")
+        end_stage('pangrams')
 
-        # --- Clear existing data from both tables ---
-        print("Clearing existing word data from 'words' and 'definitions' tables...")
-        cursor.execute("DELETE FROM definitions;") # Clear child table first
-        cursor.execute("DELETE FROM words;")
+        # --- Stage 6: Planner statistics and compaction ---
+        cursor.execute("ANALYZE;")
         conn.commit()
-        print("Existing data cleared.")
+        end_stage('analyze')
+        cursor.execute("VACUUM;")
+        end_stage('vacuum')
 
-        # --- Populate table from SOURCE_FILES_BY_TYPE ---
-        total_words_processed = 0
-        total_words_added = 0
-
-        for list_type, filepaths in SOURCE_FILES_BY_TYPE.items():
-            if not isinstance(filepaths, list):
-                filepaths = [filepaths]
-
-            for filepath in filepaths:
-                print(f"Processing {filepath} for list type '{list_type}'...")
-                words_in_file = 0
-                words_added_from_file = 0
-                try:
-                    # Simple check for file extension - adjust logic if needed
-                    is_csv = filepath.lower().endswith('.csv')
-
-                    with open(filepath, 'r', encoding='utf-8', errors='ignore') as infile:
-                        rows_to_process = None # Initialize
-                        if is_csv:
-                            # Use csv reader with tab delimiter
-                            reader = csv.reader(infile, delimiter='\t')
-                            # Skip header row if necessary - assuming tereo_cleaned.csv has no header now
-                            # next(reader, None) 
-                            rows_to_process = enumerate(reader)
-                        else: # Assume TXT file (one word per line)
-                            lines = (line.strip() for line in infile)
-                            valid_lines = filter(None, lines)
-                            # Wrap each line in a list containing the word and None for definition
-                            rows_to_process = enumerate([[line, None] for line in valid_lines])
-
-                        # Process rows uniformly
-                        rows_iterated_count = 0 # Add counter
-                        for row_num, row in rows_to_process:
-                            rows_iterated_count += 1 # Increment counter
-                            if not row or len(row) < 1: continue # Skip empty/malformed rows
-                            try:
-                                word = row[0].strip().lower()
-                                # Definition is already set to None for TXT or is row[1] for CSV
-                                definition = row[1].strip() if is_csv and len(row) > 1 and row[1] else None
-                                
-                                # Basic quote handling for CSV definitions
-                                if definition and definition.startswith('"') and definition.endswith('"'):
-                                    definition = definition[1:-1].replace('""', '"')
-                                    
-                                # Validate word and insert/update definition
-                                if len(word) >= MIN_WORD_LENGTH_SETUP and VALID_CHARS_RE_SETUP.match(word):
-                                    words_in_file += 1
-                                    current_word_id = None # Reset for each word
-                                    
-                                    # 1. Check if word/list_type combo already exists
-                                    cursor.execute("SELECT word_id FROM words WHERE word = ? AND list_type = ?", (word, list_type))
-                                    result = cursor.fetchone()
-                                    
-                                    if result:
-                                        # Word exists, use its ID
-                                        current_word_id = result[0]
-                                    else:
-                                        # Word doesn't exist for this list_type, insert it
-                                        cursor.execute("INSERT INTO words (word, list_type) VALUES (?, ?)", 
-                                                       (word, list_type))
-                                        if cursor.rowcount > 0:
-                                            words_added_from_file += 1
-                                            current_word_id = cursor.lastrowid # Get ID of the newly inserted word
-                                        else:
-                                            # Should not happen if SELECT failed and INSERT failed, but handle defensively
-                                            print(f"Error: Failed to insert new word AND could not find existing word: {word}", file=sys.stderr)
-                                            continue # Skip this word
-                                            
-                                    # 2. Insert definition if it exists and we have a valid word_id
-                                    if definition and current_word_id:
-                                        cursor.execute("INSERT INTO definitions (word_id, definition_text) VALUES (?, ?)",
-                                                       (current_word_id, definition))
-                                        
-                            except IndexError:
-                                print(f"Warning: Row {row_num+1} in {filepath} seems empty or malformed. Skipping row: {row}", file=sys.stderr)
-                            except Exception as e:
-                                print(f"Warning: Error processing row {row_num+1} in {filepath}. Skipping row. Error: {e} Row: {row}", file=sys.stderr)
-
-                    # --- Remove DEBUGGING PRINT for iterated count ---
-                    # if list_type == 'te_reo':
-                    #      print(f"  -> [DEBUG] Total rows iterated for {filepath}: {rows_iterated_count}")
-                    # --- End print removal ---
-                    conn.commit() # Commit after each file
-                    print(f"  -> Processed {words_in_file} valid words, Added {words_added_from_file} new unique words as '{list_type}'.")
-                    total_words_processed += words_in_file
-                    total_words_added += words_added_from_file
-                except FileNotFoundError:
-                    print(f"Error: Input file not found at '{filepath}'. Skipping.", file=sys.stderr)
-                except Exception as e:
-                    print(f"Error reading or processing file {filepath}: {e}", file=sys.stderr)
+        # --- Stage 7: Memory-mapped lexicon for SOLVER_ENGINE=mmap ---
+        lexicon_summary = build_lexicon_file(db_path, conn)
+        print(f"Lexicon file written to {lexicon_summary['path']} ({lexicon_summary['bytes']:,} bytes).")
+        end_stage('lexicon_file')
 
         print(f"\nDatabase population complete.")
         print(f"Total valid words processed across all files: {total_words_processed:,}")
-        print(f"Total unique words added to the database: {total_words_added:,}")
+        print(f"Total unique words added to the database: {len(words_by_key):,}")
+        print("Stage timings: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in stage_timings.items()))
+        print(f"Total build time: {sum(stage_timings.values()):.2f}s")
 
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -190,6 +310,583 @@ def init_db(db_path='word_database.db'): # Keep default for direct script runnin
             conn.close()
             print("Database connection closed.")
 
+# --- Incremental Ingest --- START
+MANIFEST_UPSERT_SQL = '''
+    INSERT OR REPLACE INTO ingest_manifest (source_path, list_type, sha256, size_bytes, row_count, ingested_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+def _manifest_key(filepath) -> str:
+    """Stable manifest key for a source file, independent of the caller's CWD."""
+    return os.path.relpath(os.path.abspath(filepath), PROJECT_ROOT)
+
+def file_sha256(filepath) -> str:
+    """Streams a file through SHA-256."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _manifest_row(filepath, list_type, row_count):
+    return (_manifest_key(filepath), list_type, file_sha256(filepath),
+            os.path.getsize(filepath), row_count, time.time())
+
+def _chunks(items, size=INGEST_CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+WORD_UPSERT_SQL = WORD_INSERT_SQL + '''
+    ON CONFLICT(normalized_word) DO UPDATE SET
+        list_mask = list_mask | excluded.list_mask,
+        word = CASE WHEN words.word = words.normalized_word THEN excluded.word ELSE words.word END
+'''
+
+def ingest_list(db_path, list_type, filepaths, force=False, rebuild_lexicon=True) -> dict:
+    """
+    Incrementally brings one list_type in line with its source files.
+    If every file's SHA-256 matches the ingest manifest the list is skipped;
+    otherwise only the difference is applied: added words get the list's bit
+    (inserting rows for words no list had yet), removed words lose it (rows no
+    list contains any more are deleted with their definitions), and the list's
+    definitions are updated in chunks of INGEST_CHUNK_SIZE and the pangram tables
+    rebuilt, all inside one transaction, which also drops the now stale puzzle
+    catalog and refreshes the planner statistics (ANALYZE). A word the list keeps
+    takes the list's spelling if that adds macrons. An unknown list_type is
+    registered. Once applied, the lexicon file is rewritten unless rebuild_lexicon
+    is False (update_db rewrites it once after all lists). Returns a summary dict
+    with 'status' ('skipped', 'applied' or 'error').
+    """
+    summary = {'list_type': list_type, 'status': 'skipped', 'added': 0, 'removed': 0, 'respelled': 0,
+               'definitions_added': 0, 'definitions_removed': 0}
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        create_manifest_table(cursor)
+
+        # 1. Compare file fingerprints with the manifest
+        recorded = {row[0]: row[1] for row in cursor.execute(
+            "SELECT source_path, sha256 FROM ingest_manifest WHERE list_type = ?", (list_type,))}
+        try:
+            current = {_manifest_key(path): file_sha256(path) for path in filepaths}
+        except FileNotFoundError as e:
+            # Never treat a missing file as "every word was removed"
+            print(f"Error: Source file missing for '{list_type}' ({e}). Leaving list unchanged.", file=sys.stderr)
+            summary['status'] = 'error'
+            return summary
+        if current == recorded and not force:
+            print(f"'{list_type}': sources unchanged, skipping.")
+            return summary
+
+        # 2. Read the new contents and diff against the database (by normalized word)
+        new_words = {} # normalized_word -> [display word, {definitions}]
+        manifest_rows = []
+        for path in filepaths:
+            row_count = 0
+            for word, definition in read_source_rows(path):
+                row_count += 1
+                entry = new_words.setdefault(normalize_word(word), [word, set()])
+                entry[0] = preferred_display_form(entry[0], word)
+                if definition:
+                    entry[1].add(definition)
+            manifest_rows.append(_manifest_row(path, list_type, row_count))
+
+        cursor.execute("BEGIN;")
+        list_bit = register_lists(cursor, [list_type])[list_type]
+        list_id = list_bit.bit_length() - 1
+        existing_ids, existing_display = {}, {}
+        for normalized_word, word_id, word in cursor.execute(
+                "SELECT normalized_word, word_id, word FROM words WHERE (list_mask & ?) != 0", (list_bit,)):
+            existing_ids[normalized_word] = word_id
+            existing_display[normalized_word] = word
+        added = sorted(set(new_words) - set(existing_ids))
+        removed_ids = [existing_ids[w] for w in sorted(set(existing_ids) - set(new_words))]
+        # Kept words whose new spelling adds macrons (the upsert only covers added words)
+        respelled = [(new_words[w][0], existing_ids[w]) for w in sorted(set(existing_ids) & set(new_words))
+                     if preferred_display_form(existing_display[w], new_words[w][0]) != existing_display[w]]
+
+        existing_definitions = set(cursor.execute('''
+            SELECT w.normalized_word, d.definition_text FROM definitions d
+            JOIN words w ON d.word_id = w.word_id WHERE d.list_id = ?
+        ''', (list_id,)))
+        new_definitions = {(w, d) for w, (_, defs) in new_words.items() for d in defs}
+        stale_definitions = [(existing_ids[w], list_id, d) for w, d in existing_definitions - new_definitions
+                             if w in new_words]
+
+        # 3. Apply the diff in the same transaction
+        for chunk in _chunks(removed_ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"DELETE FROM definitions WHERE list_id = ? AND word_id IN ({placeholders})", [list_id] + chunk)
+            cursor.execute(f"UPDATE words SET list_mask = list_mask & ~? WHERE word_id IN ({placeholders})", [list_bit] + chunk)
+        for chunk in _chunks(stale_definitions):
+            cursor.executemany("DELETE FROM definitions WHERE word_id = ? AND list_id = ? AND definition_text = ?", chunk)
+        for chunk in _chunks(added):
+            cursor.executemany(WORD_UPSERT_SQL,
+                               [(None, new_words[key][0], list_bit) + word_columns(new_words[key][0]) for key in chunk])
+        for chunk in _chunks(respelled):
+            cursor.executemany("UPDATE words SET word = ? WHERE word_id = ?", chunk)
+
+        word_ids = dict(cursor.execute(
+            "SELECT normalized_word, word_id FROM words WHERE (list_mask & ?) != 0", (list_bit,)))
+        added_definitions = new_definitions - existing_definitions
+        for chunk in _chunks(added_definitions):
+            cursor.executemany("INSERT INTO definitions (word_id, list_id, definition_text) VALUES (?, ?, ?)",
+                               [(word_ids[w], list_id, d) for w, d in chunk])
+
+        for chunk in _chunks(removed_ids):
+            placeholders = ','.join('?' * len(chunk))
+            # Words no list contains any more
+            cursor.execute(f"DELETE FROM definitions WHERE word_id IN ({placeholders}) AND word_id IN "
+                           f"(SELECT word_id FROM words WHERE list_mask = 0)", chunk)
+            cursor.execute(f"DELETE FROM words WHERE word_id IN ({placeholders}) AND list_mask = 0", chunk)
+        # Rebuilt rather than patched so each list_mask's pangram_ids stay consecutive
+        fill_pangram_tables(cursor)
+
+        cursor.execute("DELETE FROM ingest_manifest WHERE list_type = ?", (list_type,))
+        cursor.executemany(MANIFEST_UPSERT_SQL, manifest_rows)
+        cursor.execute("DROP TABLE IF EXISTS build_info;") # Its row counts no longer match
+        drop_puzzle_catalog(cursor)
+        cursor.execute("ANALYZE;") # Planner statistics for the changed tables
+        conn.commit()
+        if rebuild_lexicon:
+            build_lexicon_file(db_path, conn)
+
+        summary.update(status='applied', added=len(added), removed=len(removed_ids), respelled=len(respelled),
+                       definitions_added=len(added_definitions), definitions_removed=len(stale_definitions))
+        print(f"'{list_type}': +{len(added)} / -{len(removed_ids)} words ({len(respelled)} respelled), "
+              f"+{len(added_definitions)} / -{len(stale_definitions)} definitions.")
+        return summary
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def update_db(db_path='word_database.db', force=False) -> list[dict]:
+    """
+    Incremental alternative to init_db: re-ingests only the sources whose content
+    changed since the last build. Falls back to a full init_db if the database
+    has no words table yet. If anything changed (ingest_list has then dropped the
+    stale puzzle catalog and refreshed the planner statistics) it rewrites the
+    lexicon file.
+    """
+    start_time = time.time()
+    conn = sqlite3.connect(db_path)
+    try:
+        has_words = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'words'").fetchone()
+    finally:
+        conn.close()
+    if not has_words:
+        print(f"No existing database at {db_path}; running a full build.")
+        init_db(db_path)
+        return []
+
+    summaries = []
+    for list_type, filepaths in SOURCE_FILES_BY_TYPE.items():
+        if not isinstance(filepaths, list):
+            filepaths = [filepaths]
+        summaries.append(ingest_list(db_path, list_type, filepaths, force=force, rebuild_lexicon=False))
+
+    if any(summary['status'] == 'applied' for summary in summaries):
+        print("Word lists changed: puzzle catalog dropped, run 'flask build-puzzles' to rebuild it.")
+        build_lexicon_file(db_path)
+    print(f"Incremental update finished in {time.time() - start_time:.2f}s")
+    return summaries
+# --- Incremental Ingest --- END
+
+def read_header_stamp(db_path) -> tuple[int, int]:
+    """
+    (application_id, user_version) straight from the 100-byte SQLite file header,
+    without opening a connection. Raises OSError or ValueError if unreadable.
+    """
+    with open(db_path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b'SQLite format 3\0'):
+        raise ValueError("not an SQLite database")
+    user_version, = struct.unpack_from('>I', header, 60)
+    application_id, = struct.unpack_from('>I', header, 68)
+    return application_id, user_version
+
+def check_database(db_path) -> dict:
+    """
+    Validates a built database without modifying it: the file exists, its schema
+    version matches SCHEMA_VERSION and the word and pangram tables are populated.
+    The version stamp is read from the file header first, so a wrong file is
+    rejected without running a query; an optimized artifact's row counts come
+    from its build_info table instead of COUNT(*) scans.
+    Returns a report dict with 'ready' (bool), 'errors' and the row counts found.
+    """
+    report = {'ready': False, 'path': db_path, 'schema_version': None,
+              'expected_schema_version': SCHEMA_VERSION, 'counts': {}, 'artifact': None,
+              'errors': [], 'checked_at': time.time()}
+    if not os.path.exists(db_path):
+        report['errors'].append(f"Database not found at {db_path}")
+        return report
+    try:
+        application_id, report['schema_version'] = read_header_stamp(db_path)
+    except (OSError, ValueError) as e:
+        report['errors'].append(f"Database unreadable: {e}")
+        return report
+    if application_id not in (0, APPLICATION_ID): # 0: built before the id was stamped
+        report['errors'].append(f"Not a Spelling Bee database (application_id {application_id:#x})")
+    if report['schema_version'] != SCHEMA_VERSION:
+        report['errors'].append(f"Schema version {report['schema_version']} != expected {SCHEMA_VERSION}; rebuild with 'flask init-db'")
+    if report['errors']:
+        return report
+
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'build_info' in tables:
+                build_info = dict(conn.execute("SELECT key, value FROM build_info"))
+                report['artifact'] = {key: build_info[key] for key in ('optimized_at', 'page_size') if key in build_info}
+                report['counts'] = {table: build_info[f'{table}_count'] for table in ('words', 'pangrams', 'puzzles')
+                                    if f'{table}_count' in build_info}
+            else:
+                for table in ('words', 'pangrams', 'puzzles'):
+                    if table in tables:
+                        report['counts'][table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        report['errors'].append(f"Database unreadable: {e}")
+        return report
+
+    if report['counts'].get('words', 0) < READY_MIN_WORDS:
+        report['errors'].append(f"Only {report['counts'].get('words', 0)} words (minimum {READY_MIN_WORDS})")
+    if not report['counts'].get('pangrams'):
+        report['errors'].append("Pangram table missing or empty")
+    report['ready'] = not report['errors']
+    return report
+
+def build_lexicon_file(db_path, conn=None) -> dict:
+    """
+    (Re)writes the binary lexicon next to the database (see lexicon_file) from the
+    current words table. Uses `conn` if given, otherwise opens the database.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT word, list_mask FROM words").fetchall()
+        list_bits = load_list_bits(conn.cursor())
+        generation = lexicon_file.database_generation(conn)
+    finally:
+        if own_conn:
+            conn.close()
+    return lexicon_file.write_lexicon(lexicon_file.lexicon_path(db_path), rows, list_bits, generation)
+
+# Seven distinct letters including a vowel, checked on the stored integer columns (binds VOWEL_MASK)
+PANGRAM_CONDITION = "distinct_letter_count = 7 AND (letter_mask & ?) != 0 AND list_mask != 0"
+
+def fill_pangram_tables(cursor) -> int:
+    """
+    (Re)builds the 'pangrams' table: every word with exactly 7 unique normalized
+    letters (including a vowel), stored with its sorted letter set and list_mask.
+    Rows are numbered in list_mask order, so each distinct list_mask owns a run of
+    consecutive pangram_ids; 'pangram_ranges' records every run, and choose_letters
+    picks a seed with primary-key lookups instead of scanning. Runs inside the
+    caller's transaction; returns the number of pangrams.
+    """
+    cursor.execute("DROP TABLE IF EXISTS pangram_ranges;")
+    cursor.execute("DROP TABLE IF EXISTS pangrams;")
+    cursor.execute('''
+        CREATE TABLE pangrams (
+            pangram_id INTEGER PRIMARY KEY, -- Consecutive within each list_mask (see pangram_ranges)
+            word_id INTEGER NOT NULL, -- words.word_id
+            word TEXT NOT NULL,
+            letters TEXT NOT NULL, -- Sorted, normalized 7-letter set, e.g. 'aehnost'
+            list_mask INTEGER NOT NULL -- Copy of words.list_mask
+        )
+    ''')
+    rows = cursor.execute(f"""
+        SELECT word_id, word, normalized_word, list_mask FROM words WHERE {PANGRAM_CONDITION}
+        ORDER BY list_mask, word_id
+    """, (VOWEL_MASK,)).fetchall()
+    # Inserted in list_mask order, so the implicit pangram_ids are consecutive per list_mask
+    cursor.executemany("INSERT INTO pangrams (word_id, word, letters, list_mask) VALUES (?, ?, ?, ?)",
+                       [(word_id, word, letter_set_key(normalized_word), list_mask)
+                        for word_id, word, normalized_word, list_mask in rows])
+    pangram_count = len(rows)
+    cursor.execute('''
+        CREATE TABLE pangram_ranges (
+            list_mask INTEGER PRIMARY KEY,
+            first_pangram_id INTEGER NOT NULL,
+            pangram_count INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("INSERT INTO pangram_ranges SELECT list_mask, MIN(pangram_id), COUNT(*) FROM pangrams GROUP BY list_mask")
+    return pangram_count
+
+def build_pangram_table(conn) -> int:
+    """Rebuilds the pangram tables (see fill_pangram_tables) and commits."""
+    pangram_count = fill_pangram_tables(conn.cursor())
+    conn.commit()
+    return pangram_count
+
+# --- Puzzle Catalog --- START
+def catalog_list_combinations():
+    """Every list selection a game can use: the mandatory list plus any optional lists."""
+    optional = [lt for lt in SOURCE_FILES_BY_TYPE if lt != MANDATORY_LIST_TYPE]
+    combinations = []
+    for size in range(len(optional) + 1):
+        for extra in itertools.combinations(optional, size):
+            combinations.append(tuple(sorted((MANDATORY_LIST_TYPE,) + extra)))
+    return combinations
+
+def catalog_lists_key(list_types) -> str:
+    """Canonical key for a list selection, e.g. 'csw21,te_reo'."""
+    return ",".join(sorted(set(list_types)))
+
+def drop_puzzle_catalog(cursor):
+    """Drops the catalog tables; they are derived from words (rebuild with 'flask build-puzzles')."""
+    cursor.execute("DROP TABLE IF EXISTS puzzle_ranges;") # Catalog layout before schema version 4
+    cursor.execute("DROP TABLE IF EXISTS puzzles;")
+    cursor.execute("DROP TABLE IF EXISTS catalog_letter_sets;")
+    cursor.execute("DROP TABLE IF EXISTS catalog_selections;")
+
+# Worker state, set once per process by _init_catalog_worker
+_catalog_groups = None
+_catalog_word_ids = None
+
+def _init_catalog_worker(groups, word_ids):
+    global _catalog_groups, _catalog_word_ids
+    _catalog_groups = groups
+    _catalog_word_ids = word_ids
+
+def _solve_catalog_chunk(letter_sets, selections, min_words, max_words):
+    """
+    Solves every (letter set, center) pair in the chunk once for all list
+    selections. Words are pre-aggregated by (letter set key, list membership) so
+    each puzzle only needs the 127 non-empty subsets of its letters; a puzzle's
+    selection_mask has bit selection_id set for each selection (a combination
+    mask of list bits) it has a pangram and [min_words, max_words] solutions in.
+    Returns (rows, rejected): rows are (letters, encoded word ids, [(center,
+    selection_mask), ...]) for letter sets with at least one kept puzzle.
+    """
+    rows = []
+    rejected = 0
+    for letters in letter_sets:
+        subset_keys = [key for size in range(1, len(letters) + 1)
+                       for key in map("".join, itertools.combinations(letters, size))
+                       if key in _catalog_groups]
+        pangram_memberships = _catalog_groups.get(letters, {})
+        puzzles = []
+        for center in letters:
+            counts = {} # membership -> solutions with this center
+            for key in subset_keys:
+                if center in key:
+                    for membership, count in _catalog_groups[key].items():
+                        counts[membership] = counts.get(membership, 0) + count
+            selection_mask = 0
+            for selection_id, combo_mask in selections:
+                if not any(membership & combo_mask for membership in pangram_memberships):
+                    continue # No pangram in these lists: not a puzzle for this selection
+                solution_count = sum(count for membership, count in counts.items() if membership & combo_mask)
+                if min_words <= solution_count <= max_words:
+                    selection_mask |= 1 << selection_id
+                else:
+                    rejected += 1
+            if selection_mask:
+                puzzles.append((center, selection_mask))
+        if puzzles:
+            word_ids = [word_id for key in subset_keys for word_id in _catalog_word_ids[key]]
+            rows.append((letters, encode_word_ids(word_ids), puzzles))
+    return rows, rejected
+
+def build_puzzle_catalog(db_path, min_words=CATALOG_MIN_WORDS, max_words=CATALOG_MAX_WORDS, workers=None):
+    """
+    (Re)builds the puzzle catalog: every (pangram letter set, center letter) pair,
+    stored once with a selection_mask of the list combinations it is a puzzle for
+    (see catalog_selections), plus each letter set's stored solution - the ids of
+    every word spelled from its letters (catalog_letter_sets.word_ids), which the
+    request path filters by center letter and active lists instead of solving.
+    Puzzles outside [min_words, max_words] for a selection are rejected here so
+    the request path never serves a degenerate game. Returns the puzzle count.
+    """
+    start_time = time.time()
+    combinations = catalog_list_combinations()
+    if len(combinations) > MAX_LISTS:
+        raise ValueError(f"{len(combinations)} list selections exceed the {MAX_LISTS}-bit selection_mask")
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        list_bits = load_list_bits(cursor)
+        selections = [(selection_id, sum(list_bits.get(lt, 0) for lt in list_types))
+                      for selection_id, list_types in enumerate(combinations)]
+
+        # 1. Group the lexicon by letter set key: {membership: count} and the word ids
+        groups = {}
+        word_ids = {}
+        cursor.execute("SELECT normalized_word, list_mask, word_id FROM words WHERE length >= ?", (MIN_WORD_LENGTH_SETUP,))
+        for normalized_word, membership, word_id in cursor.fetchall():
+            key = letter_set_key(normalized_word)
+            memberships = groups.setdefault(key, {})
+            memberships[membership] = memberships.get(membership, 0) + 1
+            word_ids.setdefault(key, []).append(word_id)
+
+        # 2. Pangram letter sets (each is checked against every selection)
+        cursor.execute("SELECT DISTINCT letters FROM pangrams ORDER BY letters")
+        letter_sets = [row[0] for row in cursor.fetchall()]
+        print(f"--- [build_puzzle_catalog] Grouped {len(groups):,} letter sets in {time.time() - start_time:.2f}s")
+
+        # 3. Solve on a process pool
+        rows = []
+        rejected = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_catalog_worker,
+                                 initargs=(groups, word_ids)) as executor:
+            futures = [executor.submit(_solve_catalog_chunk, letter_sets[i:i + CATALOG_CHUNK_SIZE],
+                                       selections, min_words, max_words)
+                       for i in range(0, len(letter_sets), CATALOG_CHUNK_SIZE)]
+            for future in futures:
+                chunk_rows, chunk_rejected = future.result()
+                rows.extend(chunk_rows)
+                rejected += chunk_rejected
+
+        # 4. Store the catalog; puzzle ids are dense so a pick is a primary-key lookup
+        cursor.execute("DROP TABLE IF EXISTS build_info;")
+        drop_puzzle_catalog(cursor)
+        cursor.execute('''
+            CREATE TABLE catalog_selections (
+                selection_id INTEGER PRIMARY KEY, -- Bit position in puzzles.selection_mask
+                lists TEXT NOT NULL UNIQUE,       -- Canonical list selection, e.g. 'csw21,te_reo'
+                puzzle_count INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE catalog_letter_sets (
+                letter_set_id INTEGER PRIMARY KEY,
+                letters TEXT NOT NULL,  -- Sorted, normalized 7-letter set
+                word_ids BLOB NOT NULL  -- Every word spelled from these letters (spelling_bee.encode_word_ids)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE puzzles (
+                puzzle_id INTEGER PRIMARY KEY,
+                letter_set_id INTEGER NOT NULL, -- catalog_letter_sets.letter_set_id
+                center_letter TEXT NOT NULL,
+                selection_mask INTEGER NOT NULL -- Bit selection_id set = a puzzle for that selection
+            )
+        ''')
+        puzzle_counts = [0] * len(combinations)
+        puzzle_rows = []
+        for letter_set_id, (letters, encoded_word_ids, puzzles) in enumerate(rows, start=1):
+            cursor.execute("INSERT INTO catalog_letter_sets (letter_set_id, letters, word_ids) VALUES (?, ?, ?)",
+                           (letter_set_id, letters, encoded_word_ids))
+            for center, selection_mask in puzzles:
+                puzzle_rows.append((letter_set_id, center, selection_mask))
+                for selection_id in range(len(combinations)):
+                    puzzle_counts[selection_id] += selection_mask >> selection_id & 1
+        cursor.executemany("INSERT INTO puzzles (letter_set_id, center_letter, selection_mask) VALUES (?, ?, ?)",
+                           puzzle_rows)
+        cursor.executemany("INSERT INTO catalog_selections (selection_id, lists, puzzle_count) VALUES (?, ?, ?)",
+                           [(selection_id, catalog_lists_key(list_types), puzzle_counts[selection_id])
+                            for selection_id, list_types in enumerate(combinations)])
+        conn.commit()
+        print(f"--- [build_puzzle_catalog] Stored {len(puzzle_rows):,} puzzles over {len(rows):,} letter sets "
+              f"for {len(combinations)} list selections, rejected {rejected:,} (puzzle, selection) pairs "
+              f"outside {min_words}-{max_words} words, in {time.time() - start_time:.2f}s")
+        return len(puzzle_rows)
+    finally:
+        conn.close()
+# --- Puzzle Catalog --- END
+
+# --- Read-only deploy artifact --- START
+# The request-path queries, in the form the app runs them (one IN placeholder for
+# the solver's 64 letter masks). optimize_database reports their query plans.
+HOT_QUERIES = {
+    'solver_fetch': """
+        SELECT word, list_mask, normalized_word, length, distinct_letter_count FROM words
+        WHERE letter_mask IN (?) AND (list_mask & ?) != 0 AND length >= ?
+    """,
+    'pangram_ranges': "SELECT first_pangram_id, pangram_count FROM pangram_ranges WHERE (list_mask & ?) != 0",
+    'pangram_pick': "SELECT word, letters FROM pangrams WHERE pangram_id = ?",
+    'catalog_selection': "SELECT selection_id, puzzle_count FROM catalog_selections WHERE lists = ?",
+    'catalog_pick': "SELECT letter_set_id, center_letter, selection_mask FROM puzzles WHERE puzzle_id = ?",
+    'catalog_letter_set': "SELECT letters, word_ids FROM catalog_letter_sets WHERE letter_set_id = ?",
+    'catalog_solution': """
+        SELECT word, list_mask, normalized_word, length, distinct_letter_count FROM words
+        WHERE word_id IN (?) AND (letter_mask & ?) != 0 AND (list_mask & ?) != 0
+    """,
+    'definition_lookup': """
+        SELECT d.definition_text FROM definitions d JOIN words w ON d.word_id = w.word_id WHERE w.word = ?
+    """,
+}
+
+def query_plans(conn) -> dict:
+    """{query name: [plan step, ...]} for HOT_QUERIES (from EXPLAIN QUERY PLAN)."""
+    plans = {}
+    for name, sql in HOT_QUERIES.items():
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count('?')).fetchall()
+            plans[name] = [row[-1] for row in rows]
+        except sqlite3.Error as e:
+            plans[name] = [f"error: {e}"]
+    return plans
+
+def _object_sizes(conn) -> dict:
+    """{table or index name: bytes} via the dbstat virtual table ({} if SQLite lacks it)."""
+    try:
+        rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC").fetchall()
+    except sqlite3.Error:
+        return {}
+    return dict(rows)
+
+def optimize_database(db_path, page_size=ARTIFACT_PAGE_SIZE) -> dict:
+    """
+    Turns a built database (after init-db and build-puzzles) into the read-only
+    deploy artifact: stamps it with a build_info table (schema version, page size,
+    row counts - what check_database reads at startup), refreshes the planner
+    statistics and VACUUMs it into `page_size` pages, leaving every table and index
+    packed and contiguous. Returns a report with the file size before and after,
+    the page layout, per-object sizes and the plan of every HOT_QUERIES query.
+    """
+    start_time = time.time()
+    size_before = os.path.getsize(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        schema_version = conn.execute("PRAGMA user_version;").fetchone()[0]
+        if schema_version != SCHEMA_VERSION:
+            raise ValueError(f"Schema version {schema_version} != expected {SCHEMA_VERSION}; rebuild with 'flask init-db'")
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        build_info = {'schema_version': schema_version, 'optimized_at': int(time.time()), 'page_size': page_size}
+        for table in ('words', 'pangrams', 'puzzles'):
+            if table in tables:
+                build_info[f'{table}_count'] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+        conn.execute("DROP TABLE IF EXISTS build_info;")
+        conn.execute("CREATE TABLE build_info (key TEXT PRIMARY KEY, value) WITHOUT ROWID")
+        conn.executemany("INSERT INTO build_info (key, value) VALUES (?, ?)", build_info.items())
+        conn.execute(f"PRAGMA application_id = {APPLICATION_ID};")
+        conn.execute("ANALYZE;")
+        conn.commit()
+
+        # page_size only takes effect on a VACUUM outside WAL mode
+        conn.execute("PRAGMA journal_mode = DELETE;")
+        conn.execute(f"PRAGMA page_size = {int(page_size)};")
+        conn.execute("VACUUM;")
+
+        report = {
+            'path': db_path,
+            'bytes_before': size_before,
+            'bytes': os.path.getsize(db_path),
+            'page_size': conn.execute("PRAGMA page_size;").fetchone()[0],
+            'page_count': conn.execute("PRAGMA page_count;").fetchone()[0],
+            'freelist_count': conn.execute("PRAGMA freelist_count;").fetchone()[0],
+            'build_info': build_info,
+            'object_bytes': _object_sizes(conn),
+            'query_plans': query_plans(conn),
+            'seconds': time.time() - start_time,
+        }
+    finally:
+        conn.close()
+    print(f"--- [optimize_database] {db_path}: {size_before:,} -> {report['bytes']:,} bytes "
+          f"({report['page_count']:,} pages of {report['page_size']:,}) in {report['seconds']:.2f}s")
+    return report
+# --- Read-only deploy artifact --- END
+
 if __name__ == "__main__":
     # Allows running this script directly, e.g., python database_setup.py
     # Assumes the script is run from the project root.
@@ -0,0 +1,113 @@
+# db_pool.py
+# Persistent read-only connections to the word database, one per thread.
+# Connections are opened once with a read-only URI and tuned pragmas, then reused
+# by every request and puzzle generation on that thread. A connection is reopened
+# when the database file's generation changes (a rebuild, update-db, optimize-db).
+import os
+import sqlite3
+import threading
+
+DB_IMMUTABLE = os.environ.get('DB_IMMUTABLE', '0') == '1'          # immutable=1: no locking or change detection (deploy artifacts only)
+DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', str(256 << 20))) # Bytes of the file memory-mapped (0 disables)
+DB_CACHE_SIZE_KIB = int(os.environ.get('DB_CACHE_SIZE_KIB', '16384'))  # Page cache per connection
+DB_QUERY_ONLY = os.environ.get('DB_QUERY_ONLY', '1') != '0'        # Refuse writes even if the URI allowed them
+DB_CACHED_STATEMENTS = int(os.environ.get('DB_CACHED_STATEMENTS', '256')) # Prepared statements kept per connection
+
+def read_only_uri(db_path: str, immutable: bool = DB_IMMUTABLE) -> str:
+    """SQLite URI opening db_path read-only (and immutable if requested)."""
+    uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+def file_generation(path: str):
+    """
+    (inode, mtime_ns, size) of a file, or None if it cannot be stat'ed. Any
+    committed write, or a new file renamed into place, changes it. The pool, the
+    solved-puzzle memo and the lexicon engines key their caches by it.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class ReadOnlyConnectionPool:
+    """
+    Thread-local read-only connections to one database file. Connections are
+    opened lazily on first use per thread and closed when the thread exits.
+    Callers must NOT close the connections they get. Each call checks the file's
+    generation (one stat) and reopens the connection if the file has changed.
+    With DB_IMMUTABLE SQLite assumes the file never changes, so a write while a
+    query runs can return stale or corrupt pages. Enable it only for a read-only
+    deploy artifact (vercel.json sets it), never where the database is rebuilt.
+    """
+
+    def __init__(self, db_path, immutable=DB_IMMUTABLE, mmap_size=DB_MMAP_SIZE,
+                 cache_size_kib=DB_CACHE_SIZE_KIB, query_only=DB_QUERY_ONLY,
+                 cached_statements=DB_CACHED_STATEMENTS):
+        self.db_path = db_path
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.query_only = query_only
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reopened = 0
+
+    def _open(self):
+        conn = sqlite3.connect(read_only_uri(self.db_path, self.immutable), uri=True,
+                               check_same_thread=True, cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row # Return rows that behave like dicts
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)};")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_kib)};")
+        if self.query_only:
+            conn.execute("PRAGMA query_only = ON;")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, (re)opened if the file changed. Raises sqlite3.Error if unavailable."""
+        generation = file_generation(self.db_path)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == generation:
+            return conn
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        new_conn = self._open()
+        self._local.conn = new_conn
+        self._local.generation = generation
+        with self._lock:
+            self.opened += 1
+            if conn is not None:
+                self.reopened += 1
+        return new_conn
+
+    def stats(self) -> dict:
+        return {
+            'path': self.db_path,
+            'immutable': self.immutable,
+            'mmap_size': self.mmap_size,
+            'cache_size_kib': self.cache_size_kib,
+            'query_only': self.query_only,
+            'cached_statements': self.cached_statements,
+            'opened': self.opened,
+            'reopened': self.reopened,
+        }
+
+
+# --- Per-process pools, one per database path ---
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str) -> ReadOnlyConnectionPool:
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(db_path, ReadOnlyConnectionPool(db_path))
+    return pool
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """Pooled read-only connection for db_path on the calling thread (do not close it)."""
+    return get_pool(db_path).connection()
@@ -0,0 +1,472 @@
+# definitions.py
+# Word definitions for found words: local database first, then the external
+# dictionary API. API answers are cached in two tiers - an in-process LRU and a
+# SQLite table that survives restarts and is shared by worker processes - and
+# "not found" answers are cached too, for a shorter time.
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import db_pool
+import metrics
+from circuit_breaker import CircuitBreaker
+from ttl_cache import TTLCache
+
+DICTIONARY_API_URL = os.environ.get('DICTIONARY_API_URL', 'https://api.dictionaryapi.dev/api/v2/entries/en/{word}')
+DICTIONARY_API_TIMEOUT = float(os.environ.get('DICTIONARY_API_TIMEOUT', '5'))      # Seconds per upstream call
+DICTIONARY_HTTP_POOL_SIZE = int(os.environ.get('DICTIONARY_HTTP_POOL_SIZE', '10')) # Keep-alive connections kept
+DEFINITION_CACHE_SIZE = int(os.environ.get('DEFINITION_CACHE_SIZE', '10000'))      # In-process LRU entries
+DEFINITION_CACHE_TTL = int(os.environ.get('DEFINITION_CACHE_TTL', str(30 * 24 * 3600))) # Found definitions
+DEFINITION_NEGATIVE_TTL = int(os.environ.get('DEFINITION_NEGATIVE_TTL', str(24 * 3600))) # "Not found" answers
+DEFINITION_ERROR_TTL = int(os.environ.get('DEFINITION_ERROR_TTL', '60')) # Upstream failures (memory only)
+DEFINITION_FETCH_MODE = os.environ.get('DEFINITION_FETCH_MODE', 'executor').lower() # 'executor' (bounded pool + deadline) or 'inline'
+DEFINITION_WORKERS = int(os.environ.get('DEFINITION_WORKERS', '8'))       # Upstream fetch threads = global cap on concurrent calls
+DEFINITION_REQUEST_DEADLINE = float(os.environ.get('DEFINITION_REQUEST_DEADLINE', '1.5')) # Seconds a request waits on upstream
+DEFINITION_BREAKER_WINDOW = int(os.environ.get('DEFINITION_BREAKER_WINDOW', '20'))      # Recent calls considered
+DEFINITION_BREAKER_MIN_CALLS = int(os.environ.get('DEFINITION_BREAKER_MIN_CALLS', '10'))
+DEFINITION_BREAKER_FAILURE_RATIO = float(os.environ.get('DEFINITION_BREAKER_FAILURE_RATIO', '0.5'))
+DEFINITION_BREAKER_COOLDOWN = float(os.environ.get('DEFINITION_BREAKER_COOLDOWN', '30')) # Seconds failing fast before a probe
+DEFINITION_BATCH_MAX = int(os.environ.get('DEFINITION_BATCH_MAX', '200')) # Words per POST /definitions
+DEFINITION_PREFETCH = os.environ.get('DEFINITION_PREFETCH', '0') == '1'  # Warm solution definitions when a game starts
+DEFINITION_PREFETCH_MAX_PENDING = int(os.environ.get('DEFINITION_PREFETCH_MAX_PENDING', '500')) # Queued words before prefetches are dropped
+LOCAL_BATCH_CHUNK = 500 # Words per IN (...) query, well below SQLite's variable limit
+# /tmp is the only writable location on serverless hosts
+DEFINITION_CACHE_PATH = os.environ.get('DEFINITION_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'spelling_bee_definitions.db'))
+
+NOT_FOUND_TEXT = "Definition not found."
+_MISS = object()
+
+# Outcomes of an upstream lookup
+FOUND = 'found'
+NOT_FOUND = 'not_found'
+ERROR = 'error'
+
+def format_definitions(definitions: list[str]) -> str:
+    """Numbers multiple definitions; a single one is returned as is."""
+    if not definitions:
+        return NOT_FOUND_TEXT
+    if len(definitions) > 1:
+        return "\n\n".join(f"{idx+1}. {d}" for idx, d in enumerate(definitions))
+    return definitions[0]
+
+def parse_api_response(data):
+    """First definition in a dictionaryapi.dev style response, or None."""
+    if not data or not isinstance(data, list):
+        return None
+    meanings = data[0].get('meanings') or []
+    if not meanings:
+        return None
+    entries = meanings[0].get('definitions') or []
+    if not entries:
+        return None
+    return entries[0].get('definition')
+
+
+class DefinitionCache:
+    """
+    Two-tier cache of upstream answers: word -> definition text, or None for
+    "not found". The memory tier fronts a SQLite table (one connection per
+    thread) holding the same entries with their expiry times.
+    """
+
+    def __init__(self, path=DEFINITION_CACHE_PATH, maxsize=DEFINITION_CACHE_SIZE):
+        self.path = path
+        self.memory = TTLCache(maxsize=maxsize)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.store_hits = 0
+        self.store_misses = 0
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS definition_cache (
+                word TEXT PRIMARY KEY,
+                definition TEXT, -- NULL = the API has no definition
+                expires_at REAL NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            self._local.conn = conn
+        return conn
+
+    def get(self, word):
+        """Returns (hit, definition_or_None)."""
+        entry = self.memory.get(word, _MISS)
+        if entry is not _MISS:
+            return True, entry
+        try:
+            row = self._connection().execute(
+                "SELECT definition, expires_at FROM definition_cache WHERE word = ? AND expires_at > ?",
+                (word, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"--- [definitions] Cache read failed for '{word}': {e}")
+            row = None
+        with self._lock:
+            if row:
+                self.store_hits += 1
+            else:
+                self.store_misses += 1
+        if not row:
+            return False, None
+        definition, expires_at = row
+        self.memory.set(word, definition, ttl=max(0, expires_at - time.time()))
+        return True, definition
+
+    def set(self, word, definition, ttl, persist=True):
+        self.memory.set(word, definition, ttl=ttl)
+        if not persist:
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO definition_cache (word, definition, expires_at, fetched_at) VALUES (?, ?, ?, ?)",
+                         (word, definition, now + ttl, now))
+            conn.execute("DELETE FROM definition_cache WHERE expires_at < ?", (now,)) # Expire stale entries
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"--- [definitions] Cache write failed for '{word}': {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.store_hits + self.store_misses
+            return {
+                'memory': self.memory.stats(),
+                'store': {
+                    'path': self.path,
+                    'hits': self.store_hits,
+                    'misses': self.store_misses,
+                    'hit_ratio': round(self.store_hits / lookups, 4) if lookups else None,
+                },
+            }
+
+
+class DefinitionService:
+    """
+    Looks up definitions: local database, then the cache, then the external API.
+    In 'executor' mode upstream calls run on a dedicated bounded pool: at most
+    `workers` calls are in flight process-wide (more are rejected, not queued),
+    a request waits at most `deadline` seconds before answering "not found" (the
+    call still completes and fills the cache), and a circuit breaker fails fast
+    while the upstream error rate is high. 'inline' mode calls upstream on the
+    request thread, as before.
+    """
+
+    def __init__(self, db_path, api_url=DICTIONARY_API_URL, timeout=DICTIONARY_API_TIMEOUT, cache=None,
+                 workers=DEFINITION_WORKERS, prefetch_enabled=DEFINITION_PREFETCH,
+                 fetch_mode=DEFINITION_FETCH_MODE, deadline=DEFINITION_REQUEST_DEADLINE, breaker=None):
+        self.db_path = db_path
+        self.api_url = api_url
+        self.timeout = timeout
+        self.cache = cache or DefinitionCache()
+        self.workers = max(1, workers)
+        self.prefetch_enabled = prefetch_enabled
+        self.fetch_mode = fetch_mode if fetch_mode in ('executor', 'inline') else 'executor'
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker(
+            window=DEFINITION_BREAKER_WINDOW, min_calls=DEFINITION_BREAKER_MIN_CALLS,
+            failure_ratio=DEFINITION_BREAKER_FAILURE_RATIO, cooldown=DEFINITION_BREAKER_COOLDOWN)
+        # Started lazily so forked workers and CLI commands don't inherit threads
+        self._executor = None
+        self._prefetch_executor = None
+        self._slots = threading.BoundedSemaphore(self.workers) # Global in-flight cap
+        self._prefetch_slots = threading.BoundedSemaphore(max(1, self.workers // 2)) # Prefetch never takes them all
+        self._in_flight = {} # word -> Future, so concurrent lookups share one call
+        self._pending_prefetch = 0
+        # One pooled session: keep-alive connections are reused across lookups
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(DICTIONARY_HTTP_POOL_SIZE, self.workers))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self.counters = {'local': 0, 'cache_hits': 0, 'negative_hits': 0, 'api_calls': 0,
+                         'api_found': 0, 'api_not_found': 0, 'api_errors': 0,
+                         'batches': 0, 'prefetch_queued': 0, 'prefetch_dropped': 0,
+                         'rejected': 0, 'short_circuited': 0, 'deadline_exceeded': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+        metrics.DEFINITION_EVENTS.inc(amount, event=name)
+
+    def local_definitions(self, word) -> list[str]:
+        """Definitions stored with the word lists (may be empty)."""
+        query = """
+            SELECT d.definition_text
+            FROM definitions d
+            JOIN words w ON d.word_id = w.word_id
+            WHERE w.word = ?
+        """
+        try:
+            rows = db_pool.get_connection(self.db_path).execute(query, (word,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"--- [definitions] Database error fetching definition for '{word}': {e}")
+            return []
+        return [row[0] for row in rows]
+
+    def local_definitions_many(self, words) -> dict:
+        """{word: [definitions]} for the words that have local definitions, in one query per chunk."""
+        found = {}
+        words = list(words)
+        try:
+            conn = db_pool.get_connection(self.db_path)
+            for i in range(0, len(words), LOCAL_BATCH_CHUNK):
+                chunk = words[i:i + LOCAL_BATCH_CHUNK]
+                rows = conn.execute(f"""
+                    SELECT w.word, d.definition_text
+                    FROM definitions d
+                    JOIN words w ON d.word_id = w.word_id
+                    WHERE w.word IN ({','.join('?' * len(chunk))})
+                """, chunk).fetchall()
+                for word, definition_text in rows:
+                    found.setdefault(word, []).append(definition_text)
+        except sqlite3.Error as e:
+            print(f"--- [definitions] Database error fetching definitions for {len(words)} words: {e}")
+        return found
+
+    # --- Upstream calls ---
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='definitions')
+        return self._executor
+
+    def _get_prefetch_executor(self):
+        if self._prefetch_executor is None:
+            with self._lock:
+                if self._prefetch_executor is None:
+                    self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='definitions-prefetch')
+        return self._prefetch_executor
+
+    def fetch_remote(self, word):
+        """Calls the dictionary API. Returns (FOUND | NOT_FOUND | ERROR, definition_or_None)."""
+        self._count('api_calls')
+        start = time.perf_counter()
+        status, definition = self._call_api(word)
+        metrics.DEFINITION_UPSTREAM_SECONDS.observe(time.perf_counter() - start, status=status)
+        self._count({FOUND: 'api_found', NOT_FOUND: 'api_not_found', ERROR: 'api_errors'}[status])
+        return status, definition
+
+    def _call_api(self, word):
+        try:
+            response = self.session.get(self.api_url.format(word=quote(word)), timeout=self.timeout)
+            if response.status_code == 404:
+                return NOT_FOUND, None
+            response.raise_for_status() # Raise HTTPError for other bad responses
+            definition = parse_api_response(response.json())
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"--- [definitions] Error calling definition API for '{word}': {e}")
+            return ERROR, None
+        return (FOUND, definition) if definition else (NOT_FOUND, None)
+
+    def _fetch_and_cache(self, word):
+        """One upstream call, reported to the breaker and cached. Returns definition text or None."""
+        try:
+            status, definition = self.fetch_remote(word)
+        except Exception as e:
+            print(f"--- [definitions] Unexpected error fetching '{word}': {e}")
+            status, definition = ERROR, None
+        self.breaker.record(status != ERROR)
+        if status == FOUND:
+            self.cache.set(word, definition, DEFINITION_CACHE_TTL)
+        elif status == NOT_FOUND:
+            self.cache.set(word, None, DEFINITION_NEGATIVE_TTL)
+        else:
+            # Don't retry a failing upstream on every click, but don't remember it for long
+            self.cache.set(word, None, DEFINITION_ERROR_TTL, persist=False)
+        return definition
+
+    def _start_fetch(self, word, prefetch=False):
+        """
+        Starts (or joins) an upstream fetch on the bounded pool. Returns a Future, or
+        None when the in-flight cap is reached or the breaker is open. Prefetches
+        wait for a slot (on the prefetch thread); interactive lookups never queue.
+        The word is reserved in _in_flight (a placeholder Future) under the same lock
+        acquisition as the lookup, so concurrent callers never start a second fetch.
+        """
+        with self._lock:
+            future = self._in_flight.get(word)
+            if future is not None:
+                return future
+            future = self._in_flight[word] = Future()
+
+        if prefetch:
+            self._prefetch_slots.acquire()
+            self._slots.acquire()
+        elif not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            self._abandon_fetch(word, future)
+            return None
+        if not self.breaker.allow():
+            self._release_slots(prefetch)
+            self._count('short_circuited')
+            self._abandon_fetch(word, future)
+            return None
+
+        try:
+            fetch = self._get_executor().submit(self._fetch_and_cache, word)
+        except RuntimeError: # Executor shut down
+            self._release_slots(prefetch)
+            self._abandon_fetch(word, future)
+            return None
+        fetch.add_done_callback(lambda fetch, word=word: self._finish_fetch(word, prefetch, future, fetch))
+        return future
+
+    def _release_slots(self, prefetch):
+        self._slots.release()
+        if prefetch:
+            self._prefetch_slots.release()
+
+    def _abandon_fetch(self, word, future):
+        """Frees a reservation that never became a fetch; callers that joined it get None."""
+        with self._lock:
+            self._in_flight.pop(word, None)
+        future.set_result(None)
+
+    def _finish_fetch(self, word, prefetch, future, fetch):
+        with self._lock:
+            self._in_flight.pop(word, None)
+        self._release_slots(prefetch)
+        error = fetch.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(fetch.result())
+
+    def _cached(self, word):
+        """(hit, definition) from the cache, counting hits."""
+        hit, definition = self.cache.get(word)
+        if hit:
+            self._count('cache_hits' if definition else 'negative_hits')
+        return hit, definition
+
+    def remote_definition(self, word):
+        """Cached API lookup: definition text or None (also when failing fast or past the deadline)."""
+        hit, definition = self._cached(word)
+        if hit:
+            return definition
+        if self.fetch_mode == 'inline':
+            if not self.breaker.allow():
+                self._count('short_circuited')
+                return None
+            return self._fetch_and_cache(word)
+        future = self._start_fetch(word)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=self.deadline)
+        except FutureTimeout:
+            self._count('deadline_exceeded') # The call completes in the background and fills the cache
+            return None
+
+    # --- Public lookups ---
+    @metrics.STAGE_SECONDS.timed(stage='definition_lookup')
+    def lookup(self, word) -> str:
+        """Display text for a word's definition(s), or NOT_FOUND_TEXT."""
+        word = word.lower()
+        definitions = self.local_definitions(word)
+        if definitions:
+            self._count('local')
+            return format_definitions(definitions)
+        definition = self.remote_definition(word)
+        return format_definitions([definition] if definition else [])
+
+    @metrics.STAGE_SECONDS.timed(stage='definition_lookup')
+    def lookup_many(self, words) -> dict:
+        """
+        {word: display text} for many words: local definitions in one query,
+        then the cache, with the remaining API calls started together on the
+        bounded pool and awaited under a single deadline.
+        """
+        self._count('batches')
+        words = list(dict.fromkeys(word.lower() for word in words)) # Dedupe, keep order
+        local = self.local_definitions_many(words)
+        self._count('local', len(local))
+        found = {word: local[word] for word in local}
+
+        futures = {}
+        for word in words:
+            if word in local:
+                continue
+            hit, definition = self._cached(word)
+            if hit:
+                found[word] = [definition] if definition else []
+            elif self.fetch_mode == 'inline':
+                definition = self.remote_definition(word)
+                found[word] = [definition] if definition else []
+            else:
+                future = self._start_fetch(word)
+                if future is not None:
+                    futures[future] = word
+
+        if futures:
+            done, not_done = wait(futures, timeout=self.deadline)
+            for future in done:
+                definition = future.result()
+                found[futures[future]] = [definition] if definition else []
+            if not_done:
+                self._count('deadline_exceeded', len(not_done))
+        return {word: format_definitions(found.get(word, [])) for word in words}
+
+    def prefetch(self, words) -> int:
+        """
+        Warms the cache for words without local definitions in the background
+        (no-op unless prefetching is enabled). Prefetches use at most half of the
+        upstream slots, and at most DEFINITION_PREFETCH_MAX_PENDING words are
+        queued at once; the rest are dropped. Returns the number queued.
+        """
+        if not self.prefetch_enabled or not words:
+            return 0
+        words = list(dict.fromkeys(word.lower() for word in words))
+        local = self.local_definitions_many(words)
+        remote_words = [word for word in words if word not in local]
+        with self._lock:
+            room = max(0, DEFINITION_PREFETCH_MAX_PENDING - self._pending_prefetch)
+            queued, dropped = remote_words[:room], len(remote_words) - min(room, len(remote_words))
+            self._pending_prefetch += len(queued)
+            self.counters['prefetch_queued'] += len(queued)
+            self.counters['prefetch_dropped'] += dropped
+        executor = self._get_prefetch_executor()
+        for word in queued:
+            executor.submit(self._prefetch_one, word)
+        return len(queued)
+
+    def _prefetch_one(self, word):
+        try:
+            hit, _ = self.cache.get(word)
+            if not hit:
+                if self.fetch_mode == 'inline':
+                    if self.breaker.allow():
+                        self._fetch_and_cache(word)
+                else:
+                    self._start_fetch(word, prefetch=True)
+        except Exception as e:
+            print(f"--- [definitions] Prefetch failed for '{word}': {e}")
+        finally:
+            with self._lock:
+                self._pending_prefetch -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            pending = self._pending_prefetch
+            in_flight = len(self._in_flight)
+        return {'api_url': self.api_url, 'fetch_mode': self.fetch_mode, 'workers': self.workers,
+                'deadline': self.deadline, 'in_flight': in_flight, **counters,
+                'prefetch_enabled': self.prefetch_enabled, 'prefetch_pending': pending,
+                'breaker': self.breaker.stats(), 'cache': self.cache.stats()}
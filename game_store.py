@@ -0,0 +1,245 @@
+# game_store.py
+# Storage for game state, chosen with GAME_STORE_BACKEND:
+#   sqlite - one file shared by the worker processes of a single host (the default
+#            wherever the workers share a disk)
+#   cookie - the signed session cookie holds the puzzle's letters and the player's
+#            progress; any worker or serverless instance rebuilds the puzzle from
+#            them (the default on serverless hosts, which share nothing)
+#   memory - per-process LRU; only correct with a single worker process
+# The server-side backends leave only a game id in the cookie. The cookie backend
+# re-signs a few hundred bytes on every guess, and a worker that has not seen the
+# puzzle solves it again (a lexicon query), so it is only the default where no
+# server-side store can be shared.
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from ttl_cache import TTLCache
+
+GAME_STORE_BACKEND = os.environ.get('GAME_STORE_BACKEND', '').lower() # 'sqlite', 'cookie' or 'memory' (unset: see default_backend)
+GAME_STORE_MAX_GAMES = int(os.environ.get('GAME_STORE_MAX_GAMES', '10000'))  # Memory backend LRU bound
+GAME_STORE_MAX_PUZZLES = int(os.environ.get('GAME_STORE_MAX_PUZZLES', '1024')) # Cookie backend: rebuilt puzzles kept per process
+GAME_STORE_TTL = int(os.environ.get('GAME_STORE_TTL', str(7 * 24 * 3600)))  # Seconds an idle game is kept
+# /tmp is the only writable location on serverless hosts
+GAME_STORE_PATH = os.environ.get('GAME_STORE_PATH', os.path.join(tempfile.gettempdir(), 'spelling_bee_games.db'))
+
+def new_game_id() -> str:
+    return uuid.uuid4().hex
+
+def solutions_digest(solutions) -> str:
+    """Short hash of a puzzle's ordered solution list: found_mask bits are only valid against the same list."""
+    return hashlib.blake2b("\n".join(solutions).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class MemoryGameStore:
+    """
+    Per-process LRU of games. Puzzles are kept by reference, so loading a game
+    costs no deserialization at all. Games are lost on restart and are not shared
+    between worker processes, so create_game_store refuses it when there are several.
+    """
+
+    def __init__(self, max_games=GAME_STORE_MAX_GAMES, ttl=GAME_STORE_TTL):
+        self._games = TTLCache(maxsize=max_games, ttl=ttl)
+
+    def create(self, puzzle: dict, progress: dict) -> str:
+        game_id = new_game_id()
+        self._games.set(game_id, (puzzle, progress))
+        return game_id
+
+    def load(self, game_id):
+        """Returns (puzzle, progress) or None if the game is unknown or expired."""
+        return self._games.get(game_id) if game_id else None
+
+    def save_progress(self, game_id: str, progress: dict):
+        game = self._games.get(game_id)
+        if game:
+            self._games.set(game_id, (game[0], progress))
+
+    def delete(self, game_id: str):
+        self._games.pop(game_id)
+
+    def stats(self) -> dict:
+        return {'backend': 'memory', **self._games.stats()}
+
+
+class SQLiteGameStore:
+    """
+    Games in a small SQLite file shared by every worker process on the host.
+    The puzzle JSON is written once at creation; guesses only rewrite the
+    (small) progress column. One connection per thread.
+    """
+
+    def __init__(self, path=GAME_STORE_PATH, ttl=GAME_STORE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS games (
+                game_id TEXT PRIMARY KEY,
+                puzzle TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_updated_at ON games (updated_at);")
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            self._local.conn = conn
+        return conn
+
+    def create(self, puzzle: dict, progress: dict) -> str:
+        game_id = new_game_id()
+        conn = self._connection()
+        now = time.time()
+        conn.execute("DELETE FROM games WHERE updated_at < ?", (now - self.ttl,)) # Expire idle games
+        conn.execute("INSERT INTO games (game_id, puzzle, progress, updated_at) VALUES (?, ?, ?, ?)",
+                     (game_id, json.dumps(puzzle), json.dumps(progress), now))
+        conn.commit()
+        return game_id
+
+    def load(self, game_id):
+        """Returns (puzzle, progress) or None if the game is unknown or expired."""
+        if not game_id:
+            return None
+        row = self._connection().execute(
+            "SELECT puzzle, progress FROM games WHERE game_id = ? AND updated_at >= ?",
+            (game_id, time.time() - self.ttl)
+        ).fetchone()
+        return (json.loads(row[0]), json.loads(row[1])) if row else None
+
+    def save_progress(self, game_id: str, progress: dict):
+        conn = self._connection()
+        conn.execute("UPDATE games SET progress = ?, updated_at = ? WHERE game_id = ?",
+                     (json.dumps(progress), time.time(), game_id))
+        conn.commit()
+
+    def delete(self, game_id: str):
+        conn = self._connection()
+        conn.execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+        conn.commit()
+
+    def stats(self) -> dict:
+        count = self._connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        return {'backend': 'sqlite', 'path': self.path, 'size': count, 'ttl': self.ttl}
+
+
+class CookieGameStore:
+    """
+    Games in the signed session cookie, so every worker process and serverless
+    instance sees the same game without shared server state. The cookie holds
+    the puzzle's letters, center letter and lists, a digest of its solution list
+    and the progress; the full puzzle state is rebuilt from them by
+    `rebuild_puzzle(letters, center_letter, active_list_types)` (solving is
+    memoized) and kept in a per-process LRU keyed by the digest too. A rebuild
+    whose solutions differ (another lexicon build) does not load the game.
+    `get_session` returns the current request's session.
+    """
+    SESSION_KEY = 'game'
+
+    def __init__(self, rebuild_puzzle, get_session, max_puzzles=GAME_STORE_MAX_PUZZLES, ttl=GAME_STORE_TTL):
+        self._rebuild_puzzle = rebuild_puzzle
+        self._get_session = get_session
+        self._puzzles = TTLCache(maxsize=max_puzzles, ttl=ttl)
+
+    @staticmethod
+    def _puzzle_key(letters: str, center_letter: str, active_list_types) -> tuple:
+        return (letters, center_letter, tuple(sorted(active_list_types)))
+
+    def _current(self, game_id):
+        game = self._get_session().get(self.SESSION_KEY) if game_id else None
+        return game if game and game.get('game_id') == game_id else None
+
+    def create(self, puzzle: dict, progress: dict) -> str:
+        game_id = new_game_id()
+        key = self._puzzle_key(puzzle['letters_set'], puzzle['center_letter'], puzzle['active_list_types'])
+        digest = solutions_digest(puzzle['solutions'])
+        self._puzzles.set(key + (digest,), puzzle)
+        self._get_session()[self.SESSION_KEY] = {
+            'game_id': game_id,
+            'letters': key[0],
+            'center_letter': key[1],
+            'active_list_types': list(key[2]),
+            'solutions_digest': digest,
+            'progress': progress,
+        }
+        return game_id
+
+    def load(self, game_id):
+        """Returns (puzzle, progress) or None if the session holds no such game."""
+        game = self._current(game_id)
+        if not game:
+            return None
+        key = self._puzzle_key(game['letters'], game['center_letter'], game['active_list_types'])
+        digest = game.get('solutions_digest')
+        puzzle = self._puzzles.get(key + (digest,))
+        if puzzle is None:
+            puzzle = self._rebuild_puzzle(*key)
+            if solutions_digest(puzzle['solutions']) != digest:
+                return None # Solved against another lexicon build: found_mask bits no longer line up
+            self._puzzles.set(key + (digest,), puzzle)
+        return puzzle, dict(game['progress'])
+
+    def save_progress(self, game_id: str, progress: dict):
+        game = self._current(game_id)
+        if game:
+            self._get_session()[self.SESSION_KEY] = {**game, 'progress': progress}
+
+    def delete(self, game_id: str):
+        if self._current(game_id):
+            self._get_session().pop(self.SESSION_KEY, None)
+
+    def stats(self) -> dict:
+        return {'backend': 'cookie', 'rebuilt_puzzles': self._puzzles.stats()}
+
+
+def worker_count() -> int:
+    """Worker processes serving the app, as announced by WEB_CONCURRENCY (gunicorn and most PaaS hosts)."""
+    try:
+        return max(1, int(os.environ.get('WEB_CONCURRENCY', '1')))
+    except ValueError:
+        return 1
+
+def is_serverless() -> bool:
+    """True on serverless hosts, where every instance is a separate process with its own /tmp."""
+    return bool(os.environ.get('VERCEL') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+
+def default_backend() -> str:
+    """'cookie' on serverless hosts (instances share no disk), otherwise 'sqlite'."""
+    return 'cookie' if is_serverless() else 'sqlite'
+
+def create_game_store(backend=GAME_STORE_BACKEND, rebuild_puzzle=None, get_session=None):
+    """
+    Builds the configured game store backend, default_backend() if none is set
+    (the cookie backend needs rebuild_puzzle and get_session, see CookieGameStore).
+    Raises RuntimeError for a backend that cannot share games across this
+    deployment's processes: 'memory' with several workers or on a serverless
+    host, 'sqlite' (a file local to one host) on a serverless host.
+    """
+    if backend and backend not in ('sqlite', 'cookie', 'memory'):
+        print(f"--- [game_store] Unknown GAME_STORE_BACKEND '{backend}', using {default_backend()}.")
+        backend = None
+    backend = backend or default_backend()
+    if backend == 'memory' and (worker_count() > 1 or is_serverless()):
+        raise RuntimeError("GAME_STORE_BACKEND=memory keeps games in one process, but this deployment runs "
+                           f"{'serverless' if is_serverless() else f'{worker_count()} workers'}; "
+                           f"use the '{default_backend()}' backend")
+    if backend == 'sqlite' and is_serverless():
+        raise RuntimeError("GAME_STORE_BACKEND=sqlite is local to one host and serverless instances do not "
+                           "share /tmp; use the 'cookie' backend")
+    if backend == 'memory':
+        return MemoryGameStore()
+    if backend == 'cookie':
+        return CookieGameStore(rebuild_puzzle, get_session)
+    return SQLiteGameStore()
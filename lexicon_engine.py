@@ -0,0 +1,170 @@
+# lexicon_engine.py
+# Optional in-memory solver backend. Loads the lexicon once per process into
+# compact NumPy arrays and answers puzzle queries with vectorized expressions.
+# Enabled with SOLVER_ENGINE=numpy; spelling_bee falls back to SQL without NumPy.
+import random
+import sqlite3
+import threading
+import time
+
+import db_pool
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional - the SQL solver is always available
+    np = None
+
+from spelling_bee import LETTER_BITS, MIN_WORD_LENGTH, VOWEL_MASK, letters_to_mask, normalize_word
+
+MAX_LISTS = 64 # memberships are uint64
+
+def mask_to_letters(mask: int) -> set[str]:
+    """Converts a 26-bit letter mask back into a set of letters."""
+    return {letter for letter, bit in LETTER_BITS.items() if mask & bit}
+
+
+class LexiconEngine:
+    """
+    Column-oriented, read-only view of the lexicon:
+        - masks:       uint32 letter mask of each normalized word
+        - lengths:     uint8 word length
+        - memberships: uint64 bitmask of the lists containing the word (see list_bits)
+        - offsets:     uint32 offsets into one packed UTF-8 word buffer
+    Words containing letters outside a-z after normalization are never solutions
+    and are not loaded.
+    """
+    vectorized_scoring = True # solve_puzzle uses scores()/pangram_flags()
+
+    def __init__(self, words: list[str], memberships: list[int], list_bits: dict[str, int]):
+        encoded = [word.encode('utf-8') for word in words]
+        self.word_buffer = b"".join(encoded)
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        np.cumsum([len(e) for e in encoded], out=self.offsets[1:])
+
+        normalized = [normalize_word(word) for word in words]
+        self.masks = np.fromiter((letters_to_mask(n) for n in normalized), dtype=np.uint32, count=len(words))
+        self.lengths = np.fromiter((len(w) for w in words), dtype=np.uint8, count=len(words))
+        self.memberships = np.asarray(memberships, dtype=np.uint64)
+        self.list_bits = dict(list_bits)
+
+        # Pangram seeds: exactly 7 distinct letters, including a vowel
+        distinct_counts = np.fromiter((len(set(n)) for n in normalized), dtype=np.uint8, count=len(words))
+        self.pangram_indices = np.flatnonzero((distinct_counts == 7) & ((self.masks & VOWEL_MASK) != 0))
+
+    # --- Loading ---
+    @classmethod
+    def from_database(cls, db_path: str) -> "LexiconEngine":
+        """
+        Loads every word and its list membership from the SQLite words and lists
+        tables. The file is opened read-only: a missing database raises sqlite3.Error
+        instead of being created empty.
+        """
+        start_time = time.time()
+        conn = sqlite3.connect(db_pool.read_only_uri(db_path, immutable=False), uri=True)
+        try:
+            rows = conn.execute("SELECT word, list_mask FROM words ORDER BY word").fetchall()
+            list_ids = conn.execute("SELECT list_type, list_id FROM lists ORDER BY list_id").fetchall()
+        finally:
+            conn.close()
+        if len(list_ids) > MAX_LISTS:
+            raise ValueError(f"{len(list_ids)} word lists do not fit the uint64 membership array")
+
+        # Remap the database's list bits onto dense uint64 bits
+        list_bits = {list_type: 1 << i for i, (list_type, _) in enumerate(list_ids)}
+        remap = [(1 << list_id, list_bits[list_type]) for list_type, list_id in list_ids]
+        words, memberships = [], []
+        for word, list_mask in rows:
+            normalized = normalize_word(word)
+            if not all(ch in LETTER_BITS for ch in normalized):
+                continue
+            words.append(word)
+            memberships.append(sum(bit for db_bit, bit in remap if list_mask & db_bit))
+
+        engine = cls(words, memberships, list_bits)
+        print(f"--- [LexiconEngine] Loaded {len(words):,} words ({len(list_bits)} lists) in {time.time() - start_time:.2f}s")
+        return engine
+
+    # --- Helpers ---
+    def word_at(self, index: int) -> str:
+        """Decodes a single word from the packed buffer."""
+        return self.word_buffer[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def active_mask(self, active_list_types):
+        """Membership mask (np.uint64) for a list selection; unknown list types are ignored."""
+        return np.uint64(sum(self.list_bits.get(list_type, 0) for list_type in set(active_list_types)))
+
+    # --- Queries ---
+    def solution_indices(self, letters, center_letter: str, active_list_types):
+        """All words whose mask is a subset of the letters, containing the center letter."""
+        letters_mask = letters_to_mask(letters)
+        center_mask = letters_to_mask(center_letter)
+        selected = (
+            ((self.masks & ~np.uint32(letters_mask)) == 0)
+            & ((self.masks & center_mask) != 0)
+            & ((self.memberships & self.active_mask(active_list_types)) != 0)
+            & (self.lengths >= MIN_WORD_LENGTH)
+        )
+        return np.flatnonzero(selected)
+
+    def pangram_flags(self, indices, letters):
+        """Vectorized pangram detection: the word uses every puzzle letter."""
+        return self.masks[indices] == letters_to_mask(letters)
+
+    def scores(self, indices, letters):
+        """Vectorized calculate_score: 1 point for 4 letters, length otherwise, +7 for pangrams."""
+        lengths = self.lengths[indices].astype(np.int64)
+        base = np.where(lengths == MIN_WORD_LENGTH, 1, lengths)
+        return base + 7 * self.pangram_flags(indices, letters)
+
+    def memberships_at(self, indices, active_list_types):
+        """{word: [list_type, ...]} for the words at `indices` (e.g. from solution_indices)."""
+        memberships = {}
+        for index in indices:
+            membership = int(self.memberships[index])
+            memberships[self.word_at(index)] = [
+                list_type for list_type in active_list_types if membership & self.list_bits.get(list_type, 0)
+            ]
+        return memberships
+
+    def choose_letters(self, active_list_types):
+        """Same contract as spelling_bee.choose_letters: (normalized letter set, center letter)."""
+        candidates = self.pangram_indices[
+            (self.memberships[self.pangram_indices] & self.active_mask(active_list_types)) != 0
+        ]
+        if len(candidates) == 0:
+            raise RuntimeError(
+                f"Could not find any words with exactly 7 unique letters (including a vowel) "
+                f"in the active word lists: {active_list_types}."
+            )
+        letters = mask_to_letters(int(self.masks[random.choice(candidates)]))
+        return letters, random.choice(sorted(letters))
+
+
+# --- Per-process engine cache ---
+# {db_path: (file generation, engine or None)}: a rebuilt database (or one that
+# appears after a failed load) is reloaded on the next call.
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(db_path: str):
+    """
+    Returns the process-wide engine for db_path, (re)loading it when the database
+    file's generation changes. Returns None if NumPy is missing or loading fails,
+    so callers fall back to SQL; a failed load is retried once the file changes.
+    """
+    if np is None:
+        return None
+    generation = db_pool.file_generation(db_path)
+    cached = _engines.get(db_path)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    with _engines_lock:
+        cached = _engines.get(db_path)
+        if cached is None or cached[0] != generation:
+            try:
+                engine = LexiconEngine.from_database(db_path)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"--- [LexiconEngine] Could not load lexicon from {db_path}: {e}")
+                engine = None # Not retried until the file changes
+            cached = _engines[db_path] = (generation, engine)
+        return cached[1]
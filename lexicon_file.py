@@ -0,0 +1,280 @@
+# lexicon_file.py
+# Compact binary lexicon written at build time next to the SQLite database and
+# memory-mapped by the solver. Every worker process maps the same file, so the
+# operating system keeps one page-cached copy and opening it costs nothing.
+# Enabled with SOLVER_ENGINE=mmap; SQLite stays the source of truth for definitions.
+#
+# Layout (little-endian, sections 8-byte aligned, offsets recorded in the header):
+#   header       HEADER_FORMAT, followed by the list names (UTF-8, comma separated)
+#   masks        uint32[word_count]   26-bit letter mask of each normalized word, ascending
+#   offsets      uint32[word_count+1] offsets into the word blob
+#   pangrams     uint32[pangram_count] indices of words that can seed a puzzle
+#   memberships  uint64[word_count]   bit i set = word is in list i
+#   lengths      uint8[word_count]    word length in characters
+#   blob         packed UTF-8 words, in mask order
+import array
+import bisect
+import hashlib
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import sys
+import threading
+import time
+
+import db_pool
+from spelling_bee import LETTER_BITS, MIN_WORD_LENGTH, VOWEL_MASK, letters_to_mask, normalize_word
+
+MAGIC = b'SBLEXMAP'
+FORMAT_VERSION = 3
+# magic, version, word_count, pangram_count, generation, list_names_size, 6 section offsets, blob_size
+HEADER_FORMAT = '<8sIII16sIIIIIIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAX_LISTS = 64 # memberships are uint64
+REJECTION_TRIES = 64 # Random pangram draws before choose_letters filters the whole pangram array
+
+class LexiconFileError(Exception):
+    """The lexicon file is missing, malformed, or older than its database."""
+
+def database_generation(conn) -> bytes:
+    """
+    16-byte content generation of a database: a hash of its ingest manifest (each
+    source file's SHA-256 and ingest time, by list). init_db and ingest_list rewrite
+    the manifest whenever they change the words, so a lexicon file stamped with
+    an older generation is stale even if the word count happens to match.
+    """
+    digest = hashlib.sha256()
+    for row in conn.execute(
+            "SELECT list_type, source_path, sha256, ingested_at FROM ingest_manifest ORDER BY list_type, source_path"):
+        digest.update("\0".join(map(str, row)).encode('utf-8') + b"\n")
+    return digest.digest()[:16]
+
+def lexicon_path(db_path: str) -> str:
+    """Lexicon file belonging to a database, e.g. word_database.db -> word_database.lex."""
+    return os.path.splitext(db_path)[0] + '.lex'
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def _uint32_array(values) -> array.array:
+    return _little_endian_array('I', values)
+
+def _little_endian_array(typecode: str, values) -> array.array:
+    values = array.array(typecode, values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+def write_lexicon(path: str, rows, list_bits: dict, generation: bytes) -> dict:
+    """
+    Writes the lexicon file from (word, list_mask) rows of the deduplicated words
+    table; list_bits maps each list_type to its bit in list_mask. Words whose
+    normalized form has letters outside a-z can never be solutions and are left out.
+    `generation` is the database's database_generation, used to detect a stale file.
+    The file is written to a temporary name and renamed into place, so running
+    workers never map a half-written file. Returns a summary dict.
+    """
+    if len(list_bits) > MAX_LISTS:
+        raise LexiconFileError(f"More than {MAX_LISTS} word lists")
+    # File memberships are dense uint64 bits, in list_bits order
+    file_bits = [(bit, 1 << i) for i, bit in enumerate(list_bits.values())]
+
+    entries = []
+    for word, list_mask in rows:
+        normalized = normalize_word(word)
+        if all(ch in LETTER_BITS for ch in normalized):
+            membership = sum(file_bit for bit, file_bit in file_bits if list_mask & bit)
+            entries.append((letters_to_mask(normalized), word, membership))
+    entries.sort()
+
+    encoded = [word.encode('utf-8') for _, word, _ in entries]
+    offsets = [0]
+    for word_bytes in encoded:
+        offsets.append(offsets[-1] + len(word_bytes))
+    pangrams = [i for i, (mask, _, _) in enumerate(entries)
+                if mask.bit_count() == 7 and mask & VOWEL_MASK]
+
+    list_names = ",".join(list_bits).encode('utf-8')
+    sections = [
+        _uint32_array(mask for mask, _, _ in entries).tobytes(),
+        _uint32_array(offsets).tobytes(),
+        _uint32_array(pangrams).tobytes(),
+        _little_endian_array('Q', (membership for _, _, membership in entries)).tobytes(),
+        bytes(len(word) for _, word, _ in entries),
+        b"".join(encoded),
+    ]
+    section_offsets = []
+    position = _align(HEADER_SIZE + len(list_names))
+    for section in sections:
+        section_offsets.append(position)
+        position = _align(position + len(section))
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, len(entries), len(pangrams), generation,
+                         len(list_names), *section_offsets, len(sections[-1]))
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(list_names)
+        for offset, section in zip(section_offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+    os.replace(temp_path, path)
+    return {'path': path, 'words': len(entries), 'pangrams': len(pangrams),
+            'lists': list(list_bits), 'bytes': os.path.getsize(path)}
+
+
+class MappedLexicon:
+    """
+    Read-only, zero-copy view of a lexicon file. Entries are sorted by letter
+    mask, so a puzzle's solutions are found by binary-searching each of the 64
+    subsets of its letters that contain the center - no scan, no NumPy.
+    Same query contract as lexicon_engine.LexiconEngine.
+    """
+    vectorized_scoring = False # solve_puzzle scores solutions itself
+
+    def __init__(self, path: str):
+        if sys.byteorder != 'little':
+            raise LexiconFileError("Lexicon files are little-endian; not supported on this platform")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER_SIZE:
+            raise LexiconFileError(f"{path} is truncated")
+        (magic, version, word_count, pangram_count, self.generation, names_size,
+         masks_at, offsets_at, pangrams_at, memberships_at, lengths_at, blob_at, blob_size) = \
+            struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise LexiconFileError(f"{path} is not a version {FORMAT_VERSION} lexicon file")
+        if blob_at + blob_size > len(self._mmap):
+            raise LexiconFileError(f"{path} is truncated")
+
+        self.path = path
+        view = memoryview(self._mmap)
+        names = bytes(view[HEADER_SIZE:HEADER_SIZE + names_size]).decode('utf-8')
+        self.list_bits = {name: 1 << i for i, name in enumerate(names.split(',')) if name}
+        self.masks = view[masks_at:masks_at + 4 * word_count].cast('I')
+        self.offsets = view[offsets_at:offsets_at + 4 * (word_count + 1)].cast('I')
+        self.pangram_indices = view[pangrams_at:pangrams_at + 4 * pangram_count].cast('I')
+        self.memberships = view[memberships_at:memberships_at + 8 * word_count].cast('Q')
+        self.lengths = view[lengths_at:lengths_at + word_count]
+        self.blob = view[blob_at:blob_at + blob_size]
+
+    def __len__(self):
+        return len(self.masks)
+
+    # --- Helpers ---
+    def word_at(self, index: int) -> str:
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+    def active_mask(self, active_list_types) -> int:
+        """Membership mask for a list selection; unknown list types are ignored."""
+        return sum(self.list_bits.get(list_type, 0) for list_type in set(active_list_types))
+
+    # --- Queries ---
+    def solution_indices(self, letters, center_letter: str, active_list_types) -> list[int]:
+        """Indices of every word made of `letters`, containing the center, in an active list."""
+        letters_mask = letters_to_mask(letters)
+        center_bit = letters_to_mask(center_letter)
+        active = self.active_mask(active_list_types)
+        if not center_bit or not active:
+            return []
+        masks, lengths, memberships = self.masks, self.lengths, self.memberships
+        indices = []
+        # Submasks of the outer letters, each combined with the center letter
+        outer = letters_mask & ~center_bit
+        subset = outer
+        while True:
+            key = subset | center_bit
+            start = bisect.bisect_left(masks, key)
+            end = bisect.bisect_right(masks, key, start)
+            for index in range(start, end):
+                if memberships[index] & active and lengths[index] >= MIN_WORD_LENGTH:
+                    indices.append(index)
+            if not subset:
+                break
+            subset = (subset - 1) & outer
+        return indices
+
+    def memberships_at(self, indices, active_list_types):
+        """{word: [list_type, ...]} for the words at `indices` (e.g. from solution_indices)."""
+        memberships = {}
+        for index in indices:
+            membership = self.memberships[index]
+            memberships[self.word_at(index)] = [
+                list_type for list_type in active_list_types if membership & self.list_bits.get(list_type, 0)
+            ]
+        return memberships
+
+    def choose_letters(self, active_list_types):
+        """Same contract as spelling_bee.choose_letters: (normalized letter set, center letter)."""
+        active = self.active_mask(active_list_types)
+        pangrams, memberships = self.pangram_indices, self.memberships
+        chosen = None
+        if active and len(pangrams):
+            # Rejection sampling stays uniform over the eligible pangrams and almost
+            # always succeeds at once (the mandatory list holds most of them)
+            for _ in range(REJECTION_TRIES):
+                index = pangrams[random.randrange(len(pangrams))]
+                if memberships[index] & active:
+                    chosen = index
+                    break
+            else:
+                eligible = [index for index in pangrams if memberships[index] & active]
+                chosen = random.choice(eligible) if eligible else None
+        if chosen is None:
+            raise RuntimeError(
+                f"Could not find any words with exactly 7 unique letters (including a vowel) "
+                f"in the active word lists: {active_list_types}."
+            )
+        mask = self.masks[chosen]
+        letters = {letter for letter, bit in LETTER_BITS.items() if mask & bit}
+        return letters, random.choice(sorted(letters))
+
+
+# --- Per-process lexicon cache ---
+# {db_path: ((database file generation, lexicon file generation), lexicon)}. A
+# rebuild or update-db changes either file, so the next call maps the new file.
+_lexicons = {}
+_lexicons_lock = threading.Lock()
+
+def _current_generation(db_path: str) -> bytes:
+    conn = sqlite3.connect(db_pool.read_only_uri(db_path, immutable=False), uri=True)
+    try:
+        return database_generation(conn)
+    finally:
+        conn.close()
+
+def open_lexicon(db_path: str) -> MappedLexicon:
+    """Maps db_path's lexicon file, checking its generation matches the database's current one."""
+    start_time = time.time()
+    lexicon = MappedLexicon(lexicon_path(db_path))
+    if lexicon.generation != _current_generation(db_path):
+        raise LexiconFileError(f"{lexicon.path} is stale; rebuild it with 'flask init-db' or 'flask update-db'")
+    print(f"--- [MappedLexicon] Mapped {len(lexicon):,} words from {lexicon.path} in {time.time() - start_time:.3f}s")
+    return lexicon
+
+def get_lexicon(db_path: str):
+    """
+    Returns the process-wide mapped lexicon for db_path, remapping it when the
+    database or lexicon file changes. Returns None if the file is missing,
+    malformed or stale, so callers fall back to SQL; failures are not cached, so
+    a lexicon written later is picked up by the next game.
+    """
+    generation = (db_pool.file_generation(db_path), db_pool.file_generation(lexicon_path(db_path)))
+    cached = _lexicons.get(db_path)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    with _lexicons_lock:
+        cached = _lexicons.get(db_path)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        try:
+            lexicon = open_lexicon(db_path)
+        except (LexiconFileError, sqlite3.Error, OSError, ValueError) as e:
+            print(f"--- [MappedLexicon] Could not map lexicon for {db_path}: {e}")
+            _lexicons.pop(db_path, None)
+            return None
+        # The previous mapping is left to the garbage collector: games may still be reading it
+        _lexicons[db_path] = (generation, lexicon)
+        return lexicon
@@ -0,0 +1,187 @@
+# metrics.py
+# Minimal in-process counters and histograms, rendered in the Prometheus text
+# exposition format at /metrics. No dependencies; each update is one lock and a
+# dict lookup, so instrumentation can stay on in production (METRICS_ENABLED=0
+# turns every update into a no-op). Values are per process.
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_number(value)}"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (Prometheus semantics), optionally split by labels.
+    With `timing_label`, observations are also reported to the per-request
+    stage collector (see collect_stage_timings), named by that label's value.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, timing_label=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.timing_label = timing_label
+        self._series = {} # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if self.timing_label:
+            stages = getattr(_request_timings, 'stages', None)
+            if stages is not None:
+                stages.append((labels.get(self.timing_label, self.name), value))
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall time of the with-block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of time()."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, extra=(('le', _format_number(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None: # Module reloaded - keep the live instance
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            exposed = f"{metric.name}_total" if metric.kind == 'counter' else metric.name
+            lines.append(f"# HELP {exposed} {metric.documentation}")
+            lines.append(f"# TYPE {exposed} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+# --- Per-request stage timings (Server-Timing) ---
+_request_timings = threading.local()
+
+def collect_stage_timings():
+    """Starts recording stage observations made on this thread."""
+    _request_timings.stages = []
+
+def stop_stage_timings() -> list:
+    """Stops recording and returns [(stage, seconds), ...] observed since collect_stage_timings()."""
+    stages = getattr(_request_timings, 'stages', None)
+    _request_timings.stages = None
+    return stages or []
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def counter(name, documentation, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, timing_label=None) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets, timing_label))
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# --- Application metrics ---
+STAGE_SECONDS = histogram('spelling_bee_stage_seconds', "Time spent in request and puzzle generation stages.", ('stage',),
+                          timing_label='stage')
+HTTP_REQUEST_SECONDS = histogram('http_request_duration_seconds', "Request latency by endpoint.", ('endpoint', 'method', 'status'))
+SESSION_COOKIE_BYTES = histogram('session_cookie_bytes', "Size of the Set-Cookie headers written for the session.",
+                                 buckets=SIZE_BUCKETS)
+GUESS_OUTCOMES = counter('guess_outcomes', "Guesses by outcome.", ('outcome',))
+DEFINITION_EVENTS = counter('definition_events', "Definition lookups by source and upstream result.", ('event',))
+DEFINITION_UPSTREAM_SECONDS = histogram('definition_upstream_seconds', "Dictionary API call latency.", ('status',))
@@ -0,0 +1,94 @@
+# profiler.py
+# Opt-in cProfile of individual requests. A request is profiled when it is
+# sampled (PROFILE_SAMPLE_RATE) or carries PROFILE_HEADER set to PROFILE_TOKEN;
+# the profile is written to PROFILE_DIR as a .prof file (open it with
+# `python -m pstats`, snakeviz, or convert it to a flame graph with flameprof).
+import cProfile
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))  # Fraction of requests profiled (0 = off)
+PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')            # Request header that asks for a profile...
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')                        # ...if its value matches (unset = header ignored)
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'spelling_bee_profiles'))
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'              # Timing headers on every response
+
+_UNSAFE_CHARS_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class RequestProfiler:
+    """
+    Profiles at most one request at a time per process (cProfile cannot nest
+    across threads). Requests that would be profiled while another one is
+    running are served normally.
+    """
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, header=PROFILE_HEADER, token=PROFILE_TOKEN,
+                 directory=PROFILE_DIR):
+        self.sample_rate = sample_rate
+        self.header = header
+        self.token = token
+        self.directory = directory
+        self._busy = threading.Lock()
+        self.written = 0
+        self.skipped_busy = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or bool(self.token)
+
+    def header_requested(self, headers) -> bool:
+        """True if the request carries the profile header with the configured token."""
+        return bool(self.token) and headers.get(self.header) == self.token
+
+    def wants(self, headers) -> bool:
+        if not self.enabled:
+            return False
+        return self.header_requested(headers) or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self):
+        """Starts profiling the current thread. Returns the profile, or None if one is already running."""
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError: # Another profiler (e.g. a debugger) is active
+            self._busy.release()
+            return None
+        return profile
+
+    def stop(self, profile, name: str, elapsed: float):
+        """Stops the profile and writes it to the profile directory. Returns the file path."""
+        try:
+            profile.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_UNSAFE_CHARS_RE.sub('_', name)}-{elapsed * 1000:.0f}ms.prof"
+            path = os.path.join(self.directory, filename)
+            profile.dump_stats(path)
+            self.written += 1
+            return path
+        except OSError as e:
+            print(f"--- [profiler] Could not write profile: {e}")
+            return None
+        finally:
+            self._busy.release()
+
+    def stats(self) -> dict:
+        return {'enabled': self.enabled, 'sample_rate': self.sample_rate, 'directory': self.directory,
+                'written': self.written, 'skipped_busy': self.skipped_busy}
+
+
+def server_timing_header(stages, total: float) -> str:
+    """Server-Timing value from [(stage, seconds), ...]; repeated stages are summed."""
+    durations = {}
+    for stage, seconds in stages:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    entries = [f"{_UNSAFE_CHARS_RE.sub('_', stage)};dur={seconds * 1000:.2f}" for stage, seconds in durations.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
@@ -0,0 +1,120 @@
+# puzzle_pool.py
+# In-process pool of already-solved puzzles, keyed by list selection.
+# A background thread keeps each queue topped up so /start_game rarely has to
+# choose and solve a puzzle synchronously.
+import collections
+import os
+import threading
+import time
+
+DEFAULT_DEPTH = int(os.environ.get('PUZZLE_POOL_DEPTH', '4'))                 # Puzzles kept per list selection (0 disables)
+DEFAULT_LOW_WATERMARK = int(os.environ.get('PUZZLE_POOL_LOW_WATERMARK', '1')) # Refill once a queue drops to this size
+ERROR_BACKOFF_SECONDS = 5 # Pause after a failed generation (e.g. database missing)
+IDLE_WAKEUP_SECONDS = 30  # Periodic re-check even without demand
+
+def pool_key(active_list_types) -> tuple:
+    """Canonical pool key for a list selection, e.g. ('csw21', 'te_reo')."""
+    return tuple(sorted(set(active_list_types)))
+
+
+class PuzzlePool:
+    """
+    Queues of solved puzzles per list selection, refilled by a daemon thread.
+    `generate` is called as generate(list_of_list_types) and must return a puzzle
+    (or raise). The thread is started lazily on first use so forked workers and
+    CLI commands don't inherit or spawn it needlessly.
+    """
+
+    def __init__(self, generate, depth=DEFAULT_DEPTH, low_watermark=DEFAULT_LOW_WATERMARK, known_selections=()):
+        self.generate = generate
+        self.depth = max(0, depth)
+        self.low_watermark = min(max(0, low_watermark), self.depth)
+        self._queues = {pool_key(selection): collections.deque() for selection in known_selections}
+        self._condition = threading.Condition()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.depth > 0
+
+    def start(self):
+        """Starts the refill thread (idempotent)."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._refill_loop, name='puzzle-pool-refill', daemon=True)
+            self._thread.start()
+            print(f"--- [PuzzlePool] Refill thread started (depth={self.depth}, low_watermark={self.low_watermark})")
+
+    def get(self, active_list_types):
+        """
+        Returns a pre-solved puzzle for the list selection, or None on a miss.
+        Either way the refill thread is woken if the queue is at its watermark.
+        """
+        if not self.enabled:
+            return None
+        self.start()
+        key = pool_key(active_list_types)
+        with self._condition:
+            queue = self._queues.setdefault(key, collections.deque())
+            puzzle = queue.popleft() if queue else None
+            if puzzle is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(queue) <= self.low_watermark:
+                self._condition.notify()
+        return puzzle
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current queue sizes, for sizing the pool."""
+        with self._condition:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'depth': self.depth,
+                'low_watermark': self.low_watermark,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'generated': self.generated,
+                'errors': self.errors,
+                'queued': {",".join(key): len(queue) for key, queue in self._queues.items()},
+            }
+
+    # --- Refill thread ---
+    def _next_key_to_refill(self):
+        """Most depleted queue at or below the watermark, or None if all are healthy."""
+        candidates = [(len(q), key) for key, q in self._queues.items() if len(q) <= self.low_watermark]
+        return min(candidates)[1] if candidates else None
+
+    def _refill_loop(self):
+        while True:
+            with self._condition:
+                key = self._next_key_to_refill()
+                while key is None:
+                    self._condition.wait(timeout=IDLE_WAKEUP_SECONDS)
+                    key = self._next_key_to_refill()
+
+            # Top this queue up to full depth, generating outside the lock
+            while True:
+                with self._condition:
+                    if len(self._queues[key]) >= self.depth:
+                        break
+                try:
+                    puzzle = self.generate(list(key))
+                except Exception as e:
+                    with self._condition:
+                        self.errors += 1
+                    print(f"--- [PuzzlePool] Failed to generate puzzle for {key}: {e}")
+                    time.sleep(ERROR_BACKOFF_SECONDS)
+                    break
+                with self._condition:
+                    self._queues[key].append(puzzle)
+                    self.generated += 1
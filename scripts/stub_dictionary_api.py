@@ -0,0 +1,124 @@
+"""
+Local stand-in for api.dictionaryapi.dev, for exercising the definition cache
+without touching the real service:
+
+    python scripts/stub_dictionary_api.py --port 8089
+    DICTIONARY_API_URL='http://127.0.0.1:8089/api/v2/entries/en/{word}' python3 -m flask run
+
+Answers GET /api/v2/entries/en/<word> with a canned definition, or a 404 in the
+upstream's format for a deterministic fraction of words (--missing-ratio).
+Failure injection: --latency/--jitter delay every answer and --error-ratio turns
+a random fraction into 503s. They can be changed while running with
+GET /control?latency=2&jitter=0.5&error_ratio=0.3 (omitted values are kept).
+GET /stats returns the number of requests served.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ENTRY_PREFIX = '/api/v2/entries/en/'
+
+def is_missing(word: str, missing_ratio: float) -> bool:
+    """Deterministic per word, so repeated lookups get the same answer."""
+    return (zlib.crc32(word.encode('utf-8')) % 1000) < missing_ratio * 1000
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "StubDictionaryAPI/1.0"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # Client gave up (e.g. its timeout fired during injected latency)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/stats':
+            self._send_json(200, {'requests': self.server.request_count, 'errors': self.server.error_count})
+            return
+        if url.path == '/control':
+            for name, value in parse_qs(url.query).items():
+                if name in ('latency', 'jitter', 'error_ratio', 'missing_ratio'):
+                    setattr(self.server, name, float(value[-1]))
+            self._send_json(200, {name: getattr(self.server, name)
+                                  for name in ('latency', 'jitter', 'error_ratio', 'missing_ratio')})
+            return
+        if not url.path.startswith(ENTRY_PREFIX):
+            self._send_json(404, {'title': 'Not Found'})
+            return
+        with self.server.count_lock:
+            self.server.request_count += 1
+        word = unquote(url.path[len(ENTRY_PREFIX):])
+
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < self.server.error_ratio:
+            with self.server.count_lock:
+                self.server.error_count += 1
+            self._send_json(503, {'title': 'Service Unavailable'})
+            return
+        if is_missing(word, self.server.missing_ratio):
+            self._send_json(404, {
+                'title': 'No Definitions Found',
+                'message': "Sorry pal, we couldn't find definitions for the word you were looking for.",
+                'resolution': 'You can try the search again at later time or head to the web instead.',
+            })
+            return
+        self._send_json(200, [{
+            'word': word,
+            'meanings': [{
+                'partOfSpeech': 'noun',
+                'definitions': [{'definition': f"Stub definition of '{word}'."}],
+            }],
+        }])
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host='127.0.0.1', port=8089, missing_ratio=0.2, quiet=True, latency=0.0, jitter=0.0, error_ratio=0.0):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.missing_ratio = missing_ratio
+    server.latency = latency
+    server.jitter = jitter
+    server.error_ratio = error_ratio
+    server.quiet = quiet
+    server.request_count = 0
+    server.error_count = 0
+    server.count_lock = threading.Lock()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub dictionary API server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--missing-ratio', type=float, default=0.2, help="Fraction of words answered with 404.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every answer.")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random delay, up to this many seconds.")
+    parser.add_argument('--error-ratio', type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument('--verbose', action='store_true', help="Log every request.")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.missing_ratio, quiet=not args.verbose,
+                         latency=args.latency, jitter=args.jitter, error_ratio=args.error_ratio)
+    print(f"Stub dictionary API on http://{args.host}:{args.port}{ENTRY_PREFIX}<word> "
+          f"(missing ratio {args.missing_ratio}, latency {args.latency}s+{args.jitter}s, error ratio {args.error_ratio})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,11 +1,17 @@
 import random
 import string
+import logging
 from collections.abc import Iterable
-import sys
 import sqlite3 # Standard import should now work due to injection
 import os # Added os
-import time # Added time
-import unicodedata # Add unicodedata for normalization
+from types import MappingProxyType
+
+import db_pool # Persistent read-only connections
+import metrics
+from ttl_cache import TTLCache
+
+# Per-solve diagnostics go to DEBUG; timings are recorded by metrics.STAGE_SECONDS
+logger = logging.getLogger(__name__)
 
 # Constants
 MIN_WORD_LENGTH = 4
@@ -26,100 +32,172 @@ def normalize_word(word: str) -> str:
     if not isinstance(word, str):
         return ""
     return word.lower().translate(MACRON_MAP)
+
+def letter_set_key(word: str) -> str:
+    """
+    Canonical letter-set key: the word's distinct normalized letters, sorted.
+    Used at build time for the pangram and puzzle catalog letter sets.
+    """
+    return "".join(sorted(set(normalize_word(word))))
 # --- Macron Normalization --- END
 
+# --- Letter Masks ---
+# 26-bit masks over the normalized letters (bit 0 = 'a'). Stored per word at build
+# time (words.letter_mask) so solving compares integers instead of strings.
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(string.ascii_lowercase)}
+VOWEL_MASK = sum(LETTER_BITS[v] for v in VOWELS if v in LETTER_BITS)
+
+def letters_to_mask(letters) -> int:
+    """Converts an iterable of normalized letters into a 26-bit mask (bit 0 = 'a')."""
+    mask = 0
+    for letter in letters:
+        mask |= LETTER_BITS.get(letter, 0)
+    return mask
+
+def word_columns(word: str) -> tuple[str, int, int, int]:
+    """
+    Build-time columns for a word: (normalized_word, letter_mask,
+    distinct_letter_count, length). Computed once by database_setup so the hot
+    path never has to normalize.
+    """
+    normalized = normalize_word(word)
+    mask = letters_to_mask(normalized)
+    return normalized, mask, mask.bit_count(), len(word)
+
+# --- Solver Engine Selection ---
+# 'sql' (default) solves each game with SQLite queries; 'numpy' uses the optional
+# in-memory lexicon_engine and falls back to SQL if NumPy is unavailable; 'mmap'
+# maps the binary lexicon file written by init_db (lexicon_file) and falls back to
+# SQL if the file is missing or stale.
+SOLVER_ENGINE = os.environ.get('SOLVER_ENGINE', 'sql').lower()
+
+def _get_engine(db_path):
+    """Returns the lexicon engine selected by SOLVER_ENGINE if loadable, else None."""
+    # Imported lazily: optional backends that import this module
+    if SOLVER_ENGINE == 'numpy':
+        import lexicon_engine
+        return lexicon_engine.get_engine(db_path)
+    if SOLVER_ENGINE == 'mmap':
+        import lexicon_file
+        return lexicon_file.get_lexicon(db_path)
+    return None
+
+# --- Solved-Puzzle Memo ---
+# Puzzles repeat across games (the catalog and the pangram table are finite), so
+# solve_puzzle keeps its read-only results in a per-process LRU keyed by
+# (database, its file generation, letter set, center letter, sorted list selection).
+# Rebuilding or updating the database changes the generation, so entries solved
+# against an older build are never served again (they age out of the LRU). The
+# pooled connections and the numpy/mmap engines check the same db_pool.file_generation
+# token, so a rebuild is picked up everywhere without a restart.
+SOLUTION_CACHE_SIZE = int(os.environ.get('SOLUTION_CACHE_SIZE', '512')) # Solved puzzles kept per process (0 disables)
+SOLUTION_CACHE_TTL = int(os.environ.get('SOLUTION_CACHE_TTL', '3600'))  # Seconds a solved puzzle is reused (0 = until evicted)
+SOLUTION_CACHE = TTLCache(maxsize=SOLUTION_CACHE_SIZE, ttl=SOLUTION_CACHE_TTL or None)
+
+def solution_cache_key(db_path: str, letters, center_letter: str, active_list_types) -> tuple:
+    """Canonical memo key: the letter set and list selection are sorted and deduplicated."""
+    return (db_path, db_pool.file_generation(db_path), "".join(sorted(set(letters))), center_letter,
+            tuple(sorted(set(active_list_types))))
+
+def solution_cache_stats() -> dict:
+    """Size and hit ratio of the solved-puzzle memo (see TTLCache.stats)."""
+    return {'enabled': SOLUTION_CACHE_SIZE > 0, **SOLUTION_CACHE.stats()}
+
 # --- Database Helper ---
 def _get_db_connection(db_path):
-    """Helper to get a database connection."""
+    """
+    Helper to get this thread's pooled read-only database connection.
+    The connection is reused across calls - callers must not close it.
+    """
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row # Return rows that behave like dicts
-        return conn
+        return db_pool.get_connection(db_path)
     except sqlite3.Error as e:
         print(f"Database connection error to {db_path}: {e}")
         return None
 
 # --- Core Game Logic using Database ---
 
+def pangram_letters(word: str) -> str | None:
+    """
+    Returns the sorted, normalized letters of a word if it can seed a puzzle
+    (exactly 7 unique normalized letters including a vowel), otherwise None.
+    Shared by database_setup when building the 'pangrams' table.
+    """
+    letters = letter_set_key(word)
+    if len(letters) == 7 and any(v in letters for v in VOWELS):
+        return letters
+    return None
+
+def _active_list_bits(cursor, active_list_types: list[str]) -> dict:
+    """
+    {list_type: bit in words.list_mask} for the active lists, from the 'lists'
+    registry, in active_list_types order. Unknown list types are left out.
+    """
+    placeholders = ','.join('?' * len(active_list_types))
+    cursor.execute(f"SELECT list_type, list_id FROM lists WHERE list_type IN ({placeholders})", active_list_types)
+    bits = {list_type: 1 << list_id for list_type, list_id in cursor.fetchall()}
+    return {list_type: bits[list_type] for list_type in active_list_types if list_type in bits}
+
+def _pangram_from_index(cursor, active_list_types: list[str]):
+    """
+    Picks a random pangram from the precomputed 'pangrams' table, uniformly over
+    the pangrams in any active list. Returns (word, normalized_letters_string) or
+    None if no pangram matches.
+    """
+    active_mask = sum(_active_list_bits(cursor, active_list_types).values())
+    # One row per distinct list_mask (a handful), each a run of consecutive pangram_ids
+    cursor.execute("SELECT first_pangram_id, pangram_count FROM pangram_ranges WHERE (list_mask & ?) != 0",
+                   (active_mask,))
+    ranges = cursor.fetchall()
+    pick = random.randrange(sum(count for _, count in ranges)) if ranges else None
+    if pick is None:
+        return None
+    for first_pangram_id, pangram_count in ranges:
+        if pick < pangram_count:
+            break
+        pick -= pangram_count
+
+    cursor.execute("SELECT word, letters FROM pangrams WHERE pangram_id = ?", (first_pangram_id + pick,))
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else None
+
+@metrics.STAGE_SECONDS.timed(stage='choose_letters')
 def choose_letters(db_path: str, active_list_types: list[str]):
     """
     Chooses 7 unique letters by first finding a valid pangram from the database
     within the active word lists, ensuring the letter set includes a vowel.
+    Uses the precomputed 'pangrams' table.
     """
     if not active_list_types:
         raise ValueError("No active word list types provided.")
 
-    print(f"--- [choose_letters PANGRAM-FIRST] Starting... DB: {db_path}, Lists: {active_list_types}")
-    start_time = time.time()
+    engine = _get_engine(db_path)
+    if engine:
+        return engine.choose_letters(active_list_types)
+
+    chosen = None
 
-    conn = None
-    valid_pangram_candidates = []
-    
     try:
         conn = _get_db_connection(db_path)
         if not conn:
             raise ConnectionError(f"Could not connect to database at {db_path}")
 
-        cursor = conn.cursor()
-        placeholders = ','.join('?' * len(active_list_types))
-        # Query potential candidates (length >= 7)
-        sql_query = f"""
-            SELECT DISTINCT word 
-            FROM words 
-            WHERE list_type IN ({placeholders})
-              AND LENGTH(word) >= 7
-        """
-        
-        print("--- [choose_letters PANGRAM-FIRST] Querying candidate words...")
-        cursor.execute(sql_query, active_list_types)
-        candidate_words = cursor.fetchall()
-        print(f"--- [choose_letters PANGRAM-FIRST] Found {len(candidate_words)} candidate words (len >= 7).")
-
-        # Filter candidates in Python
-        print("--- [choose_letters PANGRAM-FIRST] Filtering candidates for 7 unique letters and vowels...")
-        for row in candidate_words:
-            word = row[0]
-            # --- Modify Pangram Check --- START
-            # Calculate normalized letters FIRST
-            original_unique_letters = set(word)
-            normalized_letters = {normalize_word(l) for l in original_unique_letters}
-            
-            # Check if NORMALIZED set has exactly 7 letters AND includes a vowel
-            if len(normalized_letters) == 7 and any(v in normalized_letters for v in VOWELS):
-                 valid_pangram_candidates.append(word) # Add original word
-            # --- Modify Pangram Check --- END
-
-        print(f"--- [choose_letters PANGRAM-FIRST] Found {len(valid_pangram_candidates)} valid pangram candidates after filtering.")
+        chosen = _pangram_from_index(conn.cursor(), active_list_types)
 
     except sqlite3.Error as e:
         print(f"Database error during pangram candidate search: {e}")
         raise ConnectionError(f"Database error finding pangrams: {e}") # Re-raise as connection error or specific DB error
-    finally:
-        if conn:
-            conn.close()
 
-    if not valid_pangram_candidates:
-        end_time = time.time()
-        print(f"--- [choose_letters PANGRAM-FIRST] Failed. Time elapsed: {end_time - start_time:.2f} seconds.")
+    if not chosen:
         raise RuntimeError(
             f"Could not find any words with exactly 7 unique letters (including a vowel) "
             f"in the active word lists: {active_list_types}. "
             f"Check database content and list selections."
         )
 
-    # --- Remove TEMPORARY HARDCODING --- 
-    # chosen_pangram = 'āhuatanga' # <<< TEMPORARY HARDCODING FOR DEBUGGING
-    # print(f"--- [DEBUG] USING HARDCODED PANGRAM: {chosen_pangram} ---") # DEBUG
-    chosen_pangram = random.choice(valid_pangram_candidates) # Use random choice again
-    # --- END HARDCODING REMOVAL ---
-    
-    # --- Normalize the letters from the chosen pangram --- START
-    original_letters = set(chosen_pangram)
-    normalized_letters_set = {normalize_word(l) for l in original_letters}
-    # --- Normalize the letters from the chosen pangram --- END
+    chosen_pangram, letters_string = chosen
+    normalized_letters_set = set(letters_string)
 
-    # Ensure the chosen center letter is valid within the normalized set
-    # potential_center_letters_normalized = list(normalized_letters_set)
     # Check length AFTER normalization, should be 7 now
     if len(normalized_letters_set) != 7:
         # This should not happen with the corrected filter, but raise error if it does
@@ -128,85 +206,319 @@ def choose_letters(db_path: str, active_list_types: list[str]):
     potential_center_letters_normalized = list(normalized_letters_set) # Convert the 7 normalized letters to a list
     center_letter_normalized = random.choice(potential_center_letters_normalized)
     
-    print(f"--- [choose_letters PANGRAM-FIRST] Chosen Pangram: {chosen_pangram}")
-    print(f"--- [choose_letters PANGRAM-FIRST] Original Letters: {original_letters}")
-    print(f"--- [choose_letters PANGRAM-FIRST] Normalized Letters Set: {normalized_letters_set}")
-    print(f"--- [choose_letters PANGRAM-FIRST] Chosen Center (Normalized): {center_letter_normalized}")
-
-    end_time = time.time()
-    print(f"--- [choose_letters PANGRAM-FIRST] Finished. Time: {end_time - start_time:.4f}s")
+    logger.debug("choose_letters: pangram %r, letters %s, center %r, lists %s",
+                 chosen_pangram, letters_string, center_letter_normalized, active_list_types)
     return normalized_letters_set, center_letter_normalized # Return normalized set and center
 
 
-def find_valid_words(db_path: str, letters: set[str], center_letter: str, active_list_types: list[str]):
+# --- Puzzle Catalog ---
+# The catalog (see database_setup.build_puzzle_catalog) stores each pangram letter
+# set's words once, as sorted word ids packed into a blob: the gap to the previous
+# id in 7-bit groups, high bit set on every byte but a number's last (LEB128).
+CATALOG_PICK_TRIES = 64 # Random puzzle ids tried before falling back to an OFFSET scan
+WORD_ID_CHUNK_SIZE = 500 # Word ids per IN (...) lookup, well below SQLite's variable limit
+
+def encode_word_ids(word_ids: Iterable[int]) -> bytes:
+    """Packs word ids (sorted first) into the catalog's delta-varint blob."""
+    packed = bytearray()
+    previous = 0
+    for word_id in sorted(word_ids):
+        gap = word_id - previous
+        previous = word_id
+        while gap >= 0x80:
+            packed.append(gap & 0x7F | 0x80)
+            gap >>= 7
+        packed.append(gap)
+    return bytes(packed)
+
+def decode_word_ids(packed: bytes) -> list[int]:
+    """Inverse of encode_word_ids: the sorted word ids."""
+    word_ids = []
+    word_id = gap = shift = 0
+    for byte in packed:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        word_id += gap
+        word_ids.append(word_id)
+        gap = shift = 0
+    return word_ids
+
+@metrics.STAGE_SECONDS.timed(stage='catalog_pick')
+def choose_catalog_puzzle(db_path: str, active_list_types: list[str]):
     """
-    Find all valid words from the database using the given letters, center letter,
-    and active word lists.
-    Returns a tuple containing:
-        - set: valid_solutions (canonical words with potential macrons)
-        - dict: normalized_solution_map {normalized_word: canonical_word}
+    Samples a ready-made puzzle from the 'puzzles' catalog (see 'flask build-puzzles')
+    for this exact list selection. Returns a dict with 'letters' (set), 'center_letter'
+    and 'word_ids' (the encoded words of its letter set, for solve_puzzle), or None
+    if the catalog is missing or has no puzzle for these lists.
     """
-    valid_solutions = set()
-    normalized_solution_map = {} # Initialize the map
-    if not letters or not center_letter or not active_list_types:
-        return valid_solutions, normalized_solution_map # Return empty set and map
+    if not active_list_types:
+        return None
+    lists_key = ",".join(sorted(set(active_list_types)))
 
     conn = _get_db_connection(db_path)
     if not conn:
-        return valid_solutions, normalized_solution_map # Cannot proceed without DB connection
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT selection_id, puzzle_count FROM catalog_selections WHERE lists = ?", (lists_key,))
+        selection = cursor.fetchone()
+        if not selection or not selection[1]:
+            return None
+        selection_bit = 1 << selection[0]
+        # Puzzles have dense ids and most suit most selections: draw ids until one
+        # suits this selection (uniform over its puzzles), then scan as a last resort
+        cursor.execute("SELECT MAX(puzzle_id) FROM puzzles")
+        max_puzzle_id = cursor.fetchone()[0] or 0
+        row = None
+        for _ in range(CATALOG_PICK_TRIES):
+            cursor.execute("SELECT letter_set_id, center_letter, selection_mask FROM puzzles WHERE puzzle_id = ?",
+                           (random.randint(1, max_puzzle_id),))
+            row = cursor.fetchone()
+            if row and row['selection_mask'] & selection_bit:
+                break
+        else:
+            cursor.execute(
+                "SELECT letter_set_id, center_letter FROM puzzles WHERE (selection_mask & ?) != 0 LIMIT 1 OFFSET ?",
+                (selection_bit, random.randrange(selection[1]))
+            )
+            row = cursor.fetchone()
+        if not row:
+            return None
+        cursor.execute("SELECT letters, word_ids FROM catalog_letter_sets WHERE letter_set_id = ?",
+                       (row['letter_set_id'],))
+        letter_set = cursor.fetchone()
+    except sqlite3.Error as e:
+        # No catalog built for this database - caller generates a puzzle instead
+        logger.debug("choose_catalog_puzzle: catalog unavailable (%s)", e)
+        return None
 
-    cursor = conn.cursor()
-    placeholders = ','.join('?' * len(active_list_types))
-    # Query words containing the center letter from the active lists
-    # We will filter based on the full letter set in Python
+    if not letter_set:
+        return None
+    return {
+        'letters': set(letter_set['letters']),
+        'center_letter': row['center_letter'],
+        'word_ids': letter_set['word_ids'],
+    }
+
+def candidate_letter_masks(letters: set[str], center_letter: str) -> list[int]:
+    """
+    Enumerates the letter masks a solution can have: every subset of the outer
+    letters plus the center letter (64 masks for a 7-letter puzzle).
+    """
+    center_bit = letters_to_mask(center_letter)
+    outer = letters_to_mask(letters) & ~center_bit
+    masks = []
+    subset = outer
+    while True:
+        masks.append(subset | center_bit)
+        if not subset:
+            return masks
+        subset = (subset - 1) & outer
+
+@metrics.STAGE_SECONDS.timed(stage='sql_fetch')
+def _fetch_words_by_letter_mask(cursor, letters, center_letter, active_list_types):
+    """
+    Fetches solution rows with indexed equality lookups on words.letter_mask; list
+    membership is a bitmask test. Every returned row is already a valid solution -
+    no Python filtering needed. Rows are
+    (word, [list_type, ...], normalized_word, length, distinct_letter_count).
+    """
+    list_bits = _active_list_bits(cursor, active_list_types)
+    masks = candidate_letter_masks(letters, center_letter)
+    mask_placeholders = ','.join('?' * len(masks))
     sql_query = f"""
-        SELECT word
+        SELECT word, list_mask, normalized_word, length, distinct_letter_count
         FROM words
-        WHERE list_type IN ({placeholders})
-          AND LENGTH(word) >= ?
-          AND instr(word, ?) > 0
+        WHERE letter_mask IN ({mask_placeholders})
+          AND (list_mask & ?) != 0
+          AND length >= ?
+    """
+    cursor.execute(sql_query, masks + [sum(list_bits.values()), MIN_WORD_LENGTH])
+    rows = []
+    for word, list_mask, normalized_word, length, distinct_letter_count in cursor.fetchall():
+        list_types = [list_type for list_type, bit in list_bits.items() if list_mask & bit]
+        rows.append((word, list_types, normalized_word, length, distinct_letter_count))
+    return rows
+
+@metrics.STAGE_SECONDS.timed(stage='sql_fetch')
+def _fetch_words_by_id(cursor, word_ids, center_letter, active_list_types):
+    """
+    Fetches the catalog's stored solution: the rows among word_ids (every word
+    whose letters the puzzle contains) that use the center letter and belong to
+    an active list. Primary-key lookups; rows as in _fetch_words_by_letter_mask.
     """
-    # Parameters: list types, min length, center letter
-    query_params = active_list_types + [MIN_WORD_LENGTH, center_letter] 
+    list_bits = _active_list_bits(cursor, active_list_types)
+    active_mask = sum(list_bits.values())
+    rows = []
+    for i in range(0, len(word_ids), WORD_ID_CHUNK_SIZE):
+        chunk = word_ids[i:i + WORD_ID_CHUNK_SIZE]
+        cursor.execute(f"""
+            SELECT word, list_mask, normalized_word, length, distinct_letter_count
+            FROM words
+            WHERE word_id IN ({','.join('?' * len(chunk))})
+              AND (letter_mask & ?) != 0
+              AND (list_mask & ?) != 0
+        """, chunk + [letters_to_mask(center_letter), active_mask])
+        for word, list_mask, normalized_word, length, distinct_letter_count in cursor.fetchall():
+            list_types = [list_type for list_type, bit in list_bits.items() if list_mask & bit]
+            rows.append((word, list_types, normalized_word, length, distinct_letter_count))
+    return rows
+
+def _engine_solution_details(engine, indices, active_list_types: list[str]) -> dict:
+    """find_solution_details' result for the engine words at `indices`."""
+    details = {}
+    for word, list_types in engine.memberships_at(indices, active_list_types).items():
+        normalized_word, _, distinct_letter_count, length = word_columns(word)
+        details[word] = (normalized_word, length, distinct_letter_count, list_types)
+    return details
+
+@metrics.STAGE_SECONDS.timed(stage='find_valid_words')
+def find_solution_details(db_path: str, letters: set[str], center_letter: str, active_list_types: list[str],
+                          word_ids: bytes | None = None) -> dict:
+    """
+    Finds every solution in one query (or one engine pass):
+    {word: (normalized_word, length, distinct_letter_count, [list_type, ...])}
+    with list types in active_list_types order. On the SQL path the first three
+    come straight from build-time columns. With a catalog puzzle's encoded
+    word_ids the stored solution is read instead of solving. Returns {} if
+    nothing matches or the DB is unavailable.
+    """
+    if not letters or not center_letter or not active_list_types:
+        return {}
 
-    try:
-        print(f"--- [DEBUG find_valid_words] Executing SQL: {sql_query} with params {query_params}") # Log query
-        cursor.execute(sql_query, query_params)
-        candidate_words = cursor.fetchall() # Fetch all potential words
-        print(f"--- [DEBUG find_valid_words] Candidates after SQL filter: {len(candidate_words)}") # Log count after SQL
-
-        # Filter candidates in Python using normalized forms
-        # The input 'letters' set is already normalized by choose_letters
-        normalized_allowed_chars = letters 
-        # The input 'center_letter' is already normalized
-        normalized_center_char = center_letter 
-
-        for row in candidate_words:
-            word = row[0] # Original word with macrons
-            normalized_word = normalize_word(word) # Normalize the candidate
-
-            # Check 1: Does the NORMALIZED word contain the NORMALIZED center letter?
-            if normalized_center_char not in normalized_word:
-                continue # Skip if center letter check fails
-            
-            # Check 2: Are all characters in the NORMALIZED word within the NORMALIZED allowed set?
-            if all(normalized_char in normalized_allowed_chars for normalized_char in normalized_word):
-                valid_solutions.add(word) # Add the ORIGINAL word
-                # Add to the normalization map (using normalized form as key)
-                normalized_solution_map[normalized_word] = word
-
-        print(f"Found {len(valid_solutions)} valid words from DB query and filtering.")
-        print(f"Created normalization map with {len(normalized_solution_map)} entries.") # Log map size
-        print(f"--- [DEBUG find_valid_words] Final Valid Solutions (First 50): {sorted(list(valid_solutions))[:50]}")
-        return valid_solutions, normalized_solution_map # Return set and map
+    engine = _get_engine(db_path) if word_ids is None else None
+    if engine:
+        return _engine_solution_details(engine, engine.solution_indices(letters, center_letter, active_list_types),
+                                        active_list_types)
 
+    conn = _get_db_connection(db_path)
+    if not conn:
+        return {} # Cannot proceed without DB connection
+
+    try:
+        if word_ids is None:
+            rows = _fetch_words_by_letter_mask(conn.cursor(), letters, center_letter, active_list_types)
+        else:
+            rows = _fetch_words_by_id(conn.cursor(), decode_word_ids(word_ids), center_letter, active_list_types)
     except sqlite3.Error as e:
         print(f"Database error during valid word search: {e}")
-        return set(), {} # Return empty set and map on error
-    finally:
-        if conn:
-            conn.close()
+        return {}
 
+    details = {word: (normalized_word, length, distinct_letter_count, list_types)
+               for word, list_types, normalized_word, length, distinct_letter_count in rows}
+    logger.debug("find_solution_details: %d solutions for %s/%s", len(details), "".join(sorted(letters)), center_letter)
+    return details
+
+def find_valid_words(db_path: str, letters: set[str], center_letter: str, active_list_types: list[str]):
+    """
+    Find all valid words from the database using the given letters, center letter,
+    and active word lists.
+    Returns a tuple containing:
+        - set: valid_solutions (canonical words with potential macrons)
+        - dict: normalized_solution_map {normalized_word: canonical_word}
+    """
+    details = find_solution_details(db_path, letters, center_letter, active_list_types)
+    valid_solutions = set(details)
+    # Normalization map (using normalized form as key), from the stored normalized_word column
+    normalized_solution_map = {entry[0]: word for word, entry in details.items()}
+    return valid_solutions, normalized_solution_map
+
+
+def solve_puzzle(db_path: str, letters: set[str], center_letter: str, active_list_types: list[str],
+                 word_ids: bytes | None = None):
+    """
+    Returns the solved puzzle (see _solve_puzzle), memoized in SOLUTION_CACHE.
+    The list selection is sorted and deduplicated first, so every ordering of the
+    same lists shares one entry. The result is shared between games: it is a
+    read-only mapping of tuples, frozensets and read-only mappings.
+    word_ids, from choose_catalog_puzzle, serves the catalog's stored solution.
+    """
+    active_list_types = sorted(set(active_list_types))
+    if SOLUTION_CACHE_SIZE <= 0:
+        return _solve_puzzle(db_path, letters, center_letter, active_list_types, word_ids)
+    key = solution_cache_key(db_path, letters, center_letter, active_list_types)
+    puzzle = SOLUTION_CACHE.get(key)
+    if puzzle is None:
+        puzzle = _solve_puzzle(db_path, letters, center_letter, active_list_types, word_ids)
+        SOLUTION_CACHE.set(key, puzzle) # Concurrent misses may both solve; the results are identical
+    return puzzle
+
+def _solve_puzzle(db_path: str, letters: set[str], center_letter: str, active_list_types: list[str],
+                  word_ids: bytes | None = None):
+    """
+    Solves a puzzle in one lexicon pass and returns everything a game needs:
+        - 'solutions': ordered list of words (found state is a bitset over these indices)
+        - 'solution_index': {normalized_word: index}
+        - 'solution_lists': list membership of each solution, by index
+        - 'list_masks': {list_type: bitset of solution indices in that list}
+        - 'solution_counts': {list_type: number of solutions in that list}
+        - 'solution_scores' / 'solution_pangrams': points and pangram flag of each solution, by index
+        - 'total_score': maximum possible score
+    Scores come from the stored length and distinct letter count; with the NumPy
+    engine they are computed from the same vectorized selection, which is made once
+    and shared with the solution details.
+    """
+    engine = _get_engine(db_path) if word_ids is None else None
+    indices = None
+    if engine and engine.vectorized_scoring and letters and center_letter and active_list_types:
+        with metrics.STAGE_SECONDS.time(stage='find_valid_words'):
+            indices = engine.solution_indices(letters, center_letter, active_list_types)
+            details = _engine_solution_details(engine, indices, active_list_types)
+    else:
+        details = find_solution_details(db_path, letters, center_letter, active_list_types, word_ids)
+    solutions = sorted(details)
+
+    with metrics.STAGE_SECONDS.time(stage='list_attribution'):
+        list_masks = {list_type: 0 for list_type in active_list_types}
+        for index, word in enumerate(solutions):
+            for list_type in details[word][3]:
+                list_masks[list_type] |= 1 << index
+
+    # Per-solution score and pangram flag, so guesses never need the lexicon
+    with metrics.STAGE_SECONDS.time(stage='scoring'):
+        if indices is not None and solutions:
+            words = [engine.word_at(index) for index in indices]
+            score_by_word = dict(zip(words, engine.scores(indices, letters).tolist()))
+            pangram_by_word = dict(zip(words, engine.pangram_flags(indices, letters).tolist()))
+            solution_scores = [score_by_word[word] for word in solutions]
+            solution_pangrams = [pangram_by_word[word] for word in solutions]
+        else:
+            # Every solution's letters are a subset of the puzzle's, so it is a
+            # pangram exactly when its distinct letter count matches
+            letter_count = len(set(letters))
+            solution_pangrams = [details[word][2] == letter_count for word in solutions]
+            solution_scores = [score_from_length(details[word][1], pangram)
+                               for word, pangram in zip(solutions, solution_pangrams)]
+
+    return MappingProxyType({
+        'letters': frozenset(letters),
+        'center_letter': center_letter,
+        'active_list_types': tuple(active_list_types),
+        'solutions': tuple(solutions),
+        'solution_index': MappingProxyType({details[word][0]: i for i, word in enumerate(solutions)}),
+        'solution_lists': tuple(tuple(details[word][3]) for word in solutions),
+        'list_masks': MappingProxyType(list_masks),
+        'solution_counts': MappingProxyType({list_type: mask.bit_count() for list_type, mask in list_masks.items()}),
+        'solution_scores': tuple(solution_scores),
+        'solution_pangrams': tuple(solution_pangrams),
+        'total_score': sum(solution_scores),
+    })
+
+@metrics.STAGE_SECONDS.timed(stage='generate_puzzle')
+def generate_puzzle(db_path: str, active_list_types: list[str]) -> dict:
+    """
+    Picks and solves a new puzzle: samples the prebuilt catalog when available,
+    otherwise chooses letters from a random pangram. Returns the (read-only) solve_puzzle result.
+    Safe to call outside a request (used by the background puzzle pool).
+    """
+    catalog_puzzle = choose_catalog_puzzle(db_path, active_list_types)
+    if catalog_puzzle:
+        return solve_puzzle(db_path, catalog_puzzle['letters'], catalog_puzzle['center_letter'],
+                            active_list_types, catalog_puzzle['word_ids'])
+    letters_set, center_letter = choose_letters(db_path, active_list_types)
+    return solve_puzzle(db_path, letters_set, center_letter, active_list_types)
 
 def is_pangram(word: str, letters: set[str]) -> bool:
     """Check if a word is a pangram (uses all 7 letters)."""
@@ -226,6 +538,14 @@ def calculate_score(word: str, letters: set[str]) -> int:
     else: # Word is longer than min length but not a pangram
         return len(word)
 
+def score_from_length(length: int, pangram: bool) -> int:
+    """calculate_score from precomputed columns: word length and pangram flag."""
+    if length < MIN_WORD_LENGTH:
+        return 0
+    if length == MIN_WORD_LENGTH:
+        return 1
+    return length + 7 if pangram else length
+
 def calculate_total_score(valid_solutions: set[str], letters: set[str]) -> int:
     """Calculate the maximum possible score for the puzzle."""
     # This function no longer needs DB access, just the results
@@ -237,6 +557,19 @@ def calculate_total_score(valid_solutions: set[str], letters: set[str]) -> int:
         total_score += calculate_score(word, letters)
     return total_score
 
+# --- Found-word Bitsets ---
+# A game's solutions are an ordered list; found state is an int bitset over their
+# indices (bit i set = solutions[i] found), and each list_type has a mask of the
+# solution indices it contains. Per-list found counts are popcounts.
+
+def found_words_from_mask(solutions: list[str], found_mask: int) -> list[str]:
+    """Words whose bits are set in found_mask, in solution order."""
+    return [word for i, word in enumerate(solutions) if found_mask >> i & 1]
+
+def found_counts_from_mask(found_mask: int, list_masks: dict[str, int]) -> dict[str, int]:
+    """Number of found words per list_type."""
+    return {list_type: (found_mask & mask).bit_count() for list_type, mask in list_masks.items()}
+
 def get_rank(score: int, total_possible_score: int) -> str:
     """Get the player's rank based on their score."""
     # Ensure total_possible_score is not zero to avoid division error
@@ -193,6 +193,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // Found Words Modal (Original)
     const openFoundWordsModal = () => {
         if(foundWordsModal) foundWordsModal.classList.add('modal-open');
+        prefetchFoundWordDefinitions(); // One batch request instead of one per click
     };
     const closeFoundWordsModal = () => {
         if(foundWordsModal) foundWordsModal.classList.remove('modal-open');
@@ -240,22 +241,20 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (rankElement) rankElement.textContent = result.rank;
 
                 // Update Per-Dictionary Stats (Bottom Panel)
-                if (result.updated_list_type && result.new_found_count !== undefined) {
-                    const listKey = result.updated_list_type;
-                    const newFound = result.new_found_count;
-                    
+                // A word may belong to several lists; each of their counts is updated
+                const updatedCounts = result.updated_counts
+                    || (result.updated_list_type ? { [result.updated_list_type]: result.new_found_count } : {});
+                Object.entries(updatedCounts).forEach(([listKey, newFound]) => {
                     // Find the specific dictionary item container
                     const dictItemElement = document.querySelector(`.dict-stat-item[data-list-key="${listKey}"]`);
                     if (dictItemElement) {
                         const foundCountElement = dictItemElement.querySelector(`#found-count-${listKey}`);
-                        const totalCountElement = dictItemElement.querySelector('.dict-total-count'); // Need total to calc remaining
-
                         if (foundCountElement) foundCountElement.textContent = newFound;
                     }
-                }
+                });
                 
                 // Update Found Words Button Count
-                updateFoundWordsButtonCount(); // Call reusable function
+                updateFoundWordsButtonCount(result.found_count); // Call reusable function
 
                 // *** Add word to modal list dynamically ***
                 const modalList = document.getElementById('modal-found-words-list');
@@ -305,6 +304,34 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
+    // Definitions already fetched this page load: word -> text
+    const definitionCache = new Map();
+
+    // Fetches definitions for all found words not yet cached, in one batch request
+    const prefetchFoundWordDefinitions = async () => {
+        if (!modalFoundWordsList) return;
+        const words = Array.from(modalFoundWordsList.querySelectorAll('li[data-word]'))
+            .map(li => li.getAttribute('data-word'))
+            .filter(word => word && !definitionCache.has(word))
+            .slice(0, 200); // Server-side batch limit
+        if (words.length === 0) return;
+        try {
+            const response = await fetch('/definitions', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ words })
+            });
+            if (!response.ok) return; // Clicks fall back to single lookups
+            const data = await response.json();
+            words.forEach(word => {
+                const definition = data.definitions?.[word.toLowerCase()];
+                if (definition) definitionCache.set(word, definition);
+            });
+        } catch (error) {
+            console.warn("Definition batch prefetch failed:", error);
+        }
+    };
+
     // Helper for definition fetching (extracted from submitGuess)
     const handleFoundWordClickForDefinition = async (event) => {
         console.log("handleFoundWordClickForDefinition triggered"); // <<< LOG 1
@@ -333,6 +360,15 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
+        // Already fetched (e.g. by the batch prefetch) - show it without a round trip
+        if (definitionCache.has(wordToDefine)) {
+            definitionArea.innerHTML = '';
+            const definitionP = document.createElement('p');
+            definitionP.textContent = definitionCache.get(wordToDefine);
+            definitionArea.appendChild(definitionP);
+            return;
+        }
+
         // Update the dedicated definition area
         definitionArea.innerHTML = '<p class="placeholder loading">Loading definition...</p>'; // Use loading class
         console.log("Set definition area to loading..."); // <<< LOG 4
@@ -353,6 +389,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             // Update definition area with actual definition
             definitionArea.innerHTML = ''; // Clear loading message
+            if (data.definition) definitionCache.set(wordToDefine, data.definition);
             const definitionP = document.createElement('p');
             definitionP.textContent = data.definition || 'Definition not available.';
             definitionArea.appendChild(definitionP);
@@ -860,13 +897,15 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // --- Move Helper Function Definitions Inside DOMContentLoaded Scope ---
 
-    function updateFoundWordsButtonCount() {
-        // Find all found count elements in the per-dictionary stats
-        const foundCountElements = document.querySelectorAll('.dict-found-count');
-        let totalFound = 0;
-        foundCountElements.forEach(el => {
-            totalFound += parseInt(el.textContent || '0', 10);
-        });
+    function updateFoundWordsButtonCount(totalFound) {
+        // Prefer the server's distinct total: per-dictionary counts overlap when
+        // a word is in several lists. Fall back to summing them.
+        if (totalFound === undefined || totalFound === null) {
+            totalFound = 0;
+            document.querySelectorAll('.dict-found-count').forEach(el => {
+                totalFound += parseInt(el.textContent || '0', 10);
+            });
+        }
 
         // Update the button text
         const foundWordsCountSpan = document.getElementById('found-words-count');
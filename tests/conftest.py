@@ -0,0 +1,122 @@
+# tests/conftest.py
+# Shared fixtures: a small three-list lexicon built into a throwaway database.
+import importlib.util
+import os
+import sys
+import tempfile
+
+# Set before the modules under test read them: the test lexicon is tiny, start_game
+# solves synchronously (no refill thread), caches live in a throwaway directory and
+# upstream definition lookups are refused at once
+_WORK_DIR = tempfile.mkdtemp(prefix='spelling_bee_tests_')
+os.environ.setdefault('READY_MIN_WORDS', '1')
+os.environ.setdefault('PUZZLE_POOL_DEPTH', '0')
+os.environ.setdefault('DEFINITION_CACHE_PATH', os.path.join(_WORK_DIR, 'definition_cache.db'))
+os.environ.setdefault('GAME_STORE_PATH', os.path.join(_WORK_DIR, 'games.db'))
+os.environ.setdefault('DICTIONARY_API_URL', 'http://127.0.0.1:9/{word}')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+import database_setup
+
+# 'planets' (aelnpst) and 'holding' (dghilno) seed the csw21 puzzles
+CSW21_WORDS = [
+    'planets', 'plane', 'planes', 'plant', 'plants', 'slant', 'plates', 'staple', 'pleat', 'pleats',
+    'leant', 'least', 'steal', 'slate', 'tales', 'panel', 'panels', 'petal', 'petals', 'lapse',
+    'sepal', 'spent', 'stale', 'nest', 'nets', 'sent', 'tens', 'pest', 'pets', 'step', 'lens',
+    'lane', 'lanes', 'lean', 'leans', 'late', 'tale', 'teal', 'seal', 'sale', 'slat', 'salt',
+    'last', 'pant', 'pants', 'pane', 'panes', 'nape', 'aspen', 'peat', 'tape', 'pate', 'pates',
+    'tapes', 'plan', 'plans', 'snap', 'span', 'pans', 'past', 'pats', 'spat', 'taps', 'pleas',
+    'peal', 'peals', 'leap', 'leaps', 'pale', 'pales',
+    'holding', 'hold', 'gold', 'long', 'dong', 'hind', 'lion', 'loin', 'dingo', 'doing', 'gild',
+    'ding', 'ling', 'lingo',
+    'cat', 'zzzz',
+]
+# Tab-separated with definitions; 'pāte' is also csw21's 'pate'
+TE_REO_ROWS = [('pāte', 'a sauce'), ('whānau', 'extended family'), ('tāne', 'man'), ('kai', 'food')]
+# 'plonker' (eklnopr) is a pangram only this list has
+NZ_SLANG_ROWS = [('plonker', 'an idiot'), ('munted', 'broken'), ('chur', 'thanks'), ('pants', 'rubbish')]
+
+def write_sources(directory, csw21=CSW21_WORDS, te_reo=TE_REO_ROWS, nz_slang=NZ_SLANG_ROWS) -> dict:
+    """Writes the three source files into `directory`; returns init_db's `sources` mapping."""
+    paths = {'csw21': os.path.join(directory, 'csw21.txt'),
+             'te_reo': os.path.join(directory, 'tereo.csv'),
+             'nz_slang': os.path.join(directory, 'nzslang.csv')}
+    with open(paths['csw21'], 'w', encoding='utf-8') as f:
+        f.write("\n".join(csw21) + "\n")
+    for list_type, rows in (('te_reo', te_reo), ('nz_slang', nz_slang)):
+        with open(paths[list_type], 'w', encoding='utf-8') as f:
+            f.write("".join(f"{word}\t{definition}\n" for word, definition in rows))
+    return {list_type: [path] for list_type, path in paths.items()}
+
+def build_db(directory, sources) -> str:
+    db_path = os.path.join(directory, 'words.db')
+    database_setup.init_db(db_path, sources=sources)
+    return db_path
+
+@pytest.fixture
+def sources(tmp_path):
+    return write_sources(str(tmp_path))
+
+@pytest.fixture
+def word_db(tmp_path, sources):
+    """Path of a freshly built database (with its .lex file) for the test lexicon."""
+    return build_db(str(tmp_path), sources)
+
+@pytest.fixture
+def catalog_db(word_db):
+    """word_db plus a puzzle catalog (every puzzle with at least one solution)."""
+    database_setup.build_puzzle_catalog(word_db, min_words=1, max_words=500, workers=1)
+    return word_db
+
+@pytest.fixture
+def definition_service(word_db, tmp_path, monkeypatch):
+    """
+    DefinitionService over word_db whose upstream is a dict: set
+    `service.upstream[word] = (status, definition)`; calls land in `service.upstream_calls`.
+    """
+    import definitions
+    from circuit_breaker import CircuitBreaker
+    cache = definitions.DefinitionCache(path=str(tmp_path / 'definition_cache.db'))
+    service = definitions.DefinitionService(word_db, cache=cache, fetch_mode='inline',
+                                            breaker=CircuitBreaker(window=2, min_calls=2, cooldown=60))
+    service.upstream = {}
+    service.upstream_calls = []
+    def call_api(word):
+        service.upstream_calls.append(word)
+        return service.upstream.get(word, (definitions.NOT_FOUND, None))
+    monkeypatch.setattr(service, '_call_api', call_api)
+    return service
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """api/index.py loaded against a session-wide test database and throwaway caches."""
+    work_dir = str(tmp_path_factory.mktemp('app'))
+    db_path = build_db(work_dir, write_sources(work_dir))
+    spec = importlib.util.spec_from_file_location('app_under_test', os.path.join(PROJECT_ROOT, 'api', 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.DATABASE_PATH = db_path
+    module.DEFINITIONS.db_path = db_path
+    module._db_readiness = None
+    return module
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+def start_game(client, selected_lists=('csw21',)) -> dict:
+    """POSTs /start_game and returns its JSON payload."""
+    response = client.post('/start_game', json={'selected_lists': list(selected_lists)})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+def game_solutions(app_module, game) -> tuple:
+    """Solutions of the game a start_game payload describes, in found-bitset order."""
+    import spelling_bee
+    return spelling_bee.solve_puzzle(app_module.DATABASE_PATH, set(game['all_letters']),
+                                     game['center_letter'], list(game['word_counts_by_type']))['solutions']
@@ -0,0 +1,47 @@
+# tests/test_circuit_breaker.py
+# closed -> open -> half_open (one probe) -> closed or open again.
+import time
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+def tripped_breaker(cooldown):
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_ratio=0.5, cooldown=cooldown)
+    for success in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(success)
+    return breaker
+
+def test_stays_closed_below_min_calls_or_ratio():
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_ratio=0.5, cooldown=60)
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CLOSED # Only 3 calls recorded
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_ratio=0.5, cooldown=60)
+    for success in (True, True, True, False, True, True):
+        breaker.record(success)
+    assert breaker.state == CLOSED and breaker.stats()['recent_failure_ratio'] == 0.25
+
+def test_opens_and_fails_fast():
+    breaker = tripped_breaker(cooldown=60)
+    assert breaker.state == OPEN
+    assert not breaker.allow() and not breaker.allow()
+    stats = breaker.stats()
+    assert (stats['opened_count'], stats['short_circuited']) == (1, 2)
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    breaker = tripped_breaker(cooldown=0)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow() # Probe already in flight
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.stats()['recent_calls'] == 0
+
+def test_failed_probe_reopens():
+    breaker = tripped_breaker(cooldown=0.05)
+    assert breaker.state == OPEN
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN and breaker.stats()['opened_count'] == 2
+    assert not breaker.allow()
@@ -0,0 +1,39 @@
+# tests/test_db_pool.py
+# One read-only connection per thread, reused until the database file changes.
+import sqlite3
+import threading
+
+import pytest
+
+import db_pool
+
+def test_connection_is_reused_per_thread(word_db):
+    pool = db_pool.ReadOnlyConnectionPool(word_db)
+    conn = pool.connection()
+    assert pool.connection() is conn
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn and pool.stats()['opened'] == 2
+
+def test_connections_are_read_only(word_db):
+    conn = db_pool.ReadOnlyConnectionPool(word_db).connection()
+    assert conn.execute("SELECT COUNT(*) FROM words").fetchone()[0] == 90
+    with pytest.raises(sqlite3.Error):
+        conn.execute("DELETE FROM words")
+
+def test_missing_database_is_not_created(tmp_path):
+    with pytest.raises(sqlite3.Error):
+        db_pool.ReadOnlyConnectionPool(str(tmp_path / 'missing.db')).connection()
+    assert not (tmp_path / 'missing.db').exists()
+
+def test_connection_is_reopened_when_the_file_changes(word_db):
+    pool = db_pool.ReadOnlyConnectionPool(word_db)
+    conn = pool.connection()
+    assert pool.connection() is conn
+    with sqlite3.connect(word_db) as writer:
+        writer.execute("DELETE FROM definitions")
+    reopened = pool.connection()
+    assert reopened is not conn and pool.stats()['reopened'] == 1
+    assert reopened.execute("SELECT COUNT(*) FROM definitions").fetchone()[0] == 0
@@ -0,0 +1,25 @@
+# tests/test_definition_batch.py
+# POST /definitions answers many words at once; prefetch warms the cache in the background.
+import definitions
+
+def test_lookup_many_mixes_local_and_remote(definition_service):
+    definition_service.upstream['plant'] = (definitions.FOUND, 'a living organism')
+    result = definition_service.lookup_many(['plant', 'whānau', 'Plant', 'slant'])
+    assert result == {'plant': 'a living organism', 'whānau': 'extended family', 'slant': definitions.NOT_FOUND_TEXT}
+    assert definition_service.upstream_calls == ['plant', 'slant']
+
+def test_prefetch_skips_local_words_and_fills_the_cache(definition_service):
+    definition_service.upstream['plant'] = (definitions.FOUND, 'a living organism')
+    assert definition_service.prefetch(['plant']) == 0 # Disabled by default
+    definition_service.prefetch_enabled = True
+    assert definition_service.prefetch(['plant', 'tāne']) == 1
+    definition_service._get_prefetch_executor().shutdown(wait=True)
+    assert definition_service.cache.get('plant') == (True, 'a living organism')
+
+def test_definitions_endpoint_validates_its_body(client):
+    assert client.post('/definitions', json={'words': 'plant'}).status_code == 400
+    assert client.post('/definitions', json={'words': ['']}).status_code == 400
+    too_many = ['word'] * (definitions.DEFINITION_BATCH_MAX + 1)
+    assert client.post('/definitions', json={'words': too_many}).status_code == 400
+    response = client.post('/definitions', json={'words': ['tāne']})
+    assert response.get_json() == {'definitions': {'tāne': 'man'}}
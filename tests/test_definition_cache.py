@@ -0,0 +1,34 @@
+# tests/test_definition_cache.py
+# Upstream answers, including "not found", are cached in memory and in SQLite.
+import definitions
+
+def test_local_definitions_skip_upstream(definition_service):
+    assert definition_service.lookup('Tāne') == 'man'
+    assert definition_service.upstream_calls == []
+
+def test_upstream_answers_are_cached(definition_service):
+    definition_service.upstream['plant'] = (definitions.FOUND, 'a living organism')
+    assert definition_service.lookup('plant') == 'a living organism'
+    assert definition_service.lookup('slant') == definitions.NOT_FOUND_TEXT
+    assert definition_service.lookup('plant') == 'a living organism'
+    assert definition_service.lookup('slant') == definitions.NOT_FOUND_TEXT # Negative answer cached
+    assert definition_service.upstream_calls == ['plant', 'slant']
+    assert (definition_service.counters['cache_hits'], definition_service.counters['negative_hits']) == (1, 1)
+
+def test_persistent_tier_is_shared(definition_service):
+    definition_service.upstream['plant'] = (definitions.FOUND, 'a living organism')
+    definition_service.lookup('plant')
+    # A fresh cache (another worker, or after a restart) reads the SQLite tier
+    assert definitions.DefinitionCache(path=definition_service.cache.path).get('plant') == (True, 'a living organism')
+
+def test_upstream_errors_are_not_persisted(definition_service):
+    definition_service.upstream['plant'] = (definitions.ERROR, None)
+    assert definition_service.lookup('plant') == definitions.NOT_FOUND_TEXT
+    assert definition_service.cache.get('plant') == (True, None) # Briefly, in memory
+    assert definitions.DefinitionCache(path=definition_service.cache.path).get('plant') == (False, None)
+
+def test_parse_api_response():
+    response = [{'meanings': [{'definitions': [{'definition': 'first'}, {'definition': 'second'}]}]}]
+    assert definitions.parse_api_response(response) == 'first'
+    assert definitions.parse_api_response([{'meanings': []}]) is None
+    assert definitions.parse_api_response({}) is None
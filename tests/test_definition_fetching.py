@@ -0,0 +1,52 @@
+# tests/test_definition_fetching.py
+# Upstream calls are capped and fail fast while the circuit breaker is open.
+import threading
+
+import definitions
+
+def test_open_breaker_short_circuits(definition_service):
+    for word in ('aaaa', 'bbbb'):
+        definition_service.upstream[word] = (definitions.ERROR, None)
+        definition_service.lookup(word)
+    assert definition_service.breaker.state == 'open'
+    assert definition_service.lookup('cccc') == definitions.NOT_FOUND_TEXT
+    assert definition_service.upstream_calls == ['aaaa', 'bbbb']
+    assert definition_service.counters['short_circuited'] == 1
+
+def test_lookups_beyond_the_cap_are_rejected(definition_service):
+    definition_service.fetch_mode = 'executor'
+    for _ in range(definition_service.workers):
+        definition_service._slots.acquire()
+    assert definition_service.lookup('plant') == definitions.NOT_FOUND_TEXT
+    assert definition_service.counters['rejected'] == 1 and definition_service.upstream_calls == []
+
+def test_concurrent_lookups_share_one_upstream_call(definition_service, monkeypatch):
+    definition_service.fetch_mode = 'executor'
+    definition_service.upstream['plant'] = (definitions.FOUND, 'a living thing')
+    release = threading.Event()
+    call_api = definition_service._call_api
+    monkeypatch.setattr(definition_service, '_call_api', lambda word: release.wait(5) and call_api(word))
+    barrier = threading.Barrier(8)
+    futures = []
+    def start():
+        barrier.wait()
+        futures.append(definition_service._start_fetch('plant'))
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+    assert len({id(future) for future in futures}) == 1
+    assert futures[0].result(timeout=5) == 'a living thing'
+    assert definition_service.upstream_calls == ['plant'] and definition_service._in_flight == {}
+
+def test_refused_fetch_releases_its_reservation(definition_service):
+    definition_service.fetch_mode = 'executor'
+    for _ in range(definition_service.workers):
+        definition_service._slots.acquire()
+    assert definition_service._start_fetch('plant') is None
+    assert definition_service._in_flight == {}
+    definition_service._slots.release()
+    assert definition_service._start_fetch('plant').result(timeout=5) is None # NOT_FOUND upstream
+    assert definition_service.upstream_calls == ['plant']
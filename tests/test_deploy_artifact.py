@@ -0,0 +1,20 @@
+# tests/test_deploy_artifact.py
+# optimize_database stamps, analyzes and packs the database that deploys read.
+import database_setup
+
+def test_optimize_database_stamps_build_info(catalog_db):
+    report = database_setup.optimize_database(catalog_db, page_size=4096)
+    assert report['page_size'] == 4096 and report['freelist_count'] == 0
+    assert report['build_info']['words_count'] == 90
+    assert database_setup.read_header_stamp(catalog_db) == (database_setup.APPLICATION_ID, database_setup.SCHEMA_VERSION)
+    check = database_setup.check_database(catalog_db)
+    assert check['ready'] and check['artifact']['page_size'] == 4096
+    assert check['counts']['puzzles'] == report['build_info']['puzzles_count']
+
+def test_hot_queries_use_indexes(catalog_db):
+    plans = database_setup.optimize_database(catalog_db)['query_plans']
+    assert set(plans) == set(database_setup.HOT_QUERIES)
+    for name, plan in plans.items():
+        assert not any(step.startswith('error') for step in plan), name
+        if name != 'pangram_ranges': # One row per distinct list_mask: scanned on purpose
+            assert not any(step.startswith('SCAN') for step in plan), (name, plan)
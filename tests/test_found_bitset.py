@@ -0,0 +1,27 @@
+# tests/test_found_bitset.py
+# Found words are a bitset over the solution indices; per-list counts are popcounts.
+import spelling_bee
+from conftest import game_solutions, start_game
+
+def test_found_words_and_counts_from_mask():
+    solutions = ['pant', 'plan', 'plant', 'slant']
+    found_mask = 0b1010
+    assert spelling_bee.found_words_from_mask(solutions, found_mask) == ['plan', 'slant']
+    list_masks = {'csw21': 0b1111, 'nz_slang': 0b0001}
+    assert spelling_bee.found_counts_from_mask(found_mask, list_masks) == {'csw21': 2, 'nz_slang': 0}
+
+def test_guesses_set_bits_and_count_per_list(client, app_module):
+    game = start_game(client)
+    solutions = game_solutions(app_module, game)
+    word = solutions[-1]
+    first = client.post('/guess', json={'guess': word}).get_json()
+    assert first['valid'] and first['word'] == word
+    assert first['found_count'] == 1 and first['updated_counts'] == {'csw21': 1}
+    assert first['score'] == spelling_bee.calculate_score(word, set(game['all_letters']))
+    duplicate = client.post('/guess', json={'guess': word}).get_json()
+    assert not duplicate['valid'] and duplicate['message'] == 'Already found!'
+    for guess in solutions[:-1]:
+        # Players type without macrons ('pāte' is guessed as 'pate')
+        result = client.post('/guess', json={'guess': spelling_bee.normalize_word(guess)}).get_json()
+        assert result['valid']
+    assert result['all_found'] and result['found_count'] == len(solutions)
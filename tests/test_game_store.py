@@ -0,0 +1,75 @@
+# tests/test_game_store.py
+# Every backend round-trips a game; the cookie store rebuilds puzzles; unsafe backends are refused.
+import pytest
+
+import game_store
+
+PUZZLE = {'letters_set': 'aelnpst', 'center_letter': 'p', 'active_list_types': ['te_reo', 'csw21'],
+          'solutions': ['pant', 'planets']}
+PROGRESS = {'found_mask': 0, 'score': 0}
+
+def cookie_store(session, rebuilt):
+    def rebuild_puzzle(letters, center_letter, active_list_types):
+        rebuilt.append((letters, center_letter, active_list_types))
+        return dict(PUZZLE, active_list_types=list(active_list_types))
+    return game_store.CookieGameStore(rebuild_puzzle, lambda: session)
+
+@pytest.mark.parametrize('make_store', [
+    lambda tmp_path: game_store.MemoryGameStore(),
+    lambda tmp_path: game_store.SQLiteGameStore(path=str(tmp_path / 'games.db')),
+    lambda tmp_path: cookie_store({}, []),
+], ids=['memory', 'sqlite', 'cookie'])
+def test_round_trip(make_store, tmp_path):
+    store = make_store(tmp_path)
+    game_id = store.create(PUZZLE, PROGRESS)
+    puzzle, progress = store.load(game_id)
+    assert puzzle['solutions'] == PUZZLE['solutions'] and progress == PROGRESS
+    store.save_progress(game_id, {'found_mask': 0b10, 'score': 14})
+    assert store.load(game_id)[1] == {'found_mask': 0b10, 'score': 14}
+    assert store.load('unknown') is None and store.load(None) is None
+    store.delete(game_id)
+    assert store.load(game_id) is None
+
+def test_cookie_store_keeps_only_the_puzzle_key_in_the_session():
+    session, rebuilt = {}, []
+    game_id = cookie_store(session, rebuilt).create(PUZZLE, PROGRESS)
+    assert session['game'] == {'game_id': game_id, 'letters': 'aelnpst', 'center_letter': 'p',
+                               'active_list_types': ['csw21', 'te_reo'],
+                               'solutions_digest': game_store.solutions_digest(PUZZLE['solutions']),
+                               'progress': PROGRESS}
+    # Another worker sees the same cookie and rebuilds the puzzle once
+    other = cookie_store(session, rebuilt)
+    assert other.load(game_id)[0]['solutions'] == PUZZLE['solutions']
+    assert other.load(game_id)
+    assert rebuilt == [('aelnpst', 'p', ('csw21', 'te_reo'))]
+
+def test_cookie_store_rejects_a_game_from_another_lexicon_build():
+    session = {}
+    game_id = cookie_store(session, []).create(dict(PUZZLE, solutions=['pant', 'plan']), PROGRESS)
+    # Same letters, same solution count, different words: found_mask bits would be misread
+    assert cookie_store(session, []).load(game_id) is None
+
+def test_default_backend_depends_on_the_host(monkeypatch):
+    for name in ('VERCEL', 'AWS_LAMBDA_FUNCTION_NAME'):
+        monkeypatch.delenv(name, raising=False)
+    assert game_store.default_backend() == 'sqlite'
+    monkeypatch.setenv('VERCEL', '1')
+    assert game_store.default_backend() == 'cookie'
+    assert isinstance(game_store.create_game_store('', lambda *key: PUZZLE, dict), game_store.CookieGameStore)
+
+@pytest.mark.parametrize('env, backend', [
+    ({'WEB_CONCURRENCY': '3'}, 'memory'),
+    ({'VERCEL': '1'}, 'memory'),
+    ({'AWS_LAMBDA_FUNCTION_NAME': 'bee'}, 'sqlite'),
+])
+def test_refuses_stores_not_shared_by_every_process(monkeypatch, env, backend):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(RuntimeError):
+        game_store.create_game_store(backend)
+
+def test_single_worker_may_use_memory(monkeypatch):
+    for name in ('WEB_CONCURRENCY', 'VERCEL', 'AWS_LAMBDA_FUNCTION_NAME'):
+        monkeypatch.delenv(name, raising=False)
+    assert isinstance(game_store.create_game_store('memory'), game_store.MemoryGameStore)
+    assert isinstance(game_store.create_game_store('cookie', lambda *key: PUZZLE, dict), game_store.CookieGameStore)
@@ -0,0 +1,35 @@
+# tests/test_guess_fast_path.py
+# /guess is answered from the game state alone.
+import sqlite3
+
+import pytest
+
+import db_pool
+from conftest import game_solutions, start_game
+
+@pytest.fixture
+def no_database(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("/guess touched the database")
+    monkeypatch.setattr(db_pool, 'get_connection', refuse)
+    monkeypatch.setattr(sqlite3, 'connect', refuse)
+
+def test_valid_guess_needs_no_database(client, app_module, request):
+    game = start_game(client)
+    word = game_solutions(app_module, game)[0]
+    request.getfixturevalue('no_database')
+    result = client.post('/guess', json={'guess': word}).get_json()
+    assert result['valid'] and result['word'] == word
+
+def test_invalid_guesses(client):
+    game = start_game(client)
+    outside = next(letter for letter in 'abcdefghijklmnopqrstuvwxyz' if letter not in game['all_letters'])
+    assert 'Invalid letter' in client.post('/guess', json={'guess': outside * 4}).get_json()['message']
+    outer = next(letter for letter in game['all_letters'] if letter != game['center_letter'])
+    assert 'Missing center' in client.post('/guess', json={'guess': outer * 4}).get_json()['message']
+    assert client.post('/guess', json={'guess': game['center_letter'] * 3}).get_json()['message'].startswith('Too short')
+    assert client.post('/guess', json={'guess': game['center_letter'] * 4}).get_json()['message'] == 'Not a valid word.'
+
+def test_guess_without_a_game(app_module):
+    result = app_module.app.test_client().post('/guess', json={'guess': 'plant'}).get_json()
+    assert not result['valid'] and 'No active game' in result['message']
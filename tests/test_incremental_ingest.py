@@ -0,0 +1,76 @@
+# tests/test_incremental_ingest.py
+# ingest_list skips sources whose SHA-256 is unchanged and otherwise applies only the difference.
+import sqlite3
+
+import database_setup
+import lexicon_file
+from conftest import CSW21_WORDS
+
+def query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def list_bits(db_path) -> dict:
+    return dict(query(db_path, "SELECT list_type, 1 << list_id FROM lists"))
+
+def write_words(path, words):
+    path.write_text("\n".join(words) + "\n")
+    return str(path)
+
+def test_unchanged_sources_are_skipped(word_db, sources):
+    assert database_setup.ingest_list(word_db, 'csw21', sources['csw21'])['status'] == 'skipped'
+    assert database_setup.ingest_list(word_db, 'csw21', sources['csw21'], force=True)['status'] == 'applied'
+
+def test_only_the_difference_is_applied(word_db, tmp_path):
+    bits = list_bits(word_db)
+    words = [w for w in CSW21_WORDS if w not in ('pants', 'zzzz')] + ['spelt']
+    new_path = write_words(tmp_path / 'csw21_v2.txt', words)
+    summary = database_setup.ingest_list(word_db, 'csw21', [new_path])
+    assert (summary['status'], summary['added'], summary['removed']) == ('applied', 1, 2)
+    # 'pants' stays for nz_slang, 'zzzz' was only csw21's
+    assert query(word_db, "SELECT list_mask FROM words WHERE word = 'pants'") == [(bits['nz_slang'],)]
+    assert query(word_db, "SELECT 1 FROM words WHERE word = 'zzzz'") == []
+    assert query(word_db, "SELECT list_mask FROM words WHERE word = 'spelt'") == [(bits['csw21'],)]
+    manifest = query(word_db, "SELECT source_path, sha256 FROM ingest_manifest WHERE list_type = 'csw21'")
+    assert manifest == [(database_setup._manifest_key(new_path), database_setup.file_sha256(new_path))]
+
+def test_definitions_are_updated(word_db, tmp_path):
+    path = tmp_path / 'tereo_v2.csv'
+    path.write_text("pāte\ta thick sauce\nwhānau\textended family\ntāne\tman\nkai\tfood\n", encoding='utf-8')
+    summary = database_setup.ingest_list(word_db, 'te_reo', [str(path)])
+    assert (summary['definitions_added'], summary['definitions_removed']) == (1, 1)
+    rows = query(word_db, '''
+        SELECT d.definition_text FROM definitions d JOIN words w ON d.word_id = w.word_id WHERE w.word = 'pāte'
+    ''')
+    assert rows == [('a thick sauce',)]
+
+def test_missing_source_leaves_the_list_unchanged(word_db, tmp_path):
+    summary = database_setup.ingest_list(word_db, 'csw21', [str(tmp_path / 'missing.txt')])
+    assert summary['status'] == 'error'
+    assert query(word_db, "SELECT COUNT(*) FROM words") == [(90,)]
+
+def test_ingest_drops_the_catalog_and_rewrites_the_lexicon(catalog_db, tmp_path):
+    old_generation = lexicon_file.MappedLexicon(lexicon_file.lexicon_path(catalog_db)).generation
+    database_setup.ingest_list(catalog_db, 'csw21', [write_words(tmp_path / 'csw21_v2.txt', CSW21_WORDS + ['spelt'])])
+    tables = {row[0] for row in query(catalog_db, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert not tables & {'puzzles', 'catalog_letter_sets', 'catalog_selections', 'build_info'}
+    lexicon = lexicon_file.open_lexicon(catalog_db) # Raises if stale
+    assert lexicon.generation != old_generation and len(lexicon) == 91
+
+def test_kept_words_take_a_spelling_with_macrons(word_db, tmp_path):
+    path = tmp_path / 'nzslang_v2.csv'
+    path.write_text("plonker\tan idiot\nmunted\tbroken\nchūr\tthanks\npants\trubbish\n", encoding='utf-8')
+    summary = database_setup.ingest_list(word_db, 'nz_slang', [str(path)])
+    assert (summary['added'], summary['removed'], summary['respelled']) == (0, 0, 1)
+    assert query(word_db, "SELECT word FROM words WHERE normalized_word = 'chur'") == [('chūr',)]
+
+def test_ingest_refreshes_planner_statistics(word_db, tmp_path):
+    conn = sqlite3.connect(word_db)
+    conn.execute("DELETE FROM sqlite_stat1")
+    conn.commit()
+    conn.close()
+    database_setup.ingest_list(word_db, 'csw21', [write_words(tmp_path / 'csw21_v2.txt', CSW21_WORDS + ['spelt'])])
+    assert ('words', 'idx_letter_mask') in query(word_db, "SELECT tbl, idx FROM sqlite_stat1")
@@ -0,0 +1,34 @@
+# tests/test_init_db.py
+# The bulk build loads every source once, indexes after the load and can be rerun in place.
+import sqlite3
+
+import database_setup
+from conftest import build_db, write_sources
+
+def query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+def test_build_loads_every_list(word_db):
+    assert query(word_db, "SELECT COUNT(*) FROM words") == [(90,)]
+    assert query(word_db, "SELECT COUNT(*) FROM definitions") == [(7,)]
+    assert dict(query(word_db, "SELECT list_type, list_id FROM lists")) == {'csw21': 0, 'te_reo': 1, 'nz_slang': 2}
+    assert query(word_db, "PRAGMA user_version") == [(database_setup.SCHEMA_VERSION,)]
+    indexes = {row[0] for row in query(word_db, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_word_text', 'idx_letter_mask', 'idx_definition_word_id'} <= indexes
+
+def test_rebuild_replaces_the_previous_contents(tmp_path):
+    db_path = build_db(str(tmp_path), write_sources(str(tmp_path)))
+    rebuilt = build_db(str(tmp_path), write_sources(str(tmp_path), csw21=['planets', 'plant'], te_reo=[], nz_slang=[]))
+    assert rebuilt == db_path
+    assert sorted(query(db_path, "SELECT word FROM words")) == [('planets',), ('plant',)]
+    assert query(db_path, "SELECT COUNT(*) FROM definitions") == [(0,)]
+
+def test_missing_source_is_skipped(tmp_path):
+    sources = write_sources(str(tmp_path))
+    sources['nz_slang'] = [str(tmp_path / 'missing.csv')]
+    db_path = build_db(str(tmp_path), sources)
+    assert query(db_path, "SELECT COUNT(*) FROM words") == [(87,)] # 'pants' is csw21's too
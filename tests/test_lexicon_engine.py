@@ -0,0 +1,62 @@
+# tests/test_lexicon_engine.py
+# SOLVER_ENGINE=numpy solves exactly like the SQL solver and follows database rebuilds.
+import pytest
+
+import database_setup
+import spelling_bee
+
+np = pytest.importorskip('numpy')
+import lexicon_engine
+
+PUZZLES = [('aelnpst', 'p'), ('aelnpst', 't'), ('dghilno', 'g'), ('eklnopr', 'k')]
+SELECTIONS = [['csw21'], ['csw21', 'te_reo'], ['nz_slang'], ['csw21', 'nz_slang', 'te_reo']]
+
+def add_lists(db_path, directory, count):
+    """Registers `count` extra lists, so list bits go beyond the first byte of list_mask."""
+    for i in range(count):
+        path = directory / f'extra_{i}.txt'
+        path.write_text("planets\nspelt\n")
+        database_setup.ingest_list(db_path, f'extra_{i}', [str(path)])
+
+def test_engine_selection_matches_sql(word_db, tmp_path):
+    add_lists(word_db, tmp_path, 10)
+    engine = lexicon_engine.LexiconEngine.from_database(word_db)
+    for letters, center_letter in PUZZLES:
+        for lists in SELECTIONS + [['extra_9']]:
+            expected = spelling_bee.find_solution_details(word_db, set(letters), center_letter, lists)
+            indices = engine.solution_indices(set(letters), center_letter, lists)
+            memberships = engine.memberships_at(indices, lists)
+            assert memberships == {word: entry[3] for word, entry in expected.items()}
+
+def test_solve_puzzle_with_numpy_engine(word_db, monkeypatch):
+    expected = {(letters, center_letter, tuple(lists)):
+                spelling_bee._solve_puzzle(word_db, set(letters), center_letter, lists)
+                for letters, center_letter in PUZZLES for lists in SELECTIONS}
+    monkeypatch.setattr(spelling_bee, 'SOLVER_ENGINE', 'numpy')
+    assert isinstance(spelling_bee._get_engine(word_db), lexicon_engine.LexiconEngine)
+    for (letters, center_letter, lists), sql_puzzle in expected.items():
+        assert dict(spelling_bee._solve_puzzle(word_db, set(letters), center_letter, list(lists))) == dict(sql_puzzle)
+
+def test_too_many_lists_are_refused(word_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(lexicon_engine, 'MAX_LISTS', 4)
+    add_lists(word_db, tmp_path, 2)
+    with pytest.raises(ValueError):
+        lexicon_engine.LexiconEngine.from_database(word_db)
+
+def test_missing_database_is_not_created(tmp_path):
+    missing = tmp_path / 'missing.db'
+    assert lexicon_engine.get_engine(str(missing)) is None
+    assert not missing.exists()
+
+def test_engine_reloads_after_the_database_changes(word_db, tmp_path):
+    engine = lexicon_engine.get_engine(word_db)
+    assert lexicon_engine.get_engine(word_db) is engine
+    add_lists(word_db, tmp_path, 1)
+    reloaded = lexicon_engine.get_engine(word_db)
+    assert reloaded is not engine and 'extra_0' in reloaded.list_bits
+
+def test_failed_load_is_retried_once_the_database_appears(tmp_path, sources):
+    db_path = str(tmp_path / 'words.db')
+    assert lexicon_engine.get_engine(db_path) is None
+    database_setup.init_db(db_path, sources=sources)
+    assert isinstance(lexicon_engine.get_engine(db_path), lexicon_engine.LexiconEngine)
@@ -0,0 +1,84 @@
+# tests/test_lexicon_file.py
+# The memory-mapped .lex file answers like SQL, is refused once its database has moved on
+# and is remapped after a rebuild.
+import os
+
+import pytest
+
+import database_setup
+import lexicon_file
+import spelling_bee
+
+PUZZLES = [('aelnpst', 'p'), ('aelnpst', 't'), ('dghilno', 'g'), ('dghilno', 'o'), ('eklnopr', 'k')]
+SELECTIONS = [['csw21'], ['csw21', 'te_reo'], ['nz_slang'], ['csw21', 'nz_slang', 'te_reo'], ['unknown']]
+
+def assert_matches_sql(lexicon, db_path, selections=SELECTIONS):
+    for letters, center_letter in PUZZLES:
+        for lists in selections:
+            expected = spelling_bee.find_solution_details(db_path, set(letters), center_letter, lists)
+            indices = lexicon.solution_indices(set(letters), center_letter, lists)
+            assert lexicon.memberships_at(indices, lists) == {word: entry[3] for word, entry in expected.items()}
+
+def test_round_trip(word_db):
+    lexicon = lexicon_file.open_lexicon(word_db)
+    assert len(lexicon) == 90
+    assert set(lexicon.list_bits) == {'csw21', 'te_reo', 'nz_slang'}
+    assert_matches_sql(lexicon, word_db)
+
+def test_choose_letters_respects_lists(word_db):
+    lexicon = lexicon_file.open_lexicon(word_db)
+    for _ in range(20):
+        letters, center_letter = lexicon.choose_letters(['nz_slang'])
+        assert "".join(sorted(letters)) == 'eklnopr' and center_letter in letters
+    with pytest.raises(RuntimeError):
+        lexicon.choose_letters(['unknown'])
+
+def test_stale_file_is_refused(word_db, tmp_path):
+    word_count = len(lexicon_file.open_lexicon(word_db))
+    # Same word count, different words: only the generation can tell the file is stale
+    words = (tmp_path / 'csw21.txt').read_text().split()
+    path = tmp_path / 'csw21_v2.txt'
+    path.write_text("\n".join('spelt' if word == 'zzzz' else word for word in words) + "\n")
+    database_setup.ingest_list(word_db, 'csw21', [str(path)], rebuild_lexicon=False)
+    assert len(lexicon_file.MappedLexicon(lexicon_file.lexicon_path(word_db))) == word_count
+    with pytest.raises(lexicon_file.LexiconFileError):
+        lexicon_file.open_lexicon(word_db)
+    database_setup.build_lexicon_file(word_db)
+    lexicon = lexicon_file.open_lexicon(word_db)
+    assert 'spelt' in lexicon.memberships_at(lexicon.solution_indices(set('aelnpst'), 'p', ['csw21']), ['csw21'])
+
+def test_malformed_file_is_refused(tmp_path):
+    path = tmp_path / 'bad.lex'
+    path.write_bytes(b'not a lexicon' * 20)
+    with pytest.raises(lexicon_file.LexiconFileError):
+        lexicon_file.MappedLexicon(str(path))
+
+def test_more_than_eight_lists(word_db, tmp_path):
+    for i in range(10):
+        path = tmp_path / f'extra_{i}.txt'
+        path.write_text("planets\nspelt\n")
+        database_setup.ingest_list(word_db, f'extra_{i}', [str(path)])
+    lexicon = lexicon_file.open_lexicon(word_db)
+    assert len(lexicon.list_bits) == 13
+    assert_matches_sql(lexicon, word_db, SELECTIONS + [['extra_9'], ['te_reo', 'extra_0']])
+
+def test_solve_puzzle_with_mmap_engine(word_db, monkeypatch):
+    expected = spelling_bee._solve_puzzle(word_db, set('aelnpst'), 'p', ['csw21', 'te_reo'])
+    monkeypatch.setattr(spelling_bee, 'SOLVER_ENGINE', 'mmap')
+    assert isinstance(spelling_bee._get_engine(word_db), lexicon_file.MappedLexicon)
+    assert dict(spelling_bee._solve_puzzle(word_db, set('aelnpst'), 'p', ['csw21', 'te_reo'])) == dict(expected)
+
+def test_get_lexicon_follows_rebuilds(word_db, tmp_path):
+    lexicon = lexicon_file.get_lexicon(word_db)
+    assert lexicon_file.get_lexicon(word_db) is lexicon
+    path = tmp_path / 'csw21_v2.txt'
+    path.write_text((tmp_path / 'csw21.txt').read_text() + "spelt\n")
+    database_setup.ingest_list(word_db, 'csw21', [str(path)])
+    remapped = lexicon_file.get_lexicon(word_db)
+    assert remapped is not lexicon and len(remapped) == len(lexicon) + 1
+
+def test_lexicon_written_after_a_failure_is_picked_up(word_db):
+    os.remove(lexicon_file.lexicon_path(word_db))
+    assert lexicon_file.get_lexicon(word_db) is None
+    database_setup.build_lexicon_file(word_db)
+    assert isinstance(lexicon_file.get_lexicon(word_db), lexicon_file.MappedLexicon)
@@ -0,0 +1,33 @@
+# tests/test_list_mask_dedup.py
+# A word in several lists is one row with a list_mask bit per list.
+import sqlite3
+
+import spelling_bee
+
+def query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+def test_word_in_several_lists_is_stored_once(word_db):
+    bits = dict(query(word_db, "SELECT list_type, 1 << list_id FROM lists"))
+    assert query(word_db, "SELECT word, list_mask FROM words WHERE normalized_word = 'pate'") == \
+        [('pāte', bits['csw21'] | bits['te_reo'])]
+    assert query(word_db, "SELECT list_mask FROM words WHERE normalized_word = 'pants'") == \
+        [(bits['csw21'] | bits['nz_slang'],)]
+    assert query(word_db, "SELECT COUNT(*), COUNT(DISTINCT normalized_word) FROM words") == [(90, 90)]
+
+def test_definitions_keep_their_list(word_db):
+    rows = query(word_db, '''
+        SELECT l.list_type, d.definition_text FROM definitions d
+        JOIN words w ON d.word_id = w.word_id JOIN lists l ON d.list_id = l.list_id
+        WHERE w.normalized_word = 'pate'
+    ''')
+    assert rows == [('te_reo', 'a sauce')]
+
+def test_solutions_use_the_macron_display_form(word_db):
+    solutions, normalized_map = spelling_bee.find_valid_words(word_db, set('aelnpst'), 't', ['csw21', 'te_reo'])
+    assert {'pāte', 'tāne'} <= solutions and 'pate' not in solutions
+    assert normalized_map['pate'] == 'pāte'
@@ -0,0 +1,46 @@
+# tests/test_metrics.py
+# Counters and histograms render in the Prometheus text format; the app exposes them at /metrics.
+import metrics
+from conftest import start_game
+
+def test_counter_and_histogram_samples():
+    counter = metrics.Counter('test_events', "Test events.", ('kind',))
+    counter.inc(kind='a')
+    counter.inc(2, kind='a')
+    assert list(counter.samples()) == ['test_events_total{kind="a"} 3']
+    histogram = metrics.Histogram('test_seconds', "Test latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    assert list(histogram.samples()) == [
+        'test_seconds_bucket{le="0.1"} 1', 'test_seconds_bucket{le="1.0"} 2', 'test_seconds_bucket{le="+Inf"} 3',
+        'test_seconds_sum 5.55', 'test_seconds_count 3',
+    ]
+
+def test_stage_timings_are_collected_per_request():
+    metrics.collect_stage_timings()
+    with metrics.STAGE_SECONDS.time(stage='scoring'):
+        pass
+    stages = metrics.stop_stage_timings()
+    assert [stage for stage, _ in stages] == ['scoring']
+    assert metrics.stop_stage_timings() == []
+
+def test_metrics_endpoint(client):
+    game = start_game(client)
+    client.post('/guess', json={'guess': game['center_letter'] * 4})
+    response = client.get('/metrics')
+    assert response.headers['Content-Type'] == metrics.CONTENT_TYPE
+    exposition = response.get_data(as_text=True)
+    assert 'guess_outcomes_total{outcome="not_a_word"}' in exposition
+    assert 'http_request_duration_seconds_bucket{endpoint="start_game"' in exposition
+    assert 'spelling_bee_stage_seconds_count{stage="generate_puzzle"}' in exposition
+    assert 'session_cookie_bytes_count' in exposition
+
+def test_session_cookie_bytes_measure_the_set_cookie_header(client):
+    start_game(client)
+    total_bytes = lambda: metrics.SESSION_COOKIE_BYTES._series[()][-1]
+    before = total_bytes()
+    response = client.get('/metrics') # Leaves the session unmodified: no cookie, no sample
+    assert 'Set-Cookie' not in response.headers and total_bytes() == before
+    response = client.post('/start_game', json={'selected_lists': ['csw21']})
+    [header] = [h for h in response.headers.getlist('Set-Cookie') if h.startswith('session=')]
+    assert total_bytes() - before == len(header)
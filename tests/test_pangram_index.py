@@ -0,0 +1,43 @@
+# tests/test_pangram_index.py
+# Puzzle seeds come from the precomputed pangram tables, filtered by the active lists.
+import random
+import sqlite3
+
+import db_pool
+import spelling_bee
+
+def test_pangram_letters_needs_seven_letters_and_a_vowel():
+    assert spelling_bee.pangram_letters('planets') == 'aelnpst'
+    assert spelling_bee.pangram_letters('Whānau') is None # 5 distinct letters
+    assert spelling_bee.pangram_letters('planet') is None
+    assert spelling_bee.pangram_letters('rhythms') is None
+
+def test_pangram_ranges_cover_consecutive_ids(word_db):
+    conn = sqlite3.connect(word_db)
+    try:
+        pangrams = conn.execute("SELECT pangram_id, word, list_mask FROM pangrams ORDER BY pangram_id").fetchall()
+        ranges = conn.execute("SELECT list_mask, first_pangram_id, pangram_count FROM pangram_ranges").fetchall()
+    finally:
+        conn.close()
+    assert sorted(word for _, word, _ in pangrams) == ['holding', 'planets', 'plonker']
+    assert sum(count for _, _, count in ranges) == len(pangrams)
+    for list_mask, first_id, count in ranges:
+        run = [pangram_id for pangram_id, _, mask in pangrams if mask == list_mask]
+        assert run == list(range(first_id, first_id + count))
+
+def test_pangram_pick_is_filtered_by_list(word_db):
+    cursor = db_pool.get_connection(word_db).cursor()
+    random.seed(3)
+    csw21_picks = {spelling_bee._pangram_from_index(cursor, ['csw21'])[0] for _ in range(50)}
+    assert csw21_picks == {'holding', 'planets'}
+    assert spelling_bee._pangram_from_index(cursor, ['nz_slang']) == ('plonker', 'eklnopr')
+    assert spelling_bee._pangram_from_index(cursor, ['unknown']) is None
+
+def test_choose_letters_only_uses_active_lists(word_db):
+    random.seed(1)
+    for _ in range(20):
+        letters, center_letter = spelling_bee.choose_letters(word_db, ['csw21'])
+        assert "".join(sorted(letters)) in ('aelnpst', 'dghilno')
+        assert center_letter in letters
+    letters, _ = spelling_bee.choose_letters(word_db, ['nz_slang'])
+    assert "".join(sorted(letters)) == 'eklnopr'
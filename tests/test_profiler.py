@@ -0,0 +1,24 @@
+# tests/test_profiler.py
+# Requests are profiled only when sampled or asked for with the header and token.
+import os
+
+import profiler
+
+def test_disabled_by_default(tmp_path):
+    request_profiler = profiler.RequestProfiler(sample_rate=0, token='', directory=str(tmp_path))
+    assert not request_profiler.enabled
+    assert not request_profiler.wants({'X-Profile': ''})
+
+def test_header_with_token_writes_one_profile(tmp_path):
+    request_profiler = profiler.RequestProfiler(sample_rate=0, token='secret', directory=str(tmp_path))
+    assert not request_profiler.wants({'X-Profile': 'wrong'})
+    assert request_profiler.wants({'X-Profile': 'secret'})
+    profile = request_profiler.start()
+    assert request_profiler.start() is None # One profile at a time
+    path = request_profiler.stop(profile, 'start/game', 0.012)
+    assert os.path.dirname(path) == str(tmp_path) and path.endswith('-start_game-12ms.prof')
+    assert request_profiler.stats()['written'] == 1 and request_profiler.stats()['skipped_busy'] == 1
+
+def test_server_timing_header_sums_repeated_stages():
+    header = profiler.server_timing_header([('sql fetch', 0.001), ('sql fetch', 0.002), ('scoring', 0.0005)], 0.01)
+    assert header == "sql_fetch;dur=3.00, scoring;dur=0.50, total;dur=10.00"
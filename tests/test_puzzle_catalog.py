@@ -0,0 +1,59 @@
+# tests/test_puzzle_catalog.py
+# Each catalog puzzle is stored once for every list selection and serves its stored solution.
+import random
+import sqlite3
+
+import database_setup
+import spelling_bee
+
+def query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def test_word_id_blob_round_trip():
+    word_ids = [1, 2, 127, 128, 300, 16_384, 2_000_000]
+    random.shuffle(word_ids)
+    encoded = spelling_bee.encode_word_ids(word_ids)
+    assert spelling_bee.decode_word_ids(encoded) == sorted(word_ids)
+    assert spelling_bee.decode_word_ids(b'') == []
+
+def test_selection_masks(catalog_db):
+    selections = dict(query(catalog_db, "SELECT lists, selection_id FROM catalog_selections"))
+    assert set(selections) == {database_setup.catalog_lists_key(c) for c in database_setup.catalog_list_combinations()}
+    rows = query(catalog_db, '''
+        SELECT s.letters, p.center_letter, p.selection_mask FROM puzzles p
+        JOIN catalog_letter_sets s ON p.letter_set_id = s.letter_set_id
+    ''')
+    masks = {(letters, center): mask for letters, center, mask in rows}
+    assert len(masks) == len(rows) # One row per puzzle, whatever the selections
+    assert masks[('eklnopr', 'p')] == sum(1 << selection_id for key, selection_id in selections.items()
+                                          if 'nz_slang' in key)
+    assert masks[('aelnpst', 'p')] == (1 << len(selections)) - 1
+    for selection_id, puzzle_count in query(catalog_db, "SELECT selection_id, puzzle_count FROM catalog_selections"):
+        assert puzzle_count == sum(mask >> selection_id & 1 for mask in masks.values())
+
+def test_word_count_bounds_reject_puzzles(word_db):
+    database_setup.build_puzzle_catalog(word_db, min_words=2, max_words=500, workers=1)
+    rows = query(word_db, '''
+        SELECT p.center_letter FROM puzzles p JOIN catalog_letter_sets s ON p.letter_set_id = s.letter_set_id
+        WHERE s.letters = 'eklnopr'
+    ''')
+    assert rows == [] # 'plonker' is the only word for each center
+
+def test_catalog_puzzle_serves_stored_solution(catalog_db):
+    for lists in (['csw21'], ['csw21', 'te_reo'], ['csw21', 'nz_slang', 'te_reo']):
+        for _ in range(10):
+            catalog_puzzle = spelling_bee.choose_catalog_puzzle(catalog_db, lists)
+            assert catalog_puzzle is not None
+            letters, center_letter = catalog_puzzle['letters'], catalog_puzzle['center_letter']
+            stored = spelling_bee._solve_puzzle(catalog_db, letters, center_letter, sorted(lists),
+                                                catalog_puzzle['word_ids'])
+            solved = spelling_bee._solve_puzzle(catalog_db, letters, center_letter, sorted(lists))
+            assert dict(stored) == dict(solved)
+
+def test_no_catalog_means_no_catalog_puzzle(word_db):
+    assert spelling_bee.choose_catalog_puzzle(word_db, ['csw21']) is None
+    assert spelling_bee.generate_puzzle(word_db, ['csw21'])['solutions']
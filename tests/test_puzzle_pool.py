@@ -0,0 +1,29 @@
+# tests/test_puzzle_pool.py
+import threading
+
+from puzzle_pool import PuzzlePool, pool_key
+
+def test_pool_key_is_canonical():
+    assert pool_key(['te_reo', 'csw21', 'te_reo']) == ('csw21', 'te_reo')
+
+def test_disabled_pool_never_serves():
+    pool = PuzzlePool(lambda lists: {'lists': lists}, depth=0)
+    assert pool.get(['csw21']) is None
+    assert pool.stats()['enabled'] is False
+
+def test_refill_thread_tops_up_each_selection():
+    generated = threading.Event()
+    def generate(lists):
+        generated.set()
+        return {'lists': lists}
+    pool = PuzzlePool(generate, depth=2, low_watermark=1, known_selections=[('csw21',)])
+    assert pool.get(['csw21']) is None # Cold: a miss wakes the refill thread
+    assert generated.wait(5)
+    for _ in range(100):
+        puzzle = pool.get(['csw21'])
+        if puzzle:
+            break
+        threading.Event().wait(0.01)
+    assert puzzle == {'lists': ['csw21']}
+    stats = pool.stats()
+    assert stats['hits'] >= 1 and stats['misses'] >= 1 and stats['errors'] == 0
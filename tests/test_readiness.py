@@ -0,0 +1,27 @@
+# tests/test_readiness.py
+# The database is validated from its header and table counts, and the probes report it.
+import sqlite3
+
+import database_setup
+
+def test_built_database_is_ready(word_db):
+    report = database_setup.check_database(word_db)
+    assert report['ready'], report['errors']
+    assert report['counts'] == {'words': 90, 'pangrams': 3}
+
+def test_wrong_schema_version_is_rejected_from_the_header(word_db):
+    conn = sqlite3.connect(word_db)
+    conn.execute(f"PRAGMA user_version = {database_setup.SCHEMA_VERSION - 1};")
+    conn.close()
+    report = database_setup.check_database(word_db)
+    assert not report['ready'] and 'Schema version' in report['errors'][0]
+
+def test_missing_or_foreign_files_are_not_ready(tmp_path):
+    assert 'not found' in database_setup.check_database(str(tmp_path / 'nope.db'))['errors'][0]
+    (tmp_path / 'notes.db').write_text("not a database")
+    assert 'unreadable' in database_setup.check_database(str(tmp_path / 'notes.db'))['errors'][0]
+
+def test_probes(client):
+    assert client.get('/healthz').get_json() == {'status': 'ok'}
+    response = client.get('/readyz')
+    assert response.status_code == 200 and response.get_json()['ready']
@@ -0,0 +1,29 @@
+# tests/test_solution_lists.py
+# List membership comes back with the solutions: no per-word queries.
+import db_pool
+import spelling_bee
+
+PLANETS = set('aelnpst')
+
+def test_solve_puzzle_attributes_lists_by_index(word_db):
+    puzzle = spelling_bee._solve_puzzle(word_db, PLANETS, 'p', ['csw21', 'nz_slang'])
+    solutions = puzzle['solutions']
+    assert list(solutions) == sorted(solutions)
+    pants = solutions.index('pants')
+    assert puzzle['solution_lists'][pants] == ('csw21', 'nz_slang')
+    assert puzzle['list_masks']['nz_slang'] == 1 << pants
+    assert puzzle['solution_counts'] == {'csw21': len(solutions), 'nz_slang': 1}
+    assert puzzle['solution_index']['planets'] == solutions.index('planets')
+    assert puzzle['solution_pangrams'][solutions.index('planets')]
+    assert puzzle['total_score'] == spelling_bee.calculate_total_score(set(solutions), PLANETS)
+
+def test_solving_runs_a_fixed_number_of_queries(word_db):
+    statements = []
+    conn = db_pool.get_connection(word_db)
+    conn.set_trace_callback(statements.append)
+    try:
+        details = spelling_bee.find_solution_details(word_db, PLANETS, 'p', ['csw21', 'te_reo', 'nz_slang'])
+    finally:
+        conn.set_trace_callback(None)
+    assert len(details) > 40
+    assert len(statements) == 2 # The active list bits, then every solution with its list_mask
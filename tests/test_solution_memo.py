@@ -0,0 +1,32 @@
+# tests/test_solution_memo.py
+# Solved puzzles are memoized per (database generation, letters, center, list selection).
+import pytest
+
+import database_setup
+import spelling_bee
+from conftest import CSW21_WORDS
+
+PLANETS = set('aelnpst')
+
+def test_one_entry_per_list_selection(word_db):
+    first = spelling_bee.solve_puzzle(word_db, PLANETS, 'p', ['te_reo', 'csw21'])
+    assert spelling_bee.solve_puzzle(word_db, set('tsplnae'), 'p', ['csw21', 'te_reo', 'csw21']) is first
+    assert spelling_bee.solve_puzzle(word_db, PLANETS, 'a', ['csw21', 'te_reo']) is not first
+    assert spelling_bee.solve_puzzle(word_db, PLANETS, 'p', ['csw21']) is not first
+
+def test_memoized_puzzles_are_read_only(word_db):
+    puzzle = spelling_bee.solve_puzzle(word_db, PLANETS, 'p', ['csw21'])
+    with pytest.raises(TypeError):
+        puzzle['total_score'] = 0 # Shared between games
+    with pytest.raises(TypeError):
+        puzzle['list_masks']['csw21'] = 0
+
+@pytest.mark.parametrize('engine', ['sql', 'mmap'])
+def test_memo_misses_after_the_database_changes(word_db, tmp_path, monkeypatch, engine):
+    monkeypatch.setattr(spelling_bee, 'SOLVER_ENGINE', engine)
+    before = spelling_bee.solve_puzzle(word_db, PLANETS, 'p', ['csw21'])
+    extra = tmp_path / 'csw21_more.txt'
+    extra.write_text("\n".join(CSW21_WORDS + ['spelt']) + "\n")
+    database_setup.ingest_list(word_db, 'csw21', [str(extra)])
+    after = spelling_bee.solve_puzzle(word_db, PLANETS, 'p', ['csw21'])
+    assert 'spelt' in after['solutions'] and 'spelt' not in before['solutions']
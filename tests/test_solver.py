@@ -0,0 +1,29 @@
+# tests/test_solver.py
+# The solver's indexed letter-mask lookups agree with a brute-force scan.
+import itertools
+
+import spelling_bee
+from conftest import CSW21_WORDS
+
+PLANETS = set('aelnpst')
+
+def brute_force_solutions(words, letters, center_letter):
+    return {word for word in words
+            if len(word) >= spelling_bee.MIN_WORD_LENGTH and center_letter in word and set(word) <= set(letters)}
+
+def test_candidate_masks_are_every_subset_with_the_center():
+    masks = spelling_bee.candidate_letter_masks(PLANETS, 'p')
+    outer = sorted(PLANETS - {'p'})
+    expected = {spelling_bee.letters_to_mask(subset + ('p',))
+                for size in range(len(outer) + 1) for subset in itertools.combinations(outer, size)}
+    assert len(masks) == 64 and set(masks) == expected
+
+def test_find_valid_words_matches_brute_force(word_db):
+    for center_letter in sorted(PLANETS):
+        solutions, normalized_map = spelling_bee.find_valid_words(word_db, PLANETS, center_letter, ['csw21'])
+        # 'pate' is stored once, under te_reo's display form 'pāte'
+        assert set(normalized_map) == brute_force_solutions(CSW21_WORDS, PLANETS, center_letter)
+        assert all(normalized_map[spelling_bee.normalize_word(word)] == word for word in solutions)
+
+def test_unknown_lists_find_nothing(word_db):
+    assert spelling_bee.find_valid_words(word_db, PLANETS, 'p', ['unknown']) == (set(), {})
@@ -0,0 +1,31 @@
+# tests/test_ttl_cache.py
+import time
+
+from ttl_cache import TTLCache
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1 # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    stats = cache.stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1, 1)
+
+def test_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set('default', 1)
+    cache.set('forever', 2, ttl=None)
+    time.sleep(0.06)
+    assert cache.get('default', 'gone') == 'gone'
+    assert cache.get('forever') == 2
+
+def test_none_is_a_cacheable_value():
+    cache = TTLCache()
+    missing = object()
+    cache.set('negative', None)
+    assert cache.get('negative', missing) is None
+    assert cache.pop('negative', missing) is None
+    assert cache.get('negative', missing) is missing
@@ -0,0 +1,27 @@
+# tests/test_word_columns.py
+# Normalized form, letter mask, distinct letter count and length are computed once, at build time.
+import sqlite3
+
+import spelling_bee
+
+def test_word_columns_fold_macrons():
+    normalized, mask, distinct, length = spelling_bee.word_columns('Whānau')
+    assert normalized == 'whanau'
+    assert mask == spelling_bee.letters_to_mask('whanu')
+    assert (distinct, length) == (5, 6)
+
+def test_stored_columns_match_word_columns(word_db):
+    conn = sqlite3.connect(word_db)
+    try:
+        rows = conn.execute("SELECT word, normalized_word, letter_mask, distinct_letter_count, length FROM words").fetchall()
+    finally:
+        conn.close()
+    assert len(rows) == 90
+    for word, *columns in rows:
+        assert tuple(columns) == spelling_bee.word_columns(word)
+
+def test_score_from_length_matches_calculate_score():
+    letters = set('aelnpst')
+    for word in ('pant', 'plant', 'planets'):
+        pangram = spelling_bee.is_pangram(word, letters)
+        assert spelling_bee.score_from_length(len(word), pangram) == spelling_bee.calculate_score(word, letters)